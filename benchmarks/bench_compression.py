@@ -0,0 +1,84 @@
+"""Compare keeping local request and result files plain, gzipped or zstd compressed.
+
+Usage:
+    python benchmarks/bench_compression.py [n_records] [bandwidth_mb_per_s]
+
+Writes every request as a JSONL line, as push_requests_to_s3 does, and reads the
+file back line by line, as iter_results does, for each compression. Prints the file
+size and the measured time to write and read it. The "est. copy" column is not
+measured: it is the file size divided by the given bandwidth, an estimate of how
+long copying the local file between machines would take.
+
+Nothing is uploaded. Bedrock batch inference only reads uncompressed JSONL
+(CreateModelInvocationJob's s3InputFormat accepts only "JSONL"), so the S3 upload
+and download are the same size whichever compression is used locally.
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+from llmbo import ModelInput, serialization
+from llmbo.compression import COMPRESSIONS, compressed_name, open_read, open_write
+
+
+def make_lines(n_records: int) -> list:
+    return [
+        serialization.dumps_line(
+            {
+                "recordId": f"{i:08}",
+                "modelInput": ModelInput(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": f"Summarise document {i}: "
+                            + "lorem ipsum " * 200,
+                        }
+                    ],
+                    system="You are a helpful assistant",
+                    temperature=0.2,
+                ).to_dict(),
+            }
+        )
+        for i in range(n_records)
+    ]
+
+
+def bench(compression, lines: list, directory: str, bandwidth: float) -> None:
+    path = compressed_name(os.path.join(directory, "requests.jsonl"), compression)
+
+    start = time.perf_counter()
+    with open_write(path, compression) as file:
+        file.writelines(lines)
+    write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open_read(path) as file:
+        for _ in file:
+            pass
+    read = time.perf_counter() - start
+
+    n_mb = os.path.getsize(path) / 1024**2
+    print(
+        f"{compression or 'none':>8}: {n_mb:8.1f} MB  write {write:6.3f}s  "
+        f"read {read:6.3f}s  est. copy {n_mb / bandwidth:7.2f}s"
+    )
+
+
+def main() -> None:
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    bandwidth = float(sys.argv[2]) if len(sys.argv) > 2 else 100.0
+    lines = make_lines(n_records)
+    print(f"{n_records} records, est. copy at an assumed {bandwidth} MB/s")
+    with tempfile.TemporaryDirectory() as directory:
+        for compression in (None, *COMPRESSIONS):
+            if compression == "zstd" and not importlib.util.find_spec("zstandard"):
+                print(f"{compression:>8}: not installed")
+                continue
+            bench(compression, lines, directory, bandwidth)
+
+
+if __name__ == "__main__":
+    main()
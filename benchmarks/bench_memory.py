@@ -0,0 +1,92 @@
+"""Compare the memory used to hold inputs and prepared requests.
+
+Usage:
+    python benchmarks/bench_memory.py [n_records]
+
+Measures, with tracemalloc, the memory held by n_records ModelInputs with and
+without __slots__, and by the prepared requests as a list of request dicts, as
+prepare_requests used to keep them, and as a PreparedRequests of encoded lines.
+The requests are measured once the inputs they were built from are released.
+"""
+
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import List, Optional
+
+from llmbo import ModelInput, PreparedRequests, ToolChoice, serialization
+
+
+@dataclass
+class DictModelInput:
+    """ModelInput as it was before it had __slots__."""
+
+    messages: List[dict]
+    anthropic_version: str = "bedrock-2023-05-31"
+    max_tokens: int = 2000
+    system: Optional[str] = None
+    stop_sequences: Optional[List[str]] = None
+    temperature: Optional[float] = None
+    top_p: Optional[float] = None
+    top_k: Optional[int] = None
+    tools: Optional[List[dict]] = None
+    tool_choice: Optional[ToolChoice] = None
+
+
+def measure(name: str, build) -> None:
+    """Print the memory held by what build returns, and the peak while building."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(
+        f"{name:>28}: {(after - before) / 1024**2:8.1f} MB held, "
+        f"{(peak - before) / 1024**2:8.1f} MB peak"
+    )
+
+
+def make_inputs(cls, n_records: int) -> dict:
+    return {
+        f"{i:08}": cls(
+            messages=[{"role": "user", "content": f"Summarise document {i}"}],
+            system="You are a helpful assistant",
+            temperature=0.2,
+        )
+        for i in range(n_records)
+    }
+
+
+def main() -> None:
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{n_records} records")
+
+    measure("ModelInput with __dict__", lambda: make_inputs(DictModelInput, n_records))
+    measure("ModelInput with __slots__", lambda: make_inputs(ModelInput, n_records))
+
+    def request_dicts():
+        inputs = make_inputs(ModelInput, n_records)
+        return [
+            {"recordId": record_id, "modelInput": model_input.to_dict()}
+            for record_id, model_input in inputs.items()
+        ]
+
+    def prepared_requests():
+        inputs = make_inputs(ModelInput, n_records)
+        return PreparedRequests(
+            serialization.dumps_line(
+                {"recordId": record_id, "modelInput": model_input.to_dict()}
+            )
+            for record_id, model_input in inputs.items()
+        )
+
+    measure("requests as dicts", request_dicts)
+    measure("requests as PreparedRequests", prepared_requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare the JSON backends on preparing and parsing a large batch.
+
+Usage:
+    python benchmarks/bench_serialization.py [n_records]
+
+Times writing every request as a JSONL line, as push_requests_to_s3 does, and
+parsing every line of a results file, as iter_results does, for each installed
+backend.
+"""
+
+import importlib.util
+import sys
+import time
+
+from llmbo import ModelInput, serialization
+
+
+def make_records(n_records: int) -> list:
+    return [
+        {
+            "recordId": f"{i:08}",
+            "modelInput": ModelInput(
+                messages=[
+                    {
+                        "role": "user",
+                        "content": f"Summarise document {i}: " + "lorem ipsum " * 200,
+                    }
+                ],
+                system="You are a helpful assistant",
+                temperature=0.2,
+            ).to_dict(),
+        }
+        for i in range(n_records)
+    ]
+
+
+def bench(name: str, records: list) -> None:
+    serialization.set_backend(name)
+
+    start = time.perf_counter()
+    lines = [serialization.dumps_line(record) for record in records]
+    encode = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for line in lines:
+        serialization.loads(line)
+    decode = time.perf_counter() - start
+
+    n_mb = sum(len(line) for line in lines) / 1024**2
+    print(
+        f"{name:>8}: encode {encode:6.3f}s ({n_mb / encode:7.1f} MB/s)  "
+        f"decode {decode:6.3f}s ({n_mb / decode:7.1f} MB/s)"
+    )
+
+
+def main() -> None:
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = make_records(n_records)
+    print(f"{n_records} records")
+    for name in serialization.BACKENDS:
+        if name == "json" or importlib.util.find_spec(name):
+            bench(name, records)
+        else:
+            print(f"{name:>8}: not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,25 @@
+from .async_inferer import AsyncBatchInferer, AsyncStructuredBatchInferer
+from .cache import DirectoryCache, ResponseCache, SQLiteCache, request_key
+from .clients import ClientPool
+from .estimate import Estimate
+from .fleet import JobFleet
+from .hybrid import HybridInferer
+from .index import ResultIndex
 from .llmbo import (
     BatchInferer,
+    FileRequests,
     Manifest,
     ModelInput,
+    PreparedRequests,
+    PrepareProgress,
+    RequestStream,
+    S3Requests,
     StructuredBatchInferer,
     ToolChoice,
 )
+from .preflight import PreflightCache
+from .sharding import ShardedBatchInferer
+from .state import StateStore
 
 __all__ = [
     "Manifest",
@@ -12,4 +27,23 @@ __all__ = [
     "ModelInput",
     "BatchInferer",
     "StructuredBatchInferer",
+    "RequestStream",
+    "S3Requests",
+    "FileRequests",
+    "PrepareProgress",
+    "PreparedRequests",
+    "ShardedBatchInferer",
+    "JobFleet",
+    "AsyncBatchInferer",
+    "AsyncStructuredBatchInferer",
+    "ResponseCache",
+    "SQLiteCache",
+    "DirectoryCache",
+    "request_key",
+    "StateStore",
+    "HybridInferer",
+    "ClientPool",
+    "PreflightCache",
+    "ResultIndex",
+    "Estimate",
 ]
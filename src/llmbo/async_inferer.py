@@ -0,0 +1,185 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from .llmbo import BatchInferer, ModelInputs, StructuredBatchInferer
+
+
+class AsyncBatchInferer:
+    """An asyncio interface to a BatchInferer.
+
+    Every blocking method of the wrapped BatchInferer is run in an executor and
+    exposed as a coroutine, and poll_progress waits with asyncio.sleep, so a single
+    event loop can drive many batch jobs at once. Attributes such as job_arn,
+    results and manifest are read straight from the wrapped inferer.
+
+    Args:
+        inferer (BatchInferer): The inferer to drive
+        executor (Executor, optional): The executor blocking calls run in. Defaults
+            to the event loop's default executor.
+
+    Example:
+        >>> abi = await AsyncBatchInferer.build(
+        ...     model_name="anthropic.claude-3-haiku-20240307-v1:0",
+        ...     bucket_name="my-inference-bucket",
+        ...     region="us-east-1",
+        ...     job_name="batch-job-2024-01-01",
+        ...     role_arn="arn:aws:iam::123456789012:role/BedrockBatchRole",
+        ... )
+        >>> results = await abi.auto(inputs)
+    """
+
+    _inferer_cls: Type[BatchInferer] = BatchInferer
+    logger = logging.getLogger(f"{__name__}.AsyncBatchInferer")
+
+    def __init__(self, inferer: BatchInferer, executor: Optional[Executor] = None):
+        self.inferer = inferer
+        self.executor = executor
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes not found on this wrapper
+        if name == "inferer":
+            raise AttributeError(name)
+        return getattr(self.inferer, name)
+
+    @staticmethod
+    async def _run_in_executor(
+        executor: Optional[Executor], func: Callable, *args, **kwargs
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        return await self._run_in_executor(self.executor, func, *args, **kwargs)
+
+    @classmethod
+    async def build(
+        cls, *args, executor: Optional[Executor] = None, **kwargs
+    ) -> "AsyncBatchInferer":
+        """Create the wrapped inferer without blocking the event loop.
+
+        Args:
+            *args: Passed to the inferer's constructor
+            executor (Executor, optional): The executor blocking calls run in
+            **kwargs: Passed to the inferer's constructor
+
+        Returns:
+            AsyncBatchInferer: The wrapped inferer
+        """
+        inferer = await cls._run_in_executor(
+            executor, cls._inferer_cls, *args, **kwargs
+        )
+        return cls(inferer, executor=executor)
+
+    async def prepare_requests(self, inputs: ModelInputs, **kwargs) -> None:
+        """See BatchInferer.prepare_requests."""
+        await self._run(self.inferer.prepare_requests, inputs, **kwargs)
+
+    async def push_requests_to_s3(self, **kwargs) -> Dict[str, Any]:
+        """See BatchInferer.push_requests_to_s3."""
+        return await self._run(self.inferer.push_requests_to_s3, **kwargs)
+
+    async def create(self) -> Dict[str, Any]:
+        """See BatchInferer.create."""
+        return await self._run(self.inferer.create)
+
+    async def check_complete(self) -> Optional[str]:
+        """See BatchInferer.check_complete."""
+        return await self._run(self.inferer.check_complete)
+
+    async def poll_progress(self, poll_interval_seconds: int = 60) -> bool:
+        """Poll the progress of the job without blocking the event loop.
+
+        Args:
+            poll_interval_seconds (int, optional): Number of seconds between checks. Defaults to 60.
+
+        Returns:
+            bool: True if job is complete.
+        """
+        self.logger.info(f"Polling for progress every {poll_interval_seconds} seconds")
+        while not await self.check_complete():
+            await asyncio.sleep(poll_interval_seconds)
+        return True
+
+    async def download_results(self, *args, **kwargs) -> None:
+        """See BatchInferer.download_results."""
+        await self._run(self.inferer.download_results, *args, **kwargs)
+
+    async def load_results(self, *args, **kwargs) -> None:
+        """See BatchInferer.load_results."""
+        await self._run(self.inferer.load_results, *args, **kwargs)
+
+    async def invoke_realtime(self, **kwargs) -> None:
+        """See BatchInferer.invoke_realtime."""
+        await self._run(self.inferer.invoke_realtime, **kwargs)
+
+    async def retry_failed(self, **kwargs) -> List[str]:
+        """See BatchInferer.retry_failed."""
+        return await self._run(self.inferer.retry_failed, **kwargs)
+
+    async def cancel_batch(self) -> None:
+        """See BatchInferer.cancel_batch."""
+        await self._run(self.inferer.cancel_batch)
+
+    async def auto(self, inputs: ModelInputs) -> List[dict]:
+        """Execute the complete batch inference workflow without blocking the event loop.
+
+        Args:
+            inputs (ModelInputs): Dictionary of record IDs mapped to their ModelInput
+                configurations, or an iterable of (record_id, ModelInput) pairs
+
+        Returns:
+            List[dict]: The results of the batch inference job
+
+        Note:
+            - Runs the same steps as BatchInferer.auto, each through the coroutine
+              of the same name, so polling doesn't hold a thread
+        """
+        for method, args in self.inferer._auto_steps(inputs):
+            await getattr(self, method)(*args)
+        return self.inferer.results
+
+    @classmethod
+    async def recover_details_from_job_arn(
+        cls, job_arn: str, region: str, executor: Optional[Executor] = None
+    ) -> "AsyncBatchInferer":
+        """See BatchInferer.recover_details_from_job_arn."""
+        inferer = await cls._run_in_executor(
+            executor, cls._inferer_cls.recover_details_from_job_arn, job_arn, region
+        )
+        return cls(inferer, executor=executor)
+
+
+class AsyncStructuredBatchInferer(AsyncBatchInferer):
+    """An asyncio interface to a StructuredBatchInferer.
+
+    See AsyncBatchInferer, the validated instances are available as
+    `instances` once load_results has been awaited.
+    """
+
+    _inferer_cls: Type[BatchInferer] = StructuredBatchInferer
+    logger = logging.getLogger(f"{__name__}.AsyncStructuredBatchInferer")
+
+    @classmethod
+    async def recover_structured_job(
+        cls,
+        job_arn: str,
+        region: str,
+        output_model: Type[BaseModel],
+        executor: Optional[Executor] = None,
+    ) -> "AsyncStructuredBatchInferer":
+        """See StructuredBatchInferer.recover_structured_job."""
+        inferer = await cls._run_in_executor(
+            executor,
+            StructuredBatchInferer.recover_structured_job,
+            job_arn,
+            region,
+            output_model,
+        )
+        return cls(inferer, executor=executor)
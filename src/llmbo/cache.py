@@ -0,0 +1,278 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional, Tuple
+
+from . import serialization
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(model_name: str, model_input: dict) -> str:
+    """A stable hash identifying a request to a model.
+
+    The model input is encoded with sorted keys using the standard library, so the
+    key doesn't depend on dict ordering or which JSON backend is installed.
+
+    Args:
+        model_name (str): The Bedrock model identifier
+        model_input (dict): The request body, e.g. ModelInput.to_dict()
+
+    Returns:
+        str: A hex SHA-256 digest
+    """
+    encoded = json.dumps(
+        [model_name, model_input],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """A store of model outputs keyed by request_key.
+
+    Pass one to a BatchInferer to skip inputs that have already been answered.
+
+    Args:
+        max_entries (int, optional): Evict the least recently used entries beyond
+            this many. Defaults to no limit.
+        max_age_seconds (float, optional): Entries older than this are ignored and
+            evicted. Defaults to no limit.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+
+    def _expired(self, created: float) -> bool:
+        return (
+            self.max_age_seconds is not None
+            and time.time() - created > self.max_age_seconds
+        )
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached model output for key, or None if missing or expired."""
+
+    @abstractmethod
+    def set_many(self, items: Iterable[Tuple[str, dict]]) -> None:
+        """Store (key, model output) pairs, then apply eviction."""
+
+    @abstractmethod
+    def evict(self) -> int:
+        """Remove expired entries, and the least recently used beyond max_entries.
+
+        Returns:
+            int: The number of entries removed
+        """
+
+    def set(self, key: str, model_output: dict) -> None:
+        """Store a model output."""
+        self.set_many([(key, model_output)])
+
+    def flush(self) -> None:
+        """Write anything held back by get(), such as when entries were last used."""
+
+
+class SQLiteCache(ResponseCache):
+    """A response cache in a single SQLite file.
+
+    A hit doesn't write to the database. When each entry was last used is kept in
+    memory and written in one transaction by flush(), which set_many(), evict() and
+    close() call, and get() every FLUSH_EVERY hits.
+
+    Args:
+        path (str): The database file, created if it doesn't exist
+        max_entries (int, optional): Evict the least recently used entries beyond
+            this many. Defaults to no limit.
+        max_age_seconds (float, optional): Entries older than this are ignored and
+            evicted. Defaults to no limit.
+    """
+
+    FLUSH_EVERY = 100_000
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+    ):
+        super().__init__(max_entries=max_entries, max_age_seconds=max_age_seconds)
+        self.path = path
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, output BLOB NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT output, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1]):
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= self.FLUSH_EVERY:
+                self._flush()
+        return serialization.loads(row[0])
+
+    def _flush(self) -> None:
+        """Write the pending access times, with the lock held."""
+        if not self._accessed:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+        self._accessed.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def set_many(self, items: Iterable[Tuple[str, dict]]) -> None:
+        now = time.time()
+        rows = [(key, serialization.dumps(output), now, now) for key, output in items]
+        with self._lock:
+            self._flush()
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", rows
+                )
+        self.evict()
+
+    def evict(self) -> int:
+        removed = 0
+        with self._lock:
+            self._flush()
+        with self._lock, self._connection:
+            if self.max_age_seconds is not None:
+                removed += self._connection.execute(
+                    "DELETE FROM responses WHERE created < ?",
+                    (time.time() - self.max_age_seconds,),
+                ).rowcount
+            if self.max_entries is not None:
+                removed += self._connection.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+        if removed:
+            logger.info(f"Evicted {removed} entries from {self.path}")
+        return removed
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+
+class DirectoryCache(ResponseCache):
+    """A response cache of one JSON file per entry, sharded into subdirectories.
+
+    Entries are spread across subdirectories named by the first two characters of
+    their key, so no single directory grows too large. Suits caches shared over a
+    network file system, where SQLite's locking is unreliable.
+
+    Args:
+        path (str): The root directory, created if it doesn't exist
+        max_entries (int, optional): Evict the least recently used entries beyond
+            this many. Defaults to no limit.
+        max_age_seconds (float, optional): Entries older than this are ignored and
+            evicted. Defaults to no limit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+    ):
+        super().__init__(max_entries=max_entries, max_age_seconds=max_age_seconds)
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as file:
+                entry = serialization.loads(file.read())
+        except FileNotFoundError:
+            return None
+        if self._expired(entry["created"]):
+            return None
+        # the modification time records when the entry was last used
+        os.utime(path)
+        return entry["output"]
+
+    def set_many(self, items: Iterable[Tuple[str, dict]]) -> None:
+        now = time.time()
+        for key, output in items:
+            path = self._entry_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(serialization.dumps({"created": now, "output": output}))
+            os.replace(temporary_path, path)
+        self.evict()
+
+    def _entries(self) -> Dict[str, float]:
+        entries = {}
+        for shard in os.scandir(self.path):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    entries[entry.path] = entry.stat().st_mtime
+        return entries
+
+    def evict(self) -> int:
+        if self.max_entries is None and self.max_age_seconds is None:
+            return 0
+
+        entries = self._entries()
+        stale = set()
+        if self.max_age_seconds is not None:
+            for path in entries:
+                with open(path, "rb") as file:
+                    if self._expired(serialization.loads(file.read())["created"]):
+                        stale.add(path)
+        if self.max_entries is not None:
+            live = sorted(
+                (path for path in entries if path not in stale),
+                key=entries.get,
+                reverse=True,
+            )
+            stale.update(live[self.max_entries :])
+
+        for path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        if stale:
+            logger.info(f"Evicted {len(stale)} entries from {self.path}")
+        return len(stale)
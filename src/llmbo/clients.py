@@ -0,0 +1,106 @@
+import logging
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPool:
+    """A thread-safe cache of boto3 clients, one per service and region.
+
+    Creating a boto3 client resolves endpoints and loads credentials, which is slow
+    enough to matter when hundreds of inferers are created. Clients are thread-safe
+    once created, so every inferer sharing a pool shares its clients and their
+    connection pools. A boto3 Session is not thread-safe, so clients are created
+    under a lock.
+
+    Args:
+        session (boto3.Session, optional): The session clients are created from.
+            Defaults to a new session.
+
+    Example:
+        >>> pool = ClientPool(boto3.Session(profile_name="batch"))
+        >>> inferers = [BatchInferer(..., client_pool=pool) for job_name in job_names]
+    """
+
+    def __init__(self, session: Optional[boto3.Session] = None):
+        self.session = session or boto3.Session()
+        self._clients: Dict[Tuple[str, Optional[str]], object] = {}
+        self._lock = threading.Lock()
+
+    def client(self, service_name: str, region_name: Optional[str] = None):
+        """Get the client for a service and region, creating it on first use.
+
+        Args:
+            service_name (str): e.g. "s3" or "bedrock"
+            region_name (str, optional): Defaults to the session's region
+
+        Returns:
+            A boto3 client
+        """
+        key = (service_name, region_name)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            if key not in self._clients:
+                logger.debug(f"Creating {service_name} client for {region_name}")
+                if region_name:
+                    self._clients[key] = self.session.client(
+                        service_name, region_name=region_name
+                    )
+                else:
+                    self._clients[key] = self.session.client(service_name)
+            return self._clients[key]
+
+    def clear(self) -> None:
+        """Forget every client, e.g. after the session's credentials change."""
+        with self._lock:
+            self._clients.clear()
+
+
+_default_pool: Optional[ClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool() -> ClientPool:
+    """The pool shared by every inferer not given a session or pool of its own."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ClientPool()
+        return _default_pool
+
+
+# kept while an inferer holds the pool, which holds the session, so an id is never
+# reused for a different session while its entry is alive
+_session_pools: "weakref.WeakValueDictionary[int, ClientPool]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def pool_for(session: boto3.Session) -> ClientPool:
+    """The pool shared by every inferer given the same session.
+
+    Args:
+        session (boto3.Session): The session clients are created from
+
+    Returns:
+        ClientPool: The existing pool for the session, or a new one
+    """
+    with _default_pool_lock:
+        pool = _session_pools.get(id(session))
+        if pool is None or pool.session is not session:
+            pool = ClientPool(session)
+            _session_pools[id(session)] = pool
+        return pool
+
+
+def set_default_pool(pool: Optional[ClientPool]) -> None:
+    """Replace the shared pool. Pass None to start a new one on next use."""
+    global _default_pool
+    with _default_pool_lock:
+        _default_pool = pool
@@ -0,0 +1,130 @@
+"""Compressed local copies of request and result files.
+
+Prompts with long documents make request and result files tens of GB. Keeping the
+local copies compressed cuts the disk they use and the time spent writing them,
+and results are decompressed as a stream while they are read.
+
+Bedrock batch inference only reads plain JSONL input (s3InputFormat "JSONL") and
+writes plain JSONL output, so the objects in S3 are always uncompressed. Only the
+local files are compressed. zstd needs `pip install llmbo[zstd]`.
+"""
+
+import gzip
+import io
+import logging
+import shutil
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIONS = ("gzip", "zstd")
+EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def check_compression(compression: Optional[str]) -> None:
+    """Raise if compression isn't None or one of COMPRESSIONS.
+
+    Raises:
+        ValueError: If the compression is not known
+        ImportError: If zstd is asked for and zstandard is not installed
+    """
+    if compression is None:
+        return
+    if compression not in COMPRESSIONS:
+        logger.error(
+            f"Unknown compression {compression}, expected one of {COMPRESSIONS}"
+        )
+        raise ValueError(
+            f"Unknown compression {compression}, expected one of {COMPRESSIONS}"
+        )
+    if compression == "zstd":
+        import zstandard  # noqa: F401
+
+
+def compressed_name(path: str, compression: Optional[str]) -> str:
+    """The file name for path compressed with compression."""
+    return path + EXTENSIONS[compression] if compression else path
+
+
+def from_extension(path: str) -> Optional[str]:
+    """The compression of a file, going by its extension."""
+    for compression, extension in EXTENSIONS.items():
+        if path.endswith(extension):
+            return compression
+    return None
+
+
+def open_write(path: str, compression: Optional[str] = None) -> BinaryIO:
+    """Open a binary file for writing, compressing what is written.
+
+    Args:
+        path (str): The file to write
+        compression (str, optional): "gzip", "zstd", or None for no compression
+
+    Returns:
+        BinaryIO: A file-like object, to be closed when done
+    """
+    if compression == "gzip":
+        # a low level is much faster, and still shrinks JSON by around 5x
+        return gzip.open(path, "wb", compresslevel=3)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=3).stream_writer(
+            open(path, "wb"), closefd=True
+        )
+    return open(path, "wb")
+
+
+def open_read(path: str) -> BinaryIO:
+    """Open a binary file for reading line by line, decompressing as it goes.
+
+    The compression is taken from the file's extension.
+
+    Args:
+        path (str): The file to read
+
+    Returns:
+        BinaryIO: A file-like object, to be closed when done
+    """
+    compression = from_extension(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        import zstandard
+
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), closefd=True
+        )
+        return io.BufferedReader(reader, buffer_size=DEFAULT_CHUNK_SIZE)
+    return open(path, "rb")
+
+
+def download_compressed(
+    s3_client,
+    bucket: str,
+    key: str,
+    path: str,
+    compression: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """Download an S3 object, compressing it as it is written to disk.
+
+    The object is read in a single stream, so the uncompressed file never touches
+    the disk.
+
+    Args:
+        s3_client: A boto3 S3 client
+        bucket (str): The bucket
+        key (str): The object
+        path (str): The local file to write
+        compression (str): "gzip" or "zstd"
+        chunk_size (int, optional): Bytes read at a time. Defaults to 8 MiB.
+    """
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+    try:
+        with open_write(path, compression) as file:
+            shutil.copyfileobj(body, file, chunk_size)
+    finally:
+        body.close()
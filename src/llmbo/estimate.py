@@ -0,0 +1,161 @@
+"""Estimate the tokens and cost of a batch before it is submitted.
+
+Bedrock only reports token counts in the manifest once a job has finished. The
+estimate here is made from the encoded requests instead: input tokens from the
+length of each request line, and output tokens from its max_tokens, which bounds
+what the job can produce. Each line is parsed to read max_tokens, so estimating
+costs about as much as one pass of json decoding over the requests. Counting the whole line, JSON syntax included, slightly
+overestimates the input, which is the safe side for rejecting oversized jobs.
+Base64 encoded images are overestimated by much more.
+
+Pass count_tokens to use a real tokenizer instead.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from . import serialization
+
+logger = logging.getLogger(__name__)
+
+# a little under the ~3.5 to 4 characters per token of English text with Claude
+CHARS_PER_TOKEN = 3.5
+DEFAULT_MAX_TOKENS = 2000
+
+# USD per million (input, output) tokens for batch inference, half the on-demand
+# price. Matched against the model name, so regional prefixes such as "us." work.
+BATCH_PRICES_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "anthropic.claude-3-haiku": (0.125, 0.625),
+    "anthropic.claude-3-5-haiku": (0.4, 2.0),
+    "anthropic.claude-3-sonnet": (1.5, 7.5),
+    "anthropic.claude-3-5-sonnet": (1.5, 7.5),
+    "anthropic.claude-3-7-sonnet": (1.5, 7.5),
+    "anthropic.claude-sonnet-4": (1.5, 7.5),
+    "anthropic.claude-3-opus": (7.5, 37.5),
+    "anthropic.claude-opus-4": (7.5, 37.5),
+}
+
+
+@dataclass
+class Estimate:
+    """The projected size and cost of a batch.
+
+    Attributes:
+        model_name (str): The model the requests are for
+        records (int): The number of requests
+        input_tokens (int): Estimated input tokens across every request
+        max_output_tokens (int): The sum of every request's max_tokens, the most
+            output the batch can produce
+        input_price (float, optional): USD per million input tokens, None if the
+            model's price isn't known
+        output_price (float, optional): USD per million output tokens
+    """
+
+    model_name: str
+    records: int
+    input_tokens: int
+    max_output_tokens: int
+    input_price: Optional[float] = None
+    output_price: Optional[float] = None
+
+    @property
+    def input_cost(self) -> Optional[float]:
+        if self.input_price is None:
+            return None
+        return self.input_tokens * self.input_price / 1_000_000
+
+    @property
+    def max_output_cost(self) -> Optional[float]:
+        if self.output_price is None:
+            return None
+        return self.max_output_tokens * self.output_price / 1_000_000
+
+    @property
+    def max_cost(self) -> Optional[float]:
+        """The most the batch can cost, if every request uses all its max_tokens."""
+        if self.input_cost is None or self.max_output_cost is None:
+            return None
+        return self.input_cost + self.max_output_cost
+
+    def __add__(self, other: "Estimate") -> "Estimate":
+        if other.model_name != self.model_name:
+            raise ValueError("Only estimates for the same model can be added")
+        return Estimate(
+            model_name=self.model_name,
+            records=self.records + other.records,
+            input_tokens=self.input_tokens + other.input_tokens,
+            max_output_tokens=self.max_output_tokens + other.max_output_tokens,
+            input_price=self.input_price,
+            output_price=self.output_price,
+        )
+
+
+def batch_prices(
+    model_name: str, prices: Optional[Dict[str, Tuple[float, float]]] = None
+) -> Tuple[Optional[float], Optional[float]]:
+    """The (input, output) USD per million tokens of a model, or (None, None).
+
+    Args:
+        model_name (str): The Bedrock model identifier
+        prices (Dict[str, Tuple[float, float]], optional): Prices to use instead of
+            BATCH_PRICES_PER_MILLION, keyed by a part of the model name
+    """
+    prices = BATCH_PRICES_PER_MILLION if prices is None else prices
+    # the longest match, so "claude-3-5-haiku" isn't priced as "claude-3-haiku"
+    matches = sorted((key for key in prices if key in model_name), key=len)
+    if not matches:
+        logger.info(f"No price known for {model_name}")
+        return None, None
+    return prices[matches[-1]]
+
+
+def _max_tokens(line: bytes) -> int:
+    # parsed rather than searched for, as the messages may contain "max_tokens" too
+    model_input = serialization.loads(line)["modelInput"]
+    return model_input.get("max_tokens", DEFAULT_MAX_TOKENS)
+
+
+def estimate_lines(
+    model_name: str,
+    lines: Iterable[bytes],
+    prices: Optional[Dict[str, Tuple[float, float]]] = None,
+    count_tokens: Optional[Callable[[bytes], int]] = None,
+) -> Estimate:
+    """Estimate a batch from its encoded JSONL request lines.
+
+    Args:
+        model_name (str): The Bedrock model identifier
+        lines (Iterable[bytes]): Each request encoded as a JSONL line
+        prices (Dict[str, Tuple[float, float]], optional): Prices to use instead of
+            BATCH_PRICES_PER_MILLION
+        count_tokens (Callable[[bytes], int], optional): Counts the input tokens of
+            a request line. Defaults to its length over CHARS_PER_TOKEN.
+
+    Returns:
+        Estimate: The projected tokens and cost
+    """
+    records = input_tokens = max_output_tokens = 0
+    if count_tokens is None:
+        # the length in bytes, which counts multi-byte characters more than once
+        characters = 0
+        for line in lines:
+            records += 1
+            characters += len(line)
+            max_output_tokens += _max_tokens(line)
+        input_tokens = int(characters / CHARS_PER_TOKEN)
+    else:
+        for line in lines:
+            records += 1
+            input_tokens += count_tokens(line)
+            max_output_tokens += _max_tokens(line)
+
+    input_price, output_price = batch_prices(model_name, prices)
+    return Estimate(
+        model_name=model_name,
+        records=records,
+        input_tokens=input_tokens,
+        max_output_tokens=max_output_tokens,
+        input_price=input_price,
+        output_price=output_price,
+    )
@@ -0,0 +1,202 @@
+"""Export batch results to Arrow tables and Parquet files.
+
+Each result is flattened into one row of typed columns: the recordId, the stop
+reason, the token usage, the text content and any error. A StructuredBatchInferer
+adds a column for each field of its output_model. Rows are built a chunk at a time
+from the streamed results file, so exports aren't limited by memory.
+
+Needs pyarrow, `pip install llmbo[arrow]`.
+"""
+
+import datetime
+import logging
+import types
+import typing
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from . import serialization
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50_000
+RESULT_COLUMNS = (
+    "recordId",
+    "stop_reason",
+    "input_tokens",
+    "output_tokens",
+    "text",
+    "error_code",
+    "error_message",
+)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        logger.error("pyarrow is not installed, run `pip install llmbo[arrow]`")
+        raise ImportError(
+            "pyarrow is not installed, run `pip install llmbo[arrow]`"
+        ) from e
+    return pyarrow
+
+
+def result_schema():
+    """The Arrow schema of the columns every result has."""
+    pa = _pyarrow()
+    return pa.schema(
+        [
+            ("recordId", pa.string()),
+            ("stop_reason", pa.string()),
+            ("input_tokens", pa.int64()),
+            ("output_tokens", pa.int64()),
+            ("text", pa.string()),
+            ("error_code", pa.string()),
+            ("error_message", pa.string()),
+        ]
+    )
+
+
+def flatten_result(result: dict) -> Dict[str, Any]:
+    """Flatten one result record into a row of result_schema().
+
+    Args:
+        result (dict): A record from the results file
+
+    Returns:
+        Dict[str, Any]: The row, with None for anything missing
+    """
+    output = result.get("modelOutput") or {}
+    usage = output.get("usage") or {}
+    error = result.get("error") or {}
+    texts = [
+        block["text"]
+        for block in output.get("content") or []
+        if block.get("type") == "text"
+    ]
+    return {
+        "recordId": result.get("recordId"),
+        "stop_reason": output.get("stop_reason"),
+        "input_tokens": usage.get("input_tokens"),
+        "output_tokens": usage.get("output_tokens"),
+        "text": "\n".join(texts) if texts else None,
+        "error_code": str(error["errorCode"]) if "errorCode" in error else None,
+        "error_message": error.get("errorMessage"),
+    }
+
+
+def _to_json(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    return serialization.dumps(value).decode()
+
+
+def _column_type(annotation) -> Tuple[Any, Callable[[Any], Any]]:
+    """The Arrow type of a field, and how to convert its values to it.
+
+    Anything without a direct Arrow equivalent is stored as a JSON string.
+    """
+    pa = _pyarrow()
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return _column_type(args[0])
+    if origin is typing.Literal:
+        values = typing.get_args(annotation)
+        if all(isinstance(value, str) for value in values):
+            return pa.string(), lambda value: value
+    types_ = {
+        str: pa.string(),
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        datetime.datetime: pa.timestamp("us"),
+        datetime.date: pa.date32(),
+    }
+    if annotation in types_:
+        return types_[annotation], lambda value: value
+    return pa.string(), _to_json
+
+
+class OutputModelColumns:
+    """The columns of a StructuredBatchInferer's output_model.
+
+    Args:
+        output_model (BaseModel): The Pydantic model results are validated against
+
+    Raises:
+        ValueError: If a field has the same name as one of RESULT_COLUMNS
+    """
+
+    def __init__(self, output_model: Type[BaseModel]):
+        clashes = set(output_model.model_fields) & set(RESULT_COLUMNS)
+        if clashes:
+            logger.error(
+                f"{output_model.__name__} fields {clashes} clash with result columns"
+            )
+            raise ValueError(
+                f"{output_model.__name__} fields {clashes} clash with result columns"
+            )
+        self.fields = {
+            name: _column_type(field.annotation)
+            for name, field in output_model.model_fields.items()
+        }
+
+    def schema(self):
+        """result_schema() followed by a column for each field."""
+        pa = _pyarrow()
+        return pa.schema(
+            list(result_schema())
+            + [pa.field(name, type_) for name, (type_, _) in self.fields.items()]
+        )
+
+    def row(self, instance: Optional[BaseModel]) -> Dict[str, Any]:
+        """The values of an instance's fields, or None for each if it is None."""
+        return {
+            name: None if instance is None else convert(getattr(instance, name))
+            for name, (_, convert) in self.fields.items()
+        }
+
+
+def record_batches(rows: Iterable[List[Dict[str, Any]]], schema) -> Iterator[Any]:
+    """Build an Arrow RecordBatch from each chunk of rows."""
+    pa = _pyarrow()
+    for chunk in rows:
+        yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+
+def to_table(rows: Iterable[List[Dict[str, Any]]], schema):
+    """Build an Arrow Table from chunks of rows, one RecordBatch per chunk."""
+    pa = _pyarrow()
+    return pa.Table.from_batches(list(record_batches(rows, schema)), schema=schema)
+
+
+def write_parquet(
+    rows: Iterable[List[Dict[str, Any]]], schema, path: str, **kwargs
+) -> int:
+    """Write chunks of rows to a Parquet file, one row group per chunk.
+
+    Args:
+        rows (Iterable[List[dict]]): Chunks of rows matching schema
+        schema (pyarrow.Schema): The columns to write
+        path (str): The file to write
+        **kwargs: Passed to pyarrow.parquet.ParquetWriter, e.g. compression
+
+    Returns:
+        int: The number of rows written
+    """
+    _pyarrow()
+    import pyarrow.parquet as pq
+
+    written = 0
+    with pq.ParquetWriter(path, schema, **kwargs) as writer:
+        for batch in record_batches(rows, schema):
+            writer.write_batch(batch)
+            written += batch.num_rows
+    logger.info(f"Wrote {written} rows to {path}")
+    return written
@@ -0,0 +1,204 @@
+import logging
+import os
+import time
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Union
+
+from . import clients
+from .llmbo import VALID_FINISHED_STATUSES, BatchInferer
+
+Job = Union[BatchInferer, str]
+
+
+class JobFleet:
+    """Monitor many batch inference jobs from a single polling loop.
+
+    Rather than calling get_model_invocation_job for every job on every check, the
+    fleet lists the account's recent jobs with list_model_invocation_jobs, filtered
+    by submit time and name, and reads every tracked job's status from the listing.
+    The interval between checks backs off while nothing changes, and resets as soon
+    as any job changes status.
+
+    Args:
+        region (str): The region the jobs were created in.
+        client (optional): A boto3 bedrock client. Defaults to the shared client for region.
+        on_complete (Callable[[Job, str], None], optional): Called with the job (the
+            BatchInferer if one was added, otherwise the job ARN) and its status as
+            soon as each job finishes.
+        callback_executor (Executor, optional): If given, on_complete is submitted to
+            this executor rather than called inline, so slow work such as downloading
+            results doesn't delay polling the remaining jobs.
+        min_poll_interval_seconds (float, optional): The shortest time between checks. Defaults to 30.
+        max_poll_interval_seconds (float, optional): The longest time between checks. Defaults to 600.
+        backoff_factor (float, optional): How much the interval grows after each check
+            where no job changed status. Defaults to 2.
+
+    Attributes:
+        statuses (Dict[str, str]): The last known status of each job, keyed by job ARN.
+
+    Example:
+        >>> fleet = JobFleet(region="us-east-1", on_complete=lambda bi, status: bi.download_results())
+        >>> for bi in inferers:
+        ...     fleet.add(bi)
+        >>> fleet.poll_progress()
+    """
+
+    logger = logging.getLogger(f"{__name__}.JobFleet")
+
+    def __init__(
+        self,
+        region: str,
+        client=None,
+        on_complete: Optional[Callable[[Job, str], None]] = None,
+        callback_executor: Optional[Executor] = None,
+        min_poll_interval_seconds: float = 30,
+        max_poll_interval_seconds: float = 600,
+        backoff_factor: float = 2,
+    ):
+        self.client = client or clients.default_pool().client(
+            "bedrock", region_name=region
+        )
+        self.on_complete = on_complete
+        self.callback_executor = callback_executor
+        self.min_poll_interval_seconds = min_poll_interval_seconds
+        self.max_poll_interval_seconds = max_poll_interval_seconds
+        self.backoff_factor = backoff_factor
+
+        self.statuses: Dict[str, Optional[str]] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._names: Dict[str, str] = {}
+        self._submit_times: Dict[str, datetime] = {}
+
+    def add(self, job: Job) -> None:
+        """Start tracking a job.
+
+        Args:
+            job (Job): A BatchInferer which has created its job, or a job ARN
+
+        Raises:
+            ValueError: If a BatchInferer has no job_arn
+        """
+        if isinstance(job, BatchInferer):
+            if not job.job_arn:
+                self.logger.error("Job ARN not set")
+                raise ValueError("Job ARN not set")
+            job_arn = job.job_arn
+            self._names[job_arn] = job.job_name
+            status = job.job_status
+        else:
+            job_arn = job
+            status = None
+
+        self._jobs[job_arn] = job
+        self.statuses[job_arn] = status
+
+    @property
+    def pending(self) -> List[str]:
+        """The ARNs of every tracked job that hasn't finished."""
+        return [
+            job_arn
+            for job_arn, status in self.statuses.items()
+            if status not in VALID_FINISHED_STATUSES
+        ]
+
+    def _describe(self, job_arn: str) -> str:
+        response = self.client.get_model_invocation_job(jobIdentifier=job_arn)
+        self._names[job_arn] = response["jobName"]
+        self._submit_times[job_arn] = response["submitTime"]
+        return response["status"]
+
+    def _list_statuses(self, job_arns: List[str]) -> Dict[str, str]:
+        """Find the status of jobs with as few API calls as possible.
+
+        Jobs whose submit time isn't known yet are described individually, once.
+        The rest are read from a single filtered listing.
+        """
+        statuses = {
+            job_arn: self._describe(job_arn)
+            for job_arn in job_arns
+            if job_arn not in self._submit_times
+        }
+
+        listed = [job_arn for job_arn in job_arns if job_arn not in statuses]
+        if not listed:
+            return statuses
+
+        filters = {
+            # submitTimeAfter is exclusive, so step back a moment
+            "submitTimeAfter": min(self._submit_times[job_arn] for job_arn in listed)
+            - timedelta(seconds=1)
+        }
+        if prefix := os.path.commonprefix([self._names[job_arn] for job_arn in listed]):
+            filters["nameContains"] = prefix
+
+        wanted = set(listed)
+        paginator = self.client.get_paginator("list_model_invocation_jobs")
+        for page in paginator.paginate(**filters):
+            for summary in page["invocationJobSummaries"]:
+                if summary["jobArn"] in wanted:
+                    statuses[summary["jobArn"]] = summary["status"]
+
+        # anything the listing missed falls back to describing the job
+        for job_arn in wanted.difference(statuses):
+            statuses[job_arn] = self._describe(job_arn)
+
+        return statuses
+
+    def _notify(self, job_arn: str, status: str) -> None:
+        job = self._jobs[job_arn]
+        if isinstance(job, BatchInferer):
+            job.job_status = status
+        if not self.on_complete:
+            return
+        if self.callback_executor:
+            self.callback_executor.submit(self.on_complete, job, status)
+        else:
+            self.on_complete(job, status)
+
+    def check(self) -> List[str]:
+        """Check the status of every pending job once.
+
+        Fires on_complete for each job that has finished since the last check.
+
+        Returns:
+            List[str]: The ARNs of the jobs whose status changed
+        """
+        pending = self.pending
+        if not pending:
+            return []
+
+        self.logger.info(f"Checking status of {len(pending)} jobs")
+        changed = []
+        for job_arn, status in self._list_statuses(pending).items():
+            if status == self.statuses[job_arn]:
+                continue
+            self.logger.info(f"Job {job_arn} status is {status}")
+            self.statuses[job_arn] = status
+            changed.append(job_arn)
+            if status in VALID_FINISHED_STATUSES:
+                self._notify(job_arn, status)
+        return changed
+
+    def poll_progress(self) -> bool:
+        """Poll every tracked job until all of them have finished.
+
+        Returns:
+            bool: True when every job is complete.
+        """
+        interval = None
+        while True:
+            changed = self.check()
+            if not self.pending:
+                return True
+
+            if changed or interval is None:
+                interval = self.min_poll_interval_seconds
+            else:
+                interval = min(
+                    interval * self.backoff_factor, self.max_poll_interval_seconds
+                )
+            self.logger.info(
+                f"{len(self.pending)} jobs pending, next check in {interval} seconds"
+            )
+            time.sleep(interval)
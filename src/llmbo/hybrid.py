@@ -0,0 +1,249 @@
+import logging
+import math
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+from .llmbo import MIN_BATCH_SIZE, BatchInferer, ModelInput, ModelInputs
+from .realtime import DEFAULT_MAX_WORKERS
+
+
+class HybridInferer:
+    """Split work between a batch job and realtime invocation to meet a deadline.
+
+    Batch jobs are half the price of realtime invocation, but can wait hours to be
+    scheduled. Given a deadline, the bulk of the inputs go through a batch job, while
+    a slice of them runs straight away through invoke_model. If the job hasn't
+    finished shortly before the deadline it is stopped, and every record it hadn't
+    produced a result for is run in realtime instead. Results are merged by recordId.
+
+    Args:
+        inferer (BatchInferer): The inferer which runs the batch job. Its settings,
+            e.g. a StructuredBatchInferer's output_model, apply to both paths.
+        deadline (datetime): When every result is needed by
+        realtime_fraction (float, optional): The share of inputs to run in realtime
+            from the start. Defaults to 0.
+        realtime_margin_seconds (float, optional): How long before the deadline to
+            give up on the batch job. Allow enough time to run the whole batch in
+            realtime. Defaults to 3600.
+        max_workers (int, optional): The most realtime requests in flight. Defaults to 8.
+        max_requests_per_second (float, optional): Limit on the rate realtime requests
+            are started at. Defaults to no limit.
+        poll_interval_seconds (float, optional): Seconds between checks on the batch
+            job. Defaults to 60.
+        stop_grace_seconds (float, optional): How long to wait for a stopped job to
+            finish stopping, after which its results are downloaded. If it takes
+            longer, every record is run in realtime. Taken from the realtime margin,
+            so allow for it there. Defaults to 300.
+
+    Attributes:
+        results (List[dict]): Every result, sorted by recordId. Available after run().
+        instances (List[dict]): The matching validated instances, if the inferer is
+            a StructuredBatchInferer. Available after run().
+        realtime_record_ids (List[str]): The records which were run in realtime.
+
+    Example:
+        >>> hybrid = HybridInferer(bi, deadline=datetime.now() + timedelta(hours=6))
+        >>> results = hybrid.run(inputs)
+    """
+
+    logger = logging.getLogger(f"{__name__}.HybridInferer")
+
+    def __init__(
+        self,
+        inferer: BatchInferer,
+        deadline: datetime,
+        realtime_fraction: float = 0,
+        realtime_margin_seconds: float = 60 * 60,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_requests_per_second: Optional[float] = None,
+        poll_interval_seconds: float = 60,
+        stop_grace_seconds: float = 5 * 60,
+    ):
+        if not 0 <= realtime_fraction <= 1:
+            self.logger.error("realtime_fraction must be between 0 and 1")
+            raise ValueError("realtime_fraction must be between 0 and 1")
+
+        self.inferer = inferer
+        self.deadline = deadline
+        self.realtime_fraction = realtime_fraction
+        self.realtime_margin_seconds = realtime_margin_seconds
+        self.max_workers = max_workers
+        self.max_requests_per_second = max_requests_per_second
+        self.poll_interval_seconds = poll_interval_seconds
+        self.stop_grace_seconds = stop_grace_seconds
+
+        self.results: Optional[List[dict]] = None
+        self.instances: Optional[List[dict]] = None
+        self.realtime_record_ids: List[str] = []
+
+    def _seconds_to_cutoff(self) -> float:
+        remaining = (self.deadline - datetime.now(self.deadline.tzinfo)).total_seconds()
+        return remaining - self.realtime_margin_seconds
+
+    def _split(self, inputs: Dict[str, ModelInput]) -> int:
+        """The number of inputs, taken from the end, to run in realtime."""
+        count = math.ceil(len(inputs) * self.realtime_fraction)
+        if len(inputs) - count < MIN_BATCH_SIZE or self._seconds_to_cutoff() <= 0:
+            # too few left for a batch job, or no time to wait for one
+            return len(inputs)
+        return count
+
+    def _invoke(self, job_name: str, inputs: Dict[str, ModelInput]) -> BatchInferer:
+        inferer = self.inferer._spawn(job_name)
+        inferer.realtime = True
+        inferer.prepare_requests(inputs)
+        if inferer.requests:
+            inferer.invoke_realtime(
+                max_workers=self.max_workers,
+                max_requests_per_second=self.max_requests_per_second,
+            )
+        else:
+            inferer.load_results()
+        return inferer
+
+    def _wait_for_batch(self) -> bool:
+        """Poll the batch job until it finishes or the cutoff passes."""
+        while not self.inferer.check_complete():
+            remaining = self._seconds_to_cutoff()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval_seconds, remaining))
+        return True
+
+    def _wait_for_stop(self) -> bool:
+        """Poll the stopped job until Bedrock reports it finished, or the grace ends.
+
+        A job keeps Stopping for a while after it is asked to stop, and only writes
+        its output once it has Stopped.
+        """
+        give_up = time.monotonic() + self.stop_grace_seconds
+        while True:
+            # cancel_batch() marks the job Stopped as soon as it is asked to stop,
+            # so clear it to ask Bedrock for the real status
+            self.inferer.job_status = None
+            if self.inferer.check_complete():
+                return True
+            remaining = give_up - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval_seconds, remaining))
+
+    def _load_stopped_batch(self) -> None:
+        """Load whatever results a stopped job managed to write."""
+        if not self._wait_for_stop():
+            self.logger.info(
+                f"Job {self.inferer.job_arn} is still {self.inferer.job_status}, "
+                "not waiting for its results"
+            )
+            self.inferer.results = []
+            if hasattr(self.inferer, "instances"):
+                self.inferer.instances = []
+            return
+        try:
+            self.inferer.download_results()
+            self.inferer.load_results()
+        except (ClientError, FileExistsError) as e:
+            self.logger.info(f"No results from the stopped job: {str(e)}")
+            self.inferer.results = []
+            if hasattr(self.inferer, "instances"):
+                self.inferer.instances = []
+
+    @staticmethod
+    def _pairs(inferer: BatchInferer) -> List[tuple]:
+        instances = getattr(inferer, "instances", None) or [None] * len(inferer.results)
+        return list(zip(inferer.results, instances))
+
+    def run(self, inputs: ModelInputs) -> List[dict]:
+        """Run every input, by batch job or realtime, and merge the results.
+
+        Args:
+            inputs (ModelInputs): Dictionary of record IDs mapped to their ModelInput
+                configurations, or an iterable of (record_id, ModelInput) pairs
+
+        Returns:
+            List[dict]: Every result, sorted by recordId
+        """
+        inputs = dict(inputs.items() if isinstance(inputs, Mapping) else inputs)
+        realtime_count = self._split(inputs)
+        record_ids = list(inputs)
+        batch_ids = record_ids[: len(record_ids) - realtime_count]
+        realtime_ids = record_ids[len(record_ids) - realtime_count :]
+        self.logger.info(
+            f"Running {len(batch_ids)} records by batch job, {len(realtime_ids)} in realtime"
+        )
+
+        merged = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            realtime = None
+            if realtime_ids:
+                realtime = executor.submit(
+                    self._invoke,
+                    f"{self.inferer.job_name}-realtime",
+                    {record_id: inputs[record_id] for record_id in realtime_ids},
+                )
+
+            if batch_ids:
+                self.inferer.prepare_requests(
+                    {record_id: inputs[record_id] for record_id in batch_ids}
+                )
+                if self.inferer.requests and self.inferer.use_realtime:
+                    self.inferer.invoke_realtime(
+                        max_workers=self.max_workers,
+                        max_requests_per_second=self.max_requests_per_second,
+                    )
+                elif self.inferer.requests:
+                    self.inferer.push_requests_to_s3()
+                    self.inferer.create()
+                    if self._wait_for_batch():
+                        self.inferer.download_results()
+                        self.inferer.load_results()
+                    else:
+                        self.logger.info(
+                            f"Job {self.inferer.job_arn} didn't finish in time, stopping it"
+                        )
+                        self.inferer.cancel_batch()
+                        self._load_stopped_batch()
+                else:
+                    self.inferer.load_results()
+
+                batch = [
+                    pair
+                    for pair in self._pairs(self.inferer)
+                    if pair[0].get("modelOutput") and not pair[0].get("error")
+                ]
+                finished = {result["recordId"] for result, _ in batch}
+                pending = [
+                    record_id for record_id in batch_ids if record_id not in finished
+                ]
+                # only a job which stopped short leaves records to run again
+                stopped_short = (
+                    self.inferer.job_arn and self.inferer.job_status != "Completed"
+                )
+                if pending and stopped_short:
+                    self.logger.info(
+                        f"Running {len(pending)} pending records in realtime"
+                    )
+                    late = self._invoke(
+                        f"{self.inferer.job_name}-late",
+                        {record_id: inputs[record_id] for record_id in pending},
+                    )
+                    merged.extend(self._pairs(late))
+                    self.realtime_record_ids.extend(pending)
+                    merged.extend(batch)
+                else:
+                    merged.extend(self._pairs(self.inferer))
+
+            if realtime:
+                merged.extend(self._pairs(realtime.result()))
+                self.realtime_record_ids.extend(realtime_ids)
+
+        merged.sort(key=lambda pair: pair[0]["recordId"])
+        self.results = [result for result, _ in merged]
+        if hasattr(self.inferer, "instances"):
+            self.instances = [instance for _, instance in merged]
+        return self.results
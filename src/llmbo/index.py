@@ -0,0 +1,173 @@
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from . import serialization
+
+logger = logging.getLogger(__name__)
+
+# most lines have one recordId, at the top level; anything else is parsed in full
+_RECORD_ID = re.compile(rb'"recordId"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_INSERT_BATCH_SIZE = 10_000
+
+
+def _record_id(line: bytes) -> str:
+    matches = _RECORD_ID.findall(line)
+    if len(matches) == 1 and b"\\" not in matches[0]:
+        return matches[0].decode("utf-8")
+    return serialization.loads(line)["recordId"]
+
+
+def _scan(path: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield the recordId, offset and length of each line of a JSONL file."""
+    offset = 0
+    with open(path, "rb") as file:
+        for line in file:
+            if line.strip():
+                yield _record_id(line), offset, len(line)
+            offset += len(line)
+
+
+class ResultIndex:
+    """An on-disk index from recordId to the line holding its result.
+
+    Looking up one result otherwise means parsing the whole results file. The
+    index is a SQLite table of (recordId, offset, length), and the results file is
+    memory mapped, so a lookup reads and parses only the one line it needs. The
+    index is kept next to the results file and reused until the file changes.
+
+    Only uncompressed results files can be indexed, as a compressed stream can't
+    be read from an arbitrary offset.
+
+    Args:
+        results_path (str): The JSONL results file, e.g. BatchInferer.output_file_name
+        index_path (str): The index database file, built with ResultIndex.build
+
+    Example:
+        >>> index = ResultIndex.open_or_build("job_out.jsonl", "job_out.index.db")
+        >>> index.get("record-001")["modelOutput"]
+    """
+
+    def __init__(self, results_path: str, index_path: str):
+        self.results_path = results_path
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(index_path, check_same_thread=False)
+        self._file = open(results_path, "rb")
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.path.getsize(results_path)
+            else None
+        )
+
+    @classmethod
+    def build(cls, results_path: str, index_path: str) -> "ResultIndex":
+        """Index every line of a results file, replacing any existing index.
+
+        Args:
+            results_path (str): The uncompressed JSONL results file
+            index_path (str): The index database file to write
+
+        Returns:
+            ResultIndex: The new index, open for lookups
+        """
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        connection = sqlite3.connect(index_path)
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE records (record_id TEXT PRIMARY KEY, "
+                    "offset INTEGER NOT NULL, length INTEGER NOT NULL) WITHOUT ROWID"
+                )
+                connection.execute(
+                    "CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+                )
+                entries = _scan(results_path)
+                count = 0
+                while batch := list(islice(entries, _INSERT_BATCH_SIZE)):
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO records VALUES (?, ?, ?)", batch
+                    )
+                    count += len(batch)
+                connection.execute(
+                    "INSERT INTO meta VALUES ('size', ?)",
+                    (os.path.getsize(results_path),),
+                )
+        finally:
+            connection.close()
+        logger.info(f"Indexed {count} results from {results_path} in {index_path}")
+        return cls(results_path, index_path)
+
+    @classmethod
+    def open_or_build(cls, results_path: str, index_path: str) -> "ResultIndex":
+        """Open an existing index, building it if it is missing or out of date.
+
+        Args:
+            results_path (str): The uncompressed JSONL results file
+            index_path (str): The index database file
+
+        Returns:
+            ResultIndex: The index, open for lookups
+        """
+        if os.path.isfile(index_path):
+            index = cls(results_path, index_path)
+            if index._indexed_size() == os.path.getsize(results_path):
+                return index
+            logger.info(f"{results_path} has changed since it was indexed")
+            index.close()
+        return cls.build(results_path, index_path)
+
+    def _indexed_size(self) -> Optional[int]:
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT value FROM meta WHERE key = 'size'"
+                ).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return row[0] if row else None
+
+    def get_line(self, record_id: str) -> Optional[bytes]:
+        """The raw JSONL line of a result, or None if the recordId isn't indexed."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT offset, length FROM records WHERE record_id = ?", (record_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        offset, length = row
+        return self._map[offset : offset + length]
+
+    def get(self, record_id: str) -> Optional[dict]:
+        """The parsed result of a recordId, or None if it isn't indexed."""
+        line = self.get_line(record_id)
+        return None if line is None else serialization.loads(line)
+
+    def get_many(self, record_ids: Iterable[str]) -> List[Optional[dict]]:
+        """The results of several recordIds, in the same order, None where missing."""
+        return [self.get(record_id) for record_id in record_ids]
+
+    def __contains__(self, record_id: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM records WHERE record_id = ?", (record_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[
+                0
+            ]
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+        self._connection.close()
@@ -1,16 +1,56 @@
-import json
+import copy
 import logging
 import os
 import time
-from dataclasses import dataclass
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional, Type
+from itertools import chain, islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from uuid import uuid4
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+
+from . import clients, export, preflight, serialization
+from .cache import ResponseCache, request_key
+from .compression import (
+    check_compression,
+    compressed_name,
+    download_compressed,
+    open_read,
+    open_write,
+)
+from .estimate import Estimate, estimate_lines
+from .index import ResultIndex
+from .realtime import DEFAULT_MAX_WORKERS, invoke_records
+from .state import STAGES, StateStore
+from .transfer import (
+    DEFAULT_DOWNLOAD_CONFIG,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PART_SIZE,
+    stream_lines_to_s3,
+)
+
+if TYPE_CHECKING:
+    import pyarrow
 
 logger = logging.getLogger(__name__)
 
@@ -25,13 +65,32 @@ class Manifest:
     outputTokenCount: Optional[int]
 
 
+@dataclass
+class PrepareProgress:
+    """Progress of request preparation, passed to prepare_requests' progress_callback.
+
+    Attributes:
+        records (int): The number of requests prepared so far
+        elapsed_seconds (float): Seconds since preparation started
+        done (bool): True for the final report, once every request is prepared
+    """
+
+    records: int
+    elapsed_seconds: float
+    done: bool = False
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
 @dataclass
 class ToolChoice:
     type: Literal["any", "tool", "auto"]
     name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ModelInput:
     """Configuration class for AWS Bedrock model inputs.
 
@@ -51,6 +110,10 @@ class ModelInput:
         top_k (Optional[int]): Top-k sampling parameter
         tools (Optional[List[dict]]): Tool definitions for structured outputs
         tool_choice (Optional[ToolChoice]): Tool selection configuration
+
+    Note:
+        Instances have __slots__ rather than a __dict__, which saves around 100
+        bytes each when millions of inputs are held at once.
     """
 
     # These are required
@@ -68,16 +131,212 @@ class ModelInput:
     tool_choice: Optional[ToolChoice] = None
 
     def to_dict(self):
-        result = {k: v for k, v in self.__dict__.items() if v is not None}
+        result = {}
+        # fields() rather than __slots__, which only lists this class's own fields
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value is not None:
+                result[field.name] = value
         if self.tool_choice:
             result["tool_choice"] = self.tool_choice.__dict__
         return result
 
     def to_json(self):
-        return json.dumps(self.to_dict())
+        return serialization.dumps(self.to_dict()).decode("utf-8")
 
 
 VALID_FINISHED_STATUSES = ["Completed", "Failed", "Stopped", "Expired"]
+MIN_BATCH_SIZE = 100
+DEFAULT_PROGRESS_INTERVAL = 100_000
+
+# Either a mapping of record IDs to inputs, or any iterable of (record_id, input) pairs
+ModelInputs = Union[Mapping[str, ModelInput], Iterable[Tuple[str, ModelInput]]]
+
+
+class PreparedRequests(Sequence):
+    """Prepared requests held as encoded JSONL lines rather than nested dicts.
+
+    Created by BatchInferer.prepare_requests when it is given a mapping. A request
+    dict costs several times its encoded size in Python object overhead, and every
+    request is encoded for upload anyway, so each is encoded once up front and the
+    bytes are kept instead. Indexing or iterating decodes the requests back into
+    dicts, while uploads use the lines as they are.
+
+    Args:
+        lines (Iterable[bytes]): Each request encoded as a JSONL line
+    """
+
+    __slots__ = ("_lines",)
+
+    def __init__(self, lines: Iterable[bytes] = ()):
+        self._lines: List[bytes] = [self._compact(line) for line in lines]
+
+    @staticmethod
+    def _compact(line: bytes) -> bytes:
+        # orjson's output keeps its whole write buffer, several KB, so keep a copy
+        # sized to the line instead
+        return bytes(memoryview(line))
+
+    @classmethod
+    def _wrap(cls, lines: List[bytes]) -> "PreparedRequests":
+        """Hold lines which are already compact, without copying them."""
+        requests = cls()
+        requests._lines = lines
+        return requests
+
+    def append_line(self, line: bytes) -> None:
+        """Add a request, already encoded as a JSONL line, to the end."""
+        self._lines.append(self._compact(line))
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PreparedRequests._wrap(self._lines[index])
+        return serialization.loads(self._lines[index])
+
+    def __iter__(self) -> Iterator[dict]:
+        for line in self._lines:
+            yield serialization.loads(line)
+
+    def __eq__(self, other) -> bool:
+        # compares equal to the list of request dicts it replaces
+        if isinstance(other, PreparedRequests):
+            return self._lines == other._lines
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PreparedRequests({len(self._lines)} requests, {self.nbytes} bytes)"
+
+    @property
+    def nbytes(self) -> int:
+        """The total size of the encoded requests."""
+        return sum(len(line) for line in self._lines)
+
+    def lines(self) -> Iterator[bytes]:
+        """Yield each request as its encoded JSONL line."""
+        return iter(self._lines)
+
+
+class RequestStream:
+    """A single pass stream of prepared requests.
+
+    Created by BatchInferer.prepare_requests when it is given an iterable rather than a
+    mapping. Requests are only built as the stream is consumed, normally while it is
+    being uploaded, so the full batch is never held in memory.
+
+    Attributes:
+        record_count (int): The number of records yielded so far. This is the total
+            number of records once the stream has been consumed.
+    """
+
+    def __init__(self, head: List[dict], tail: Iterator[dict]):
+        self._head = head
+        self._tail = tail
+        self._consumed = False
+        self.record_count = 0
+
+    def __iter__(self) -> Iterator[dict]:
+        if self._consumed:
+            raise RuntimeError(
+                "RequestStream has already been consumed, prepare the requests again"
+            )
+        self._consumed = True
+        head, self._head = self._head, []
+        for record in head:
+            self.record_count += 1
+            yield record
+        for record in self._tail:
+            self.record_count += 1
+            yield record
+
+
+def _stream_jsonl_object(s3_client, bucket: str, key: str) -> Iterator[dict]:
+    """Parse a JSONL object in S3 line by line, without downloading it first."""
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+    try:
+        for line in body.iter_lines(chunk_size=1024 * 1024):
+            if line.strip():
+                yield serialization.loads(line)
+    finally:
+        body.close()
+
+
+class S3Requests:
+    """Prepared requests read lazily from a job's input file in S3.
+
+    Used as the requests of a recovered job. Nothing is read when it is created, and
+    each iteration streams the file from S3 again, so it costs no memory until the
+    requests are needed and then only one record at a time.
+
+    Args:
+        s3_client: A boto3 S3 client
+        bucket (str): The bucket holding the input file
+        key (str): The key of the input file
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+
+    def __iter__(self) -> Iterator[dict]:
+        return _stream_jsonl_object(self.s3_client, self.bucket, self.key)
+
+    def __repr__(self) -> str:
+        return f"S3Requests('s3://{self.bucket}/{self.key}')"
+
+
+class FileRequests:
+    """Prepared requests read lazily from a local JSONL file of encoded requests.
+
+    Used by ShardedBatchInferer for each shard once it is full, so only the shards
+    still being filled are held in memory. The file is the one the shard uploads,
+    so it isn't written again, and each iteration reads it from disk.
+
+    Args:
+        path (str): The JSONL file
+        count (int): The number of requests in the file
+    """
+
+    def __init__(self, path: str, count: int):
+        self.path = path
+        self.count = count
+
+    @classmethod
+    def write(cls, path: str, lines: Iterable[bytes]) -> "FileRequests":
+        """Write encoded request lines to a file, and read them back from it."""
+        count = 0
+        with open(path, "wb") as file:
+            for line in lines:
+                file.write(line)
+                count += 1
+        return cls(path, count)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[dict]:
+        for line in self.lines():
+            yield serialization.loads(line)
+
+    def __repr__(self) -> str:
+        return f"FileRequests('{self.path}', {self.count} requests)"
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the file."""
+        return os.path.getsize(self.path)
+
+    def lines(self) -> Iterator[bytes]:
+        """Yield each request as its encoded JSONL line."""
+        with open(self.path, "rb") as file:
+            for line in file:
+                if line.strip():
+                    yield line
 
 
 class BatchInferer:
@@ -93,12 +352,39 @@ class BatchInferer:
         job_name (str): A unique name for the batch inference job
         role_arn (str): The AWS IAM role ARN with necessary permissions
         time_out_duration_hours (int, optional): Maximum job runtime in hours. Defaults to 24.
+        cache (ResponseCache, optional): A cache of earlier responses. Cached inputs are
+            not sent to Bedrock. Defaults to None.
+        deduplicate (bool, optional): Send identical inputs only once. Defaults to False.
+        state_store (StateStore, optional): Where to record each completed stage, so the
+            job can be resumed. Defaults to None.
+        realtime (bool, optional): Run every request through invoke_model rather than
+            a batch job. Defaults to False.
+        realtime_fallback (bool, optional): Run batches smaller than Bedrock's minimum
+            through invoke_model rather than rejecting them. Defaults to False.
+        session (boto3.Session, optional): The session to create clients from.
+            Defaults to the session of the shared client pool.
+        client_pool (ClientPool, optional): Where to get boto3 clients from. Defaults
+            to the pool shared by inferers given the same session, if one is given,
+            otherwise the shared pool.
+        skip_preflight (bool, optional): Don't check the bucket and role exist.
+            Defaults to False.
+        preflight_cache (PreflightCache, optional): Where to remember passing checks.
+            Defaults to the shared in-memory cache.
+        compression (str, optional): Keep local request and result files compressed,
+            "gzip" or "zstd". Defaults to None.
 
     Attributes:
         job_arn (str): The ARN of the created batch inference job
         results (List[dict]): The results of the batch inference job. Available after job completion.
         manifest (Manifest): Job execution statistics. Available after job completion.
         job_status (str): Current status of the batch job. One of VALID_FINISHED_STATUSES.
+        cached_results (Dict[str, dict]): Results found in the cache, keyed by recordId.
+            Available after prepare_requests.
+        duplicates (Dict[str, str]): The recordId of each duplicate input mapped to the
+            recordId of the request sent in its place. Available after prepare_requests.
+        stage (str): The last stage completed, one of STAGES, or None.
+        use_realtime (bool): Whether the prepared requests will be run through
+            invoke_model. Available after prepare_requests.
     """
 
     logger = logging.getLogger(f"{__name__}.BatchInferer")
@@ -111,6 +397,16 @@ class BatchInferer:
         job_name: str,
         role_arn: str,
         time_out_duration_hours: int = 24,
+        cache: Optional[ResponseCache] = None,
+        deduplicate: bool = False,
+        state_store: Optional[StateStore] = None,
+        realtime: bool = False,
+        realtime_fallback: bool = False,
+        session: Optional[boto3.Session] = None,
+        client_pool: Optional[clients.ClientPool] = None,
+        skip_preflight: bool = False,
+        preflight_cache: Optional[preflight.PreflightCache] = None,
+        compression: Optional[Literal["gzip", "zstd"]] = None,
     ):
         """Initialize a BatchInferer for AWS Bedrock batch processing.
 
@@ -124,6 +420,35 @@ class BatchInferer:
             job_name (str): Unique identifier for this batch job. Used in file naming.
             role_arn (str): AWS IAM role ARN with permissions for Bedrock and S3 access
             time_out_duration_hours (int, optional): Maximum runtime for the batch job. Defaults to 24 hours.
+            cache (ResponseCache, optional): A cache of earlier responses. Inputs with a
+                cached response are dropped by prepare_requests() and merged back in by
+                load_results(), and new responses are added to it. Defaults to None.
+            deduplicate (bool, optional): If True, inputs identical to an earlier input
+                are sent once, and load_results() copies the result to every recordId.
+                Defaults to False.
+            state_store (StateStore, optional): Records each stage the job completes.
+                If it already holds a state for job_name, the job resumes from it and
+                auto() skips the stages already done. Defaults to None.
+            realtime (bool, optional): If True, auto() runs every request through
+                invoke_model, see invoke_realtime(). Defaults to False.
+            realtime_fallback (bool, optional): If True, prepare_requests() accepts
+                fewer than 100 inputs, and auto() runs them through invoke_model.
+                Defaults to False.
+            session (boto3.Session, optional): The session to create clients from.
+                Defaults to the session of the shared client pool.
+            client_pool (ClientPool, optional): Where to get boto3 clients from, so
+                that inferers can share them. Defaults to the pool shared by every
+                inferer given the same session, if one is given, otherwise the pool
+                shared by every inferer. If both are given, session must be the
+                pool's session.
+            skip_preflight (bool, optional): If True, don't check the bucket exists
+                in region and the role exists. Defaults to False.
+            preflight_cache (PreflightCache, optional): Passing checks are remembered
+                here, and not repeated until they expire. Defaults to an in-memory
+                cache shared by every inferer, trusted for an hour.
+            compression (str, optional): Compress the local copies of the requests
+                and results with "gzip" or "zstd". Bedrock only accepts plain JSONL,
+                so the files in S3 are not compressed. Defaults to None.
 
         Raises:
             KeyError: If AWS_PROFILE environment variable is not set
@@ -149,33 +474,125 @@ class BatchInferer:
         # model parameters
         self.model_name = model_name
         self.time_out_duration_hours = time_out_duration_hours
+        self.cache = cache
+        self.deduplicate = deduplicate
+        self.state_store = state_store
+        self.realtime = realtime
+        self.realtime_fallback = realtime_fallback
+        check_compression(compression)
+        self.compression = compression
+
+        if client_pool is None:
+            client_pool = (
+                clients.pool_for(session) if session else clients.default_pool()
+            )
+        elif session is not None and client_pool.session is not session:
+            self.logger.error("session must be client_pool's session, pass only one")
+            raise ValueError("session must be client_pool's session, pass only one")
+        self.client_pool = client_pool
+        self.session: boto3.Session = client_pool.session
 
-        self.session: boto3.Session = boto3.Session()
+        checks = preflight_cache or preflight.default_cache()
+        run_check = not skip_preflight
+        identity = preflight.session_identity(self.session) if run_check else None
 
         # file/bucket parameters
-        self._check_bucket(bucket_name, region)
+        if run_check and not checks.passed("bucket", identity, bucket_name, region):
+            self._check_bucket(bucket_name, region)
+            checks.record("bucket", identity, bucket_name, region)
         self.bucket_name = bucket_name
         self.bucket_uri = "s3://" + bucket_name
         self.job_name = job_name or "batch_inference_" + str(uuid4())[:6]
         self.file_name = job_name + ".jsonl"
-        self.output_file_name = None
-        self.manifest_file_name = None
 
         self.check_for_profile()
-        self._check_arn(role_arn)
+        if run_check and not checks.passed("role", identity, role_arn):
+            self._check_arn(role_arn)
+            checks.record("role", identity, role_arn)
         self.role_arn = role_arn
         self.region = region
+        # counts every retry job, so calls to retry_failed don't reuse a job name
+        self.retry_count = 0
 
-        self.client: boto3.client = self.session.client("bedrock", region_name=region)
+        self.client: boto3.client = self.client_pool.client(
+            "bedrock", region_name=region
+        )
+
+        self._reset_state()
+        if self.state_store:
+            self._restore_state()
 
-        # internal state - created by the class later.
+        self.logger.info("Initialized BatchInferer")
+
+    def _reset_state(self) -> None:
+        """Clear the internal state that is created by the class later."""
+        self.output_file_name = None
+        self.manifest_file_name = None
         self.job_arn = None
         self.job_status = None
         self.results = None
         self.manifest = None
         self.requests = None
+        self.cached_results: Dict[str, dict] = {}
+        self.duplicates: Dict[str, str] = {}
+        self.stage: Optional[str] = None
+        self.use_realtime = False
+        self.result_index: Optional[ResultIndex] = None
+
+    def _restore_state(self) -> None:
+        """Pick up from the last stage saved in the state store, if any."""
+        saved = self.state_store.load(self.job_name)
+        if saved is None:
+            return
+        details = saved["details"]
+        self.stage = saved["stage"]
+        self.job_arn = details["job_arn"]
+        self.output_file_name = details["output_file_name"]
+        self.manifest_file_name = details["manifest_file_name"]
+        self.cached_results = details["cached_results"]
+        self.duplicates = details["duplicates"]
+        self.logger.info(f"Resuming job {self.job_name} from stage {self.stage}")
+
+    def _record_stage(self, stage: str) -> None:
+        """Mark a stage as completed, saving it to the state store if there is one."""
+        self.stage = stage
+        if not self.state_store:
+            return
+        self.state_store.save(
+            self.job_name,
+            stage,
+            {
+                "job_arn": self.job_arn,
+                "output_file_name": self.output_file_name,
+                "manifest_file_name": self.manifest_file_name,
+                "cached_results": self.cached_results,
+                "duplicates": self.duplicates,
+            },
+        )
 
-        self.logger.info("Initialized BatchInferer")
+    def _reached(self, stage: str) -> bool:
+        """Whether a stage has been completed, in this run or one being resumed."""
+        return self.stage is not None and STAGES.index(self.stage) >= STAGES.index(
+            stage
+        )
+
+    def _spawn(self, job_name: str) -> "BatchInferer":
+        """Create an inferer for a new job sharing this inferer's configuration.
+
+        The copy shares the session and clients, and skips the bucket, role and
+        profile checks that were already made when this inferer was created.
+
+        Args:
+            job_name (str): Unique identifier for the new batch job
+
+        Returns:
+            BatchInferer: An instance of the same class with no prepared requests
+        """
+        inferer = copy.copy(self)
+        inferer.job_name = job_name
+        inferer.file_name = job_name + ".jsonl"
+        inferer._reset_state()
+        return inferer
 
     @property
     def unique_id_from_arn(self):
@@ -190,12 +607,20 @@ class BatchInferer:
             raise KeyError("AWS_PROFILE environment variable not set")
 
     @staticmethod
-    def _read_jsonl(file_path):
-        data = []
-        with open(file_path, "r") as file:
-            for line in file:
-                data.append(json.loads(line.strip()))
-        return data
+    def _iter_jsonl(lines: Iterable[bytes]) -> Iterator[dict]:
+        for line in lines:
+            if line.strip():
+                yield serialization.loads(line)
+
+    @classmethod
+    def _read_jsonl(cls, file_path):
+        with open(file_path, "rb") as file:
+            return list(cls._iter_jsonl(file))
+
+    @property
+    def _output_prefix(self) -> str:
+        """The S3 prefix Bedrock writes this job's outputs to."""
+        return f"output/{self.unique_id_from_arn}"
 
     def _get_bucket_location(self, bucket_name: str) -> str:
         """
@@ -211,7 +636,7 @@ class BatchInferer:
             str: a region, e.g. "eu-west-2"
         """
         try:
-            s3_client = self.session.client("s3")
+            s3_client = self.client_pool.client("s3")
             response = s3_client.get_bucket_location(Bucket=bucket_name)
 
             if response:
@@ -235,7 +660,7 @@ class BatchInferer:
             ValueError: If the bucket is not in the same region as the LLM.
         """
         try:
-            s3_client = self.session.client("s3")
+            s3_client = self.client_pool.client("s3")
             s3_client.head_bucket(Bucket=bucket_name)
         except ClientError as e:
             self.logger.error(f"Bucket {bucket_name} is not accessible: {e}")
@@ -273,7 +698,7 @@ class BatchInferer:
         # Extract the role name from the ARN
         role_name = role_arn.split("/")[-1]
 
-        iam_client = self.session.client("iam")
+        iam_client = self.client_pool.client("iam")
 
         try:
             # Try to get the role
@@ -287,7 +712,49 @@ class BatchInferer:
             else:
                 raise e
 
-    def prepare_requests(self, inputs: Dict[str, ModelInput]) -> None:
+    def _build_record(self, record_id: str, model_input: ModelInput) -> dict:
+        """Build the JSONL record submitted to Bedrock for a single input."""
+        return {
+            "recordId": record_id,
+            "modelInput": model_input.to_dict(),
+        }
+
+    def _dump_record(self, record: dict) -> bytes:
+        """Encode a single request as a JSONL line."""
+        return serialization.dumps_line(record)
+
+    def _log_progress(self, progress: PrepareProgress) -> None:
+        self.logger.info(
+            f"{'Prepared' if progress.done else 'Preparing'} {progress.records} requests"
+            f" in {progress.elapsed_seconds:.1f}s"
+            f" ({progress.records_per_second:.0f} requests/s)"
+        )
+
+    def _iter_records(
+        self,
+        inputs: ModelInputs,
+        progress_callback: Optional[Callable[[PrepareProgress], None]] = None,
+        progress_interval: int = DEFAULT_PROGRESS_INTERVAL,
+    ) -> Iterator[dict]:
+        """Build the record for each input, reporting progress every progress_interval records."""
+        progress_callback = progress_callback or self._log_progress
+        pairs = inputs.items() if isinstance(inputs, Mapping) else inputs
+
+        start = time.perf_counter()
+        count = 0
+        for record_id, model_input in pairs:
+            yield self._build_record(record_id, model_input)
+            count += 1
+            if count % progress_interval == 0:
+                progress_callback(PrepareProgress(count, time.perf_counter() - start))
+        progress_callback(PrepareProgress(count, time.perf_counter() - start, True))
+
+    def prepare_requests(
+        self,
+        inputs: ModelInputs,
+        progress_callback: Optional[Callable[[PrepareProgress], None]] = None,
+        progress_interval: int = DEFAULT_PROGRESS_INTERVAL,
+    ) -> None:
         """Prepare batch inference requests from a dictionary of model inputs.
 
         Formats model inputs into the required JSONL structure for AWS Bedrock batch processing.
@@ -298,11 +765,18 @@ class BatchInferer:
             }
 
         Args:
-            inputs (Dict[str, ModelInput]): Dictionary mapping record IDs to their corresponding
-                ModelInput configurations. The record IDs will be used to track results.
+            inputs (ModelInputs): Dictionary mapping record IDs to their corresponding
+                ModelInput configurations, or any iterable of (record_id, ModelInput)
+                pairs such as a generator. The record IDs will be used to track results.
+            progress_callback (Callable[[PrepareProgress], None], optional): Called
+                every progress_interval requests, and once more when every request
+                is prepared. Defaults to logging the progress at INFO.
+            progress_interval (int, optional): The number of requests between
+                progress reports. Defaults to 100,000.
 
         Raises:
-            ValueError: If len(inputs) < 100, as AWS Bedrock requires minimum batch size of 100
+            ValueError: If there are fewer than 100 inputs, as AWS Bedrock requires
+                minimum batch size of 100
 
         Example:
             >>> inputs = {
@@ -316,28 +790,163 @@ class BatchInferer:
             ...     )
             ... }
             >>> bi.prepare_requests(inputs)
+            >>> # or lazily, from a generator
+            >>> bi.prepare_requests(
+            ...     (row.id, ModelInput(messages=[...])) for row in read_rows()
+            ... )
 
         Note:
             - This method must be called before push_requests_to_s3()
             - The prepared requests are stored in self.requests
             - Each ModelInput is converted to a dict using its to_dict() method
+            - Given a mapping, self.requests is a PreparedRequests, which holds
+              each request encoded as a JSONL line and decodes it on access
+            - Given any other iterable, only the first 100 inputs are read to check
+              the batch size. self.requests is a RequestStream which builds the rest
+              as it is uploaded, and can only be consumed once.
+            - With a cache, inputs with a cached response are set aside in
+              self.cached_results. If fewer than 100 inputs are left, some cached
+              inputs are sent again to make up the batch. If none are left,
+              self.requests is empty and no job is needed.
+            - With deduplicate, only the first of identical inputs is sent, and the
+              rest are recorded in self.duplicates. Again, some are sent anyway if
+              fewer than 100 inputs are left.
+            - With realtime or realtime_fallback, there is no minimum, and nothing is
+              sent again to make up a batch. self.use_realtime is set if the
+              requests should be run with invoke_realtime().
         """
-        # maybe a data class conforming to this???
-        #
+        realtime_capable = self.realtime or self.realtime_fallback
+        # left over from any earlier call, and not true of these inputs
+        self.cached_results = {}
+        self.duplicates = {}
+        if isinstance(inputs, Mapping):
+            self.logger.info(f"Preparing {len(inputs)} requests")
+            if len(inputs) < MIN_BATCH_SIZE and not realtime_capable:
+                self.logger.error(
+                    f"Minimum Batch Size is {MIN_BATCH_SIZE}, {len(inputs)} given."
+                )
+                raise ValueError(
+                    f"Minimum Batch Size is {MIN_BATCH_SIZE}, {len(inputs)} given."
+                )
 
-        self.logger.info(f"Preparing {len(inputs)} requests")
-        if len(inputs) < 100:
-            self.logger.error(f"Minimum Batch Size is 100, {len(inputs)} given.")
-            raise ValueError(f"Minimum Batch Size is 100, {len(inputs)} given.")
+            records = self._iter_records(inputs, progress_callback, progress_interval)
+            if self.cache or self.deduplicate:
+                records = self._skip_known(records)
+            # encoded as they are built, so only one request dict exists at a time
+            self.requests = PreparedRequests(map(self._dump_record, records))
+            if len(self.requests) < MIN_BATCH_SIZE:
+                self.requests = PreparedRequests(
+                    map(self._dump_record, self._top_up(list(self.requests)))
+                )
+            self.use_realtime = self.realtime or len(self.requests) < MIN_BATCH_SIZE
+            self._record_stage("prepared")
+            return
+
+        self.logger.info("Preparing a stream of requests")
+        records = self._iter_records(inputs, progress_callback, progress_interval)
+        if self.cache or self.deduplicate:
+            records = self._skip_known(records)
+        head = self._top_up(list(islice(records, MIN_BATCH_SIZE)))
+        if not head and self.cached_results:
+            self.requests = []
+            self._record_stage("prepared")
+            return
+        if len(head) < MIN_BATCH_SIZE and not realtime_capable:
+            self.logger.error(
+                f"Minimum Batch Size is {MIN_BATCH_SIZE}, {len(head)} given."
+            )
+            raise ValueError(
+                f"Minimum Batch Size is {MIN_BATCH_SIZE}, {len(head)} given."
+            )
+        self.use_realtime = self.realtime or len(head) < MIN_BATCH_SIZE
+        self.requests = RequestStream(head, records)
+        self._record_stage("prepared")
+
+    def _skip_known(self, records: Iterator[dict]) -> Iterator[dict]:
+        """Yield records which need sending, setting aside cache hits and duplicates."""
+        # only the key of each distinct input is kept, not the input itself
+        representatives: Dict[str, str] = {}
+        for record in records:
+            key = request_key(self.model_name, record["modelInput"])
+            model_output = self.cache.get(key) if self.cache else None
+            cached = (
+                None
+                if model_output is None
+                else {**record, "modelOutput": model_output}
+            )
+            if cached is not None and self._is_cacheable(cached):
+                self.cached_results[record["recordId"]] = cached
+            elif self.deduplicate and key in representatives:
+                self.duplicates[record["recordId"]] = representatives[key]
+            else:
+                if self.deduplicate:
+                    representatives[key] = record["recordId"]
+                yield record
+        if self.cache:
+            self.cache.flush()
+        self.logger.info(
+            f"Found {len(self.cached_results)} cached responses "
+            f"and {len(self.duplicates)} duplicate inputs"
+        )
 
-        self.requests = [
-            {
-                "recordId": id,
-                "modelInput": model_input.to_dict(),
+    def _top_up(self, records: List[dict]) -> List[dict]:
+        """Send skipped records after all if too few are left to meet the minimum batch size."""
+        if self.realtime or self.realtime_fallback:
+            return records
+        while 0 < len(records) < MIN_BATCH_SIZE and self.cached_results:
+            record_id, result = self.cached_results.popitem()
+            records.append({"recordId": record_id, "modelInput": result["modelInput"]})
+        if 0 < len(records) < MIN_BATCH_SIZE and self.duplicates:
+            model_inputs = {
+                record["recordId"]: record["modelInput"] for record in records
             }
-            for id, model_input in inputs.items()
+            while len(records) < MIN_BATCH_SIZE and self.duplicates:
+                record_id, representative = self.duplicates.popitem()
+                records.append(
+                    {"recordId": record_id, "modelInput": model_inputs[representative]}
+                )
+        return records
+
+    def _duplicate_copies(self) -> Dict[str, List[str]]:
+        """The recordIds of the duplicates of each representative record."""
+        copies: Dict[str, List[str]] = {}
+        for record_id, representative in self.duplicates.items():
+            copies.setdefault(representative, []).append(record_id)
+        return copies
+
+    def _fan_out(self, results: List[dict]) -> List[dict]:
+        """Copy the results of representative records to their duplicates."""
+        copies = self._duplicate_copies()
+        return [
+            {**result, "recordId": record_id}
+            for result in results
+            for record_id in copies.get(result["recordId"], ())
         ]
 
+    def _is_cacheable(self, result: dict) -> bool:
+        """Whether a result is good enough to reuse instead of sending its input."""
+        return bool(result.get("modelOutput")) and not result.get("error")
+
+    def _cache_results(self, results: List[dict]) -> None:
+        """Add every cacheable result to the cache."""
+        self.cache.set_many(
+            (request_key(self.model_name, result["modelInput"]), result["modelOutput"])
+            for result in results
+            if self._is_cacheable(result)
+        )
+
+    def _iter_request_lines(self) -> Iterator[bytes]:
+        """Yield each prepared request as an encoded JSONL line."""
+        if isinstance(self.requests, (PreparedRequests, FileRequests)):
+            lines = self.requests.lines()
+        else:
+            lines = map(self._dump_record, self.requests)
+        count = 0
+        for line in lines:
+            count += 1
+            yield line
+        self.logger.info(f"Serialized {count} requests")
+
     def _write_requests_locally(self) -> None:
         """Write batch inference requests to a local JSONL file.
 
@@ -349,20 +958,133 @@ class BatchInferer:
             AttributeError: If called before prepare_requests()
 
         Note:
-            - File is named according to self.file_name
+            - File is named according to self.file_name, with a .gz or .zst
+              extension if it is compressed
             - Internal method used by push_requests_to_s3()
             - Will overwrite existing files with the same name
         """
-        self.logger.info(f"Writing {len(self.requests)} requests to {self.file_name}")
-        with open(self.file_name, "w") as file:
-            for record in self.requests:
-                file.write(json.dumps(record) + "\n")
+        file_name = compressed_name(self.file_name, self.compression)
+        if self._requests_written(file_name):
+            self.logger.info(f"Requests are already in {file_name}")
+            return
+        self.logger.info(f"Writing requests to {file_name}")
+        with open_write(file_name, self.compression) as file:
+            for line in self._iter_request_lines():
+                file.write(line)
+
+    def _requests_written(self, file_name: str) -> bool:
+        """Whether the requests are a FileRequests reading from file_name."""
+        return isinstance(self.requests, FileRequests) and os.path.abspath(
+            self.requests.path
+        ) == os.path.abspath(file_name)
+
+    def _tee_request_lines(self, file) -> Iterator[bytes]:
+        """Yield encoded request lines, writing a copy of each to `file`."""
+        for line in self._iter_request_lines():
+            file.write(line)
+            yield line
+
+    def estimate(
+        self,
+        max_input_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        count_tokens: Optional[Callable[[bytes], int]] = None,
+    ) -> Estimate:
+        """Estimate the tokens and cost of the prepared requests before submitting them.
+
+        Input tokens are estimated from the length of each encoded request, and the
+        most output from each request's max_tokens, read by parsing the line. Set a
+        limit to reject a job that is too large before paying for it.
+
+        Args:
+            max_input_tokens (int, optional): Raise if the estimated input tokens
+                exceed this. Defaults to no limit.
+            max_cost (float, optional): Raise if the most the job can cost, in USD,
+                exceeds this. Defaults to no limit.
+            prices (Dict[str, Tuple[float, float]], optional): USD per million
+                (input, output) tokens, keyed by a part of the model name. Defaults
+                to the batch prices of the Anthropic models.
+            count_tokens (Callable[[bytes], int], optional): Counts the input tokens
+                of an encoded request line, e.g. with a local tokenizer. Defaults to
+                a characters per token heuristic.
+
+        Returns:
+            Estimate: The number of requests, estimated input tokens, the most output
+                tokens, and the projected cost if the model's price is known
+
+        Raises:
+            ValueError: If a limit is exceeded, if max_cost is set and the model's
+                price isn't known, or if the requests are a RequestStream
+            AttributeError: If called before prepare_requests()
 
-    def push_requests_to_s3(self) -> Dict[str, Any]:
+        Example:
+            >>> bi.prepare_requests(inputs)
+            >>> bi.estimate(max_cost=50).max_cost
+            12.5
+        """
+        if self.requests is None:
+            self.logger.error("There are no requests, call prepare_requests() first")
+            raise AttributeError("There are no requests, call prepare_requests() first")
+        if isinstance(self.requests, RequestStream):
+            self.logger.error("A RequestStream can't be estimated without consuming it")
+            raise ValueError("A RequestStream can't be estimated without consuming it")
+
+        if isinstance(self.requests, (PreparedRequests, FileRequests)):
+            lines = self.requests.lines()
+        else:
+            lines = map(self._dump_record, self.requests)
+        estimate = estimate_lines(self.model_name, lines, prices, count_tokens)
+        self.logger.info(
+            f"Estimated {estimate.records} requests at {estimate.input_tokens} input "
+            f"and at most {estimate.max_output_tokens} output tokens"
+        )
+
+        if max_input_tokens is not None and estimate.input_tokens > max_input_tokens:
+            self.logger.error(
+                f"Estimated {estimate.input_tokens} input tokens, over the limit of {max_input_tokens}"
+            )
+            raise ValueError(
+                f"Estimated {estimate.input_tokens} input tokens, over the limit of {max_input_tokens}"
+            )
+        if max_cost is not None:
+            if estimate.max_cost is None:
+                self.logger.error(f"No price known for {self.model_name}")
+                raise ValueError(f"No price known for {self.model_name}")
+            if estimate.max_cost > max_cost:
+                self.logger.error(
+                    f"Job could cost ${estimate.max_cost:.2f}, over the limit of ${max_cost:.2f}"
+                )
+                raise ValueError(
+                    f"Job could cost ${estimate.max_cost:.2f}, over the limit of ${max_cost:.2f}"
+                )
+        return estimate
+
+    def push_requests_to_s3(
+        self,
+        stream: Optional[bool] = None,
+        keep_local_copy: bool = False,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> Dict[str, Any]:
         """Upload batch inference requests to S3.
 
-        Writes the prepared requests to a local JSONL file and uploads it to the
-        configured S3 bucket in the 'input/' prefix.
+        By default writes the prepared requests to a local JSONL file and uploads it
+        to the configured S3 bucket in the 'input/' prefix.
+
+        With `stream=True` the requests are serialized straight into an S3 multipart
+        upload, so no local file is needed and memory is bounded by the part size
+        and concurrency. A local copy is only written if `keep_local_copy` is set.
+
+        Args:
+            stream (bool, optional): Stream requests into a multipart upload. Defaults
+                to streaming only when self.requests is a RequestStream.
+            keep_local_copy (bool, optional): When streaming, also write {job_name}.jsonl
+                locally. Defaults to False.
+            part_size (int, optional): Multipart part size in bytes when streaming.
+                Must be at least 5 MiB. Defaults to 16 MiB.
+            max_concurrency (int, optional): Maximum parts uploading at once when
+                streaming. Defaults to 4.
 
         Returns:
             dict: The S3 upload response from boto3
@@ -373,19 +1095,68 @@ class BatchInferer:
             AttributeError: If called before prepare_requests()
 
         Note:
-            - Creates/overwrites files both locally and in S3
+            - Creates/overwrites files in S3, and locally unless streaming
             - S3 path: {bucket_name}/input/{job_name}.jsonl
             - Sets Content-Type to 'application/json'
+            - Recovering the job doesn't need the local copy, the requests are read
+              back from S3
+            - With compression set, requests are always streamed and the local copy
+              is compressed, as Bedrock only reads uncompressed JSONL
         """
-        # do I want to write this file locally? - maybe stream it or write it to
-        # temp file instead
+        response = self._upload_requests(
+            stream, keep_local_copy, part_size, max_concurrency
+        )
+        self._record_stage("uploaded")
+        return response
+
+    def _upload_requests(
+        self,
+        stream: Optional[bool],
+        keep_local_copy: bool,
+        part_size: int,
+        max_concurrency: int,
+    ) -> Dict[str, Any]:
+        s3_client = self.client_pool.client("s3")
+        key = f"input/{self.file_name}"
+
+        if stream is None:
+            stream = isinstance(self.requests, RequestStream)
+        if self._requests_written(self.file_name):
+            # the local file is already written, and would be truncated by a copy
+            stream = False
+        if self.compression and not stream:
+            # S3 needs the plain file, so stream it while compressing the local copy
+            stream, keep_local_copy = True, True
+
+        if stream:
+            self.logger.info(f"Streaming requests to {self.bucket_name}")
+            if keep_local_copy:
+                with open_write(
+                    compressed_name(self.file_name, self.compression), self.compression
+                ) as file:
+                    return stream_lines_to_s3(
+                        s3_client,
+                        bucket=self.bucket_name,
+                        key=key,
+                        lines=self._tee_request_lines(file),
+                        part_size=part_size,
+                        max_concurrency=max_concurrency,
+                    )
+            return stream_lines_to_s3(
+                s3_client,
+                bucket=self.bucket_name,
+                key=key,
+                lines=self._iter_request_lines(),
+                part_size=part_size,
+                max_concurrency=max_concurrency,
+            )
+
         self._write_requests_locally()
-        s3_client = self.session.client("s3")
-        self.logger.info(f"Pushing {len(self.requests)} requests to {self.bucket_name}")
+        self.logger.info(f"Pushing {self.file_name} to {self.bucket_name}")
         response = s3_client.upload_file(
             Filename=self.file_name,
             Bucket=self.bucket_name,
-            Key=f"input/{self.file_name}",
+            Key=key,
             ExtraArgs={"ContentType": "application/json"},
         )
         return response
@@ -409,12 +1180,13 @@ class BatchInferer:
             - Input data must be uploaded to S3 before calling this method
             - Job will timeout after self.time_out_duration_hours
         """
-        if self.requests:
+        # a resumed job has no requests in memory, but they are already uploaded
+        if self.requests or self.stage == "uploaded":
             self.logger.info(f"Creating job {self.job_name}")
             response = self.client.create_model_invocation_job(
                 jobName=self.job_name,
                 roleArn=self.role_arn,
-                clientRequestToken="string",
+                clientRequestToken=str(uuid4()),
                 modelId=self.model_name,
                 inputDataConfig={
                     "s3InputDataConfig": {
@@ -437,6 +1209,7 @@ class BatchInferer:
                     self.logger.info(f"Job {self.job_name} created successfully")
                     self.logger.info(f"Assigned jobArn: {response['jobArn']}")
                     self.job_arn = response["jobArn"]
+                    self._record_stage("created")
                     return response
                 else:
                     self.logger.error(
@@ -456,45 +1229,93 @@ class BatchInferer:
             self.logger.error("There were no prepared requests")
             raise AttributeError("There were no prepared requests")
 
-    def download_results(self) -> None:
+    def download_results(
+        self,
+        transfer_config: Optional[TransferConfig] = None,
+        build_index: bool = False,
+    ) -> None:
         """Download batch inference results from S3.
 
         Retrieves both the results and manifest files from S3 once the job
-        has completed. Files are downloaded to:
-            - {job_name}_out.jsonl: Contains model outputs
+        has completed. The two files are downloaded concurrently, and the results
+        file is fetched as parallel ranged GETs. Files are downloaded to:
+            - {job_name}_out.jsonl: Contains model outputs, with a .gz or .zst
+              extension if compression is set
             - {job_name}_manifest.jsonl: Contains job statistics
 
+        Args:
+            transfer_config (TransferConfig, optional): Controls the part size and
+                concurrency used for the results file. Defaults to 64 MiB parts,
+                16 at a time.
+            build_index (bool, optional): Also index the results file by recordId,
+                into {job_name}_out.index.db, for get_result(). Defaults to False.
+
         Raises:
             ClientError: For S3 download failures
-            ValueError: If job hasn't completed or job_arn isn't set
+            ValueError: If job hasn't completed or job_arn isn't set, or if
+                build_index is set on a compressed inferer
 
         Note:
             - Only downloads if job status is in VALID_FINISHED_STATUSES
             - Files are downloaded to current working directory
             - Existing files will be overwritten
+            - A compressed results file is fetched in a single stream and compressed
+              as it is written
             - Call check_complete() first to ensure job is finished
         """
+        if build_index:
+            self._check_indexable()
         if self.check_complete() in VALID_FINISHED_STATUSES:
+            if self.result_index is not None:
+                # the file it maps is about to be replaced
+                self.result_index.close()
+                self.result_index = None
             file_name_, ext = os.path.splitext(self.file_name)
-            self.output_file_name = f"{file_name_}_out{ext}"
+            self.output_file_name = compressed_name(
+                f"{file_name_}_out{ext}", self.compression
+            )
             self.manifest_file_name = f"{file_name_}_manifest{ext}"
             self.logger.info(
                 f"Job:{self.job_arn} Complete. Downloading results from {self.bucket_name}"
             )
-            s3_client = self.session.client("s3")
-            s3_client.download_file(
-                Bucket=self.bucket_name,
-                Key=f"output/{self.unique_id_from_arn}/{self.file_name}.out",
-                Filename=self.output_file_name,
-            )
-            self.logger.info(f"Downloaded results file to {self.output_file_name}")
+            s3_client = self.client_pool.client("s3")
+            output_key = f"{self._output_prefix}/{self.file_name}.out"
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                if self.compression:
+                    output = executor.submit(
+                        download_compressed,
+                        s3_client,
+                        self.bucket_name,
+                        output_key,
+                        self.output_file_name,
+                        self.compression,
+                    )
+                else:
+                    output = executor.submit(
+                        s3_client.download_file,
+                        Bucket=self.bucket_name,
+                        Key=output_key,
+                        Filename=self.output_file_name,
+                        Config=transfer_config or DEFAULT_DOWNLOAD_CONFIG,
+                    )
+                manifest = executor.submit(
+                    s3_client.download_file,
+                    Bucket=self.bucket_name,
+                    Key=f"{self._output_prefix}/manifest.json.out",
+                    Filename=self.manifest_file_name,
+                )
 
-            s3_client.download_file(
-                Bucket=self.bucket_name,
-                Key=f"output/{self.unique_id_from_arn}/manifest.json.out",
-                Filename=self.manifest_file_name,
-            )
-            self.logger.info(f"Downloaded manifest file to {self.manifest_file_name}")
+                manifest.result()
+                self.logger.info(
+                    f"Downloaded manifest file to {self.manifest_file_name}"
+                )
+                output.result()
+                self.logger.info(f"Downloaded results file to {self.output_file_name}")
+            if build_index:
+                self.result_index = ResultIndex.build(
+                    self.output_file_name, self._index_file_name
+                )
+            self._record_stage("downloaded")
         else:
             self.logger.info(
                 f"Job:{self.job_arn} was not marked one of {VALID_FINISHED_STATUSES}, could not download."
@@ -503,6 +1324,11 @@ class BatchInferer:
     def load_results(self) -> None:
         """Load batch inference results and manifest from local files.
 
+        Loads every result into memory, see iter_results() to stream them instead.
+        With a cache, new results are added to it and self.cached_results are
+        appended to self.results. With deduplicate, a copy of each result is
+        appended for every duplicate of its input.
+
         Reads and parses the output files downloaded from S3, populating:
             - self.results: List of inference results from the output JSONL file
             - self.manifest: Statistics about the job execution (total records, success/error counts, etc.)
@@ -518,18 +1344,294 @@ class BatchInferer:
             - Must call download_results() before calling this method
             - The manifest provides useful metrics like success rate and token counts
         """
-        if os.path.isfile(self.output_file_name) and os.path.isfile(
-            self.manifest_file_name
+        if (
+            self.job_arn is None
+            and self.requests is not None
+            and not self.requests
+            and self.cached_results
         ):
-            self.results = self._read_jsonl(self.output_file_name)
-            self.manifest = Manifest(**self._read_jsonl(self.manifest_file_name)[0])
-        else:
+            self.logger.info("Every result was found in the cache")
+            self.results = list(self.cached_results.values())
+            return
+
+        if not self.manifest_file_name or not os.path.isfile(self.manifest_file_name):
             self.logger.error(
                 "Result files do not exist, you may need to call .download_results() first."
             )
             raise FileExistsError(
                 "Result files do not exist, you may need to call .download_results() first."
             )
+        self.results = list(self.iter_results())
+        self.manifest = Manifest(**self._read_jsonl(self.manifest_file_name)[0])
+        self._merge_known_results()
+
+    def _merge_known_results(self) -> None:
+        """Cache new results, then add the cached results and copies for duplicates."""
+        if self.cache:
+            self._cache_results(self.results)
+            self.results.extend(self.cached_results.values())
+        if self.duplicates:
+            self.results.extend(self._fan_out(self.results))
+
+    def invoke_realtime(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_requests_per_second: Optional[float] = None,
+    ) -> None:
+        """Run the prepared requests through invoke_model instead of a batch job.
+
+        For batches too small for Bedrock batch inference, or which can't wait for a
+        job to be scheduled. Requests run concurrently in a thread pool, and the
+        results are in the same format as load_results() gives, so downstream code
+        is unchanged. Realtime invocation is billed at the on-demand rate.
+
+        Args:
+            max_workers (int, optional): The most requests in flight. Defaults to 8.
+            max_requests_per_second (float, optional): Limit on the rate requests are
+                started at, to stay within the account's quota. Defaults to no limit.
+
+        Populates:
+            - self.results: A result for every request, with a modelOutput or an error
+            - self.manifest: Counts of the records, and token counts if every
+              output reported its usage
+
+        Raises:
+            AttributeError: If called before prepare_requests()
+        """
+        if self.requests is None:
+            self.logger.error("There were no prepared requests")
+            raise AttributeError("There were no prepared requests")
+
+        self.logger.info(f"Invoking {self.model_name} in realtime")
+        client = self.client_pool.client("bedrock-runtime", region_name=self.region)
+        self.results = list(
+            invoke_records(
+                client,
+                self.model_name,
+                self.requests,
+                max_workers=max_workers,
+                max_requests_per_second=max_requests_per_second,
+            )
+        )
+        self.manifest = self._realtime_manifest(self.results)
+        self.logger.info(f"Invoked {len(self.results)} requests in realtime")
+        self._merge_known_results()
+
+    @staticmethod
+    def _realtime_manifest(results: List[dict]) -> Manifest:
+        errors = sum(1 for result in results if result.get("error"))
+        usages = [result.get("modelOutput", {}).get("usage") for result in results]
+        known = all(usages)
+        return Manifest(
+            totalRecordCount=len(results),
+            processedRecordCount=len(results),
+            successRecordCount=len(results) - errors,
+            errorRecordCount=errors,
+            inputTokenCount=sum(u["input_tokens"] for u in usages) if known else None,
+            outputTokenCount=sum(u["output_tokens"] for u in usages) if known else None,
+        )
+
+    def _iter_result_records(self, from_s3: bool) -> Iterator[dict]:
+        if from_s3:
+            yield from _stream_jsonl_object(
+                self.client_pool.client("s3"),
+                self.bucket_name,
+                f"{self._output_prefix}/{self.file_name}.out",
+            )
+            return
+
+        if not self.output_file_name or not os.path.isfile(self.output_file_name):
+            self.logger.error(
+                "Result files do not exist, you may need to call .download_results() first."
+            )
+            raise FileExistsError(
+                "Result files do not exist, you may need to call .download_results() first."
+            )
+        with open_read(self.output_file_name) as file:
+            yield from self._iter_jsonl(file)
+
+    def iter_results(
+        self, chunk_size: Optional[int] = None, from_s3: bool = False
+    ) -> Union[Iterator[dict], Iterator[List[dict]]]:
+        """Stream batch inference results one record at a time.
+
+        Unlike load_results, only one record (or one chunk of records) is held in
+        memory at a time, so this can be used on outputs too large to load.
+
+        Args:
+            chunk_size (int, optional): If given, yield lists of up to chunk_size
+                records rather than single records. Defaults to None.
+            from_s3 (bool, optional): Read the output object directly from S3 rather
+                than the file written by download_results(). Defaults to False.
+
+        Yields:
+            dict | List[dict]: Each result record, or each chunk of result records
+
+        Raises:
+            FileExistsError: If reading locally and the results file is not found
+            ValueError: If reading from S3 and job_arn isn't set
+
+        Example:
+            >>> for chunk in bi.iter_results(chunk_size=10_000):
+            ...     write_to_warehouse(chunk)
+        """
+        records = self._iter_result_records(from_s3)
+        if not chunk_size:
+            yield from records
+            return
+        while chunk := list(islice(records, chunk_size)):
+            yield chunk
+
+    @property
+    def _index_file_name(self) -> str:
+        return f"{os.path.splitext(self.output_file_name)[0]}.index.db"
+
+    def _check_indexable(self) -> None:
+        if self.compression:
+            self.logger.error("Compressed results files can't be indexed")
+            raise ValueError("Compressed results files can't be indexed")
+
+    def get_result(self, record_id: str) -> Optional[dict]:
+        """Fetch one result by its recordId, without reading the whole results file.
+
+        Looks the record up in an on-disk index of the results file and parses only
+        its line, read through a memory map. The index is built on first use if
+        download_results() didn't build it, and rebuilt if the file has changed.
+        Cached results, and duplicates of a record which was sent, are found as
+        they would be in load_results().
+
+        Args:
+            record_id (str): The recordId to look up
+
+        Returns:
+            Optional[dict]: The result record, or None if there isn't one
+
+        Raises:
+            FileExistsError: If the results file is not found
+            ValueError: If the results file is compressed
+
+        Example:
+            >>> bi.download_results(build_index=True)
+            >>> bi.get_result("record-001")["modelOutput"]
+        """
+        if record_id in self.cached_results:
+            return self.cached_results[record_id]
+        if record_id in self.duplicates:
+            result = self.get_result(self.duplicates[record_id])
+            return None if result is None else {**result, "recordId": record_id}
+        if self.result_index is None:
+            self._check_indexable()
+            if not self.output_file_name or not os.path.isfile(self.output_file_name):
+                self.logger.error(
+                    "Result files do not exist, you may need to call .download_results() first."
+                )
+                raise FileExistsError(
+                    "Result files do not exist, you may need to call .download_results() first."
+                )
+            self.result_index = ResultIndex.open_or_build(
+                self.output_file_name, self._index_file_name
+            )
+        return self.result_index.get(record_id)
+
+    def _iter_merged_results(self, from_s3: bool) -> Iterator[dict]:
+        """Stream the results load_results() would give, without holding them all.
+
+        The results file is followed by the cached results, and each result by
+        copies for its duplicates. Without a downloaded results file, as after
+        invoke_realtime() or when everything was cached, self.results is used.
+        """
+        downloaded = self.output_file_name and os.path.isfile(self.output_file_name)
+        if not from_s3 and not downloaded and self.results is not None:
+            yield from self.results
+            return
+        copies = self._duplicate_copies()
+        for result in chain(
+            self._iter_result_records(from_s3), self.cached_results.values()
+        ):
+            yield result
+            for record_id in copies.get(result["recordId"], ()):
+                yield {**result, "recordId": record_id}
+
+    def _export_chunks(self, chunk_size: int, from_s3: bool) -> Iterator[List[dict]]:
+        records = self._iter_merged_results(from_s3)
+        while chunk := list(islice(records, chunk_size)):
+            yield chunk
+
+    def _export_schema(self):
+        return export.result_schema()
+
+    def _export_rows(self, chunk_size: int, from_s3: bool) -> Iterator[List[dict]]:
+        for chunk in self._export_chunks(chunk_size, from_s3):
+            yield [export.flatten_result(result) for result in chunk]
+
+    def to_arrow(
+        self, chunk_size: int = export.DEFAULT_CHUNK_SIZE, from_s3: bool = False
+    ) -> "pyarrow.Table":
+        """Export the results as an Arrow table of flat, typed columns.
+
+        The columns are recordId, stop_reason, input_tokens, output_tokens, text
+        (the text content blocks, joined by newlines), error_code and error_message.
+        The table is built chunk by chunk from the streamed results file, without
+        loading the results as dicts first. As with load_results(), cached results
+        and copies for duplicate inputs are included. If there is no results file,
+        as after invoke_realtime(), self.results is exported instead.
+
+        Args:
+            chunk_size (int, optional): Records per RecordBatch. Defaults to 50,000.
+            from_s3 (bool, optional): Read the output object directly from S3 rather
+                than the file written by download_results(). Defaults to False.
+
+        Returns:
+            pyarrow.Table: One row per result, in the order of the results file,
+                followed by the cached results, with each duplicate after the
+                record it copies
+
+        Raises:
+            ImportError: If pyarrow is not installed
+            FileExistsError: If reading locally, the results file is not found and
+                there are no loaded results
+
+        Example:
+            >>> df = bi.to_arrow().to_pandas()
+        """
+        return export.to_table(
+            self._export_rows(chunk_size, from_s3), self._export_schema()
+        )
+
+    def to_parquet(
+        self,
+        path: str,
+        chunk_size: int = export.DEFAULT_CHUNK_SIZE,
+        from_s3: bool = False,
+        **kwargs,
+    ) -> int:
+        """Export the results to a Parquet file, with the columns of to_arrow().
+
+        Each chunk is written as a row group as soon as it is built, so only one
+        chunk is held in memory at a time. The rows are those of to_arrow(), cached
+        and duplicate records included.
+
+        Args:
+            path (str): The Parquet file to write
+            chunk_size (int, optional): Records per row group. Defaults to 50,000.
+            from_s3 (bool, optional): Read the output object directly from S3 rather
+                than the file written by download_results(). Defaults to False.
+            **kwargs: Passed to pyarrow.parquet.ParquetWriter, e.g. compression="zstd"
+
+        Returns:
+            int: The number of rows written
+
+        Raises:
+            ImportError: If pyarrow is not installed
+            FileExistsError: If reading locally, the results file is not found and
+                there are no loaded results
+        """
+        return export.write_parquet(
+            self._export_rows(chunk_size, from_s3),
+            self._export_schema(),
+            path,
+            **kwargs,
+        )
 
     def cancel_batch(self) -> None:
         """Cancel a running batch inference job.
@@ -595,26 +1697,170 @@ class BatchInferer:
             time.sleep(poll_interval_seconds)
         return True
 
-    def auto(self, inputs: Dict[str, ModelInput]) -> dict[str, ModelInput]:
+    def _failed_record_ids(self) -> List[str]:
+        """The recordIds of results without a model output."""
+        return [
+            result["recordId"]
+            for result in self.results
+            if not result.get("modelOutput") or result.get("error")
+        ]
+
+    def _model_inputs(self, record_ids: Iterable[str]) -> Dict[str, dict]:
+        """Find the model inputs of records, from the results or else the requests."""
+        wanted = set(record_ids)
+        model_inputs = {
+            result["recordId"]: result["modelInput"]
+            for result in self.results
+            if result["recordId"] in wanted and "modelInput" in result
+        }
+        if len(model_inputs) < len(wanted) and self.requests is not None:
+            for record in self.requests:
+                if record["recordId"] in wanted:
+                    model_inputs.setdefault(record["recordId"], record["modelInput"])
+        return model_inputs
+
+    def _merge_retry(self, retry: "BatchInferer", record_ids: Iterable[str]) -> None:
+        """Replace the results of records which succeeded on retry."""
+        positions = {result["recordId"]: i for i, result in enumerate(self.results)}
+        failed = set(retry._failed_record_ids())
+        for result in retry.results:
+            if result["recordId"] in record_ids and result["recordId"] not in failed:
+                self.results[positions[result["recordId"]]] = result
+
+    def retry_failed(
+        self, max_attempts: int = 1, poll_interval_seconds: int = 10 * 60
+    ) -> List[str]:
+        """Run follow-up jobs for the records which failed, merging in their results.
+
+        Each attempt submits the failed records as a new job named
+        {job_name}-retry-{n}-{YYYYmmdd-HHMMSS}, where n counts every retry job this
+        inferer has run, so repeated calls never reuse a job name. Bedrock won't run
+        fewer than 100 records, so a smaller batch is padded with records which
+        succeeded, whose new results are discarded. With realtime_fallback, a small batch is run through invoke_model
+        instead, and with realtime every retry is.
+
+        Args:
+            max_attempts (int, optional): The most follow-up jobs to run. Defaults to 1.
+            poll_interval_seconds (int, optional): Number of seconds between checks on
+                each follow-up job. Defaults to 600.
+
+        Returns:
+            List[str]: The recordIds which still failed after the last attempt
+
+        Raises:
+            AttributeError: If called before load_results()
+
+        Note:
+            - self.manifest still describes the original job
+            - Inputs are taken from the results, or read from self.requests if the
+              results don't include them
+        """
+        if self.results is None:
+            self.logger.error("There are no results, call load_results() first")
+            raise AttributeError("There are no results, call load_results() first")
+
+        failed = self._failed_record_ids()
+        for attempt in range(1, max_attempts + 1):
+            if not failed:
+                break
+            self.logger.info(
+                f"Retrying {len(failed)} failed records, attempt {attempt}"
+            )
+
+            self.retry_count += 1
+            retry = self._spawn(
+                f"{self.job_name}-retry-{self.retry_count}-"
+                f"{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+            )
+            if self.realtime or (
+                self.realtime_fallback and len(failed) < MIN_BATCH_SIZE
+            ):
+                model_inputs = self._model_inputs(failed)
+                retry.requests = [
+                    {"recordId": record_id, "modelInput": model_inputs[record_id]}
+                    for record_id in failed
+                    if record_id in model_inputs
+                ]
+                retry.invoke_realtime()
+                self._merge_retry(retry, set(failed))
+                failed = self._failed_record_ids()
+                continue
+
+            padding = []
+            if len(failed) < MIN_BATCH_SIZE:
+                failed_ids = set(failed)
+                padding = [
+                    result["recordId"]
+                    for result in self.results
+                    if result["recordId"] not in failed_ids
+                ][: MIN_BATCH_SIZE - len(failed)]
+            model_inputs = self._model_inputs(failed + padding)
+
+            retry.requests = [
+                {"recordId": record_id, "modelInput": model_inputs[record_id]}
+                for record_id in failed + padding
+                if record_id in model_inputs
+            ]
+            retry.push_requests_to_s3()
+            retry.create()
+            retry.poll_progress(poll_interval_seconds)
+            retry.download_results()
+            retry.load_results()
+
+            self._merge_retry(retry, set(failed))
+            failed = self._failed_record_ids()
+
+        if failed:
+            self.logger.warning(f"{len(failed)} records still failed")
+        return failed
+
+    def auto(self, inputs: ModelInputs) -> dict[str, ModelInput]:
         """Execute the complete batch inference workflow automatically.
 
         This method combines the preparation, execution, monitoring, and result retrieval
         steps into a single operation.
 
         Args:
-            inputs (Dict[str, ModelInput]): Dictionary of record IDs mapped to their ModelInput configurations
+            inputs (ModelInputs): Dictionary of record IDs mapped to their ModelInput
+                configurations, or an iterable of (record_id, ModelInput) pairs
 
         Returns:
             List[dict]: The results of the batch inference job
+
+        Note:
+            - Stages already completed, e.g. by an earlier run resumed from the
+              state_store, are skipped. The inputs are only read if the requests
+              haven't been uploaded yet.
+            - If self.use_realtime is set by prepare_requests(), the requests are
+              run with invoke_realtime() instead of a batch job.
         """
-        self.prepare_requests(inputs)
-        self.push_requests_to_s3()
-        self.create()
-        self.poll_progress(10 * 60)
-        self.download_results()
-        self.load_results()
+        for method, args in self._auto_steps(inputs):
+            getattr(self, method)(*args)
         return self.results
 
+    def _auto_steps(self, inputs: ModelInputs) -> Iterator[Tuple[str, tuple]]:
+        """The (method name, args) of each step auto() runs, in order.
+
+        Each step is decided once the one before it has run, as whether a batch job
+        is needed depends on the prepared requests. AsyncBatchInferer.auto runs the
+        same steps through its own methods.
+        """
+        if not self._reached("uploaded"):
+            yield "prepare_requests", (inputs,)
+            if not self.requests:
+                yield "load_results", ()
+                return
+            if self.use_realtime:
+                yield "invoke_realtime", ()
+                return
+            yield "push_requests_to_s3", ()
+        if not self._reached("created"):
+            yield "create", ()
+        if not self._reached("downloaded"):
+            yield "poll_progress", (10 * 60,)
+            yield "download_results", ()
+        yield "load_results", ()
+
     @classmethod
     def recover_details_from_job_arn(cls, job_arn: str, region: str) -> "BatchInferer":
         """Recover a BatchInferer instance from an existing job ARN.
@@ -637,37 +1883,42 @@ class BatchInferer:
             >>> bi = BatchInferer.recover_details_from_job_arn(job_arn)
             >>> bi.check_complete()
             'Completed'
+
+        Note:
+            - bi.requests is an S3Requests, which reads the job's input file from
+              S3 only when iterated, so no local copy of the input is needed
         """
 
-        cls.logger.info(f"Attempting to Recover BatchInferer from {job_arn}")
+        return cls._recover(job_arn, region)
+
+    @classmethod
+    def _recover(cls, job_arn: str, region: str, **kwargs) -> "BatchInferer":
+        """Build an inferer for an existing job, passing kwargs to the constructor."""
+        cls.logger.info(f"Attempting to Recover {cls.__name__} from {job_arn}")
         response = cls.check_for_existing_job(job_arn, region)
 
         try:
             # Extract required parameters from response
             job_name = response["jobName"]
             model_id = response["modelId"]
-            bucket_name = response["inputDataConfig"]["s3InputDataConfig"][
-                "s3Uri"
-            ].split("/")[2]
+            input_uri = response["inputDataConfig"]["s3InputDataConfig"]["s3Uri"]
+            bucket_name = input_uri.split("/")[2]
+            input_key = "/".join(input_uri.split("/")[3:])
             role_arn = response["roleArn"]
 
-            # Validate required files exist
-            input_file = f"{job_name}.jsonl"
-            if not os.path.exists(input_file):
-                cls.logger.error(f"Required input file not found: {input_file}")
-                raise FileNotFoundError(f"Required input file not found: {input_file}")
-
-            requests = cls._read_jsonl(input_file)
-
             bi = cls(
                 model_name=model_id,
                 job_name=job_name,
                 region=region,
                 bucket_name=bucket_name,
                 role_arn=role_arn,
+                **kwargs,
             )
             bi.job_arn = job_arn
-            bi.requests = requests
+            # read from S3 only if the requests are needed
+            bi.requests = S3Requests(
+                bi.client_pool.client("s3"), bucket_name, input_key
+            )
             bi.job_status = response["status"]
 
             return bi
@@ -697,8 +1948,7 @@ class BatchInferer:
         if not job_arn.startswith("arn:aws:bedrock:"):
             cls.logger.error(f"Invalid Bedrock ARN format: {job_arn}")
             raise ValueError(f"Invalid Bedrock ARN format: {job_arn}")
-        session = boto3.Session()
-        client = session.client("bedrock", region_name=region)
+        client = clients.default_pool().client("bedrock", region_name=region)
 
         try:
             response = client.get_model_invocation_job(jobIdentifier=job_arn)
@@ -735,6 +1985,20 @@ class StructuredBatchInferer(BatchInferer):
         job_name (str): A unique name for the batch inference job
         role_arn (str): The AWS IAM role ARN with necessary permissions
         time_out_duration_hours (int, optional): Maximum job runtime in hours. Defaults to 24.
+        cache (ResponseCache, optional): A cache of earlier responses. Defaults to None.
+        deduplicate (bool, optional): Send identical inputs only once. Defaults to False.
+        state_store (StateStore, optional): Where to record each completed stage, so the
+            job can be resumed. Defaults to None.
+        realtime (bool, optional): Run every request through invoke_model. Defaults to False.
+        realtime_fallback (bool, optional): Run batches smaller than Bedrock's minimum
+            through invoke_model. Defaults to False.
+        session (boto3.Session, optional): The session to create clients from.
+        client_pool (ClientPool, optional): Where to get boto3 clients from.
+        skip_preflight (bool, optional): Don't check the bucket and role exist.
+            Defaults to False.
+        preflight_cache (PreflightCache, optional): Where to remember passing checks.
+        compression (str, optional): Keep local request and result files compressed,
+            "gzip" or "zstd". Defaults to None.
 
     """
 
@@ -749,6 +2013,16 @@ class StructuredBatchInferer(BatchInferer):
         job_name: str,
         role_arn: str,
         time_out_duration_hours: int = 24,
+        cache: Optional[ResponseCache] = None,
+        deduplicate: bool = False,
+        state_store: Optional[StateStore] = None,
+        realtime: bool = False,
+        realtime_fallback: bool = False,
+        session: Optional[boto3.Session] = None,
+        client_pool: Optional[clients.ClientPool] = None,
+        skip_preflight: bool = False,
+        preflight_cache: Optional[preflight.PreflightCache] = None,
+        compression: Optional[Literal["gzip", "zstd"]] = None,
     ):
         """Initialize a StructuredBatchInferer for schema-validated batch processing.
 
@@ -763,6 +2037,25 @@ class StructuredBatchInferer(BatchInferer):
             region (str): Region of the LLM must match the bucket
             job_name (str): Unique identifier for this batch job
             role_arn (str): AWS IAM role ARN with permissions for Bedrock and S3 access
+            time_out_duration_hours (int, optional): Maximum runtime for the batch job. Defaults to 24 hours.
+            cache (ResponseCache, optional): A cache of earlier responses. Defaults to None.
+            deduplicate (bool, optional): Send identical inputs only once. Defaults to False.
+            state_store (StateStore, optional): Records each stage the job completes,
+                and resumes the job from it. Defaults to None.
+            realtime (bool, optional): Run every request through invoke_model.
+                Defaults to False.
+            realtime_fallback (bool, optional): Run batches smaller than Bedrock's
+                minimum through invoke_model. Defaults to False.
+            session (boto3.Session, optional): The session to create clients from.
+                Defaults to the session of the shared client pool.
+            client_pool (ClientPool, optional): Where to get boto3 clients from.
+                Defaults to the pool shared by every inferer.
+            skip_preflight (bool, optional): If True, don't check the bucket and role
+                exist. Defaults to False.
+            preflight_cache (PreflightCache, optional): Where to remember passing
+                checks. Defaults to the shared in-memory cache.
+            compression (str, optional): Compress the local copies of the requests
+                and results with "gzip" or "zstd". Defaults to None.
 
         Raises:
             KeyError: If AWS_PROFILE environment variable is not set
@@ -789,6 +2082,15 @@ class StructuredBatchInferer(BatchInferer):
         """
         self.output_model = output_model
         self.tool = self._build_tool()
+        # shared by every request, and encoded once rather than once per request
+        self._tools = [self.tool]
+        self._tool_choice = {"type": "tool", "name": self.tool["name"]}
+        self._encoded_tools = (
+            b',"tools":'
+            + serialization.dumps(self._tools)
+            + b',"tool_choice":'
+            + serialization.dumps(self._tool_choice)
+        )
         self.logger.info(
             f"Initialized StructuredBatchInferer with {output_model.__name__} schema"
         )
@@ -800,8 +2102,31 @@ class StructuredBatchInferer(BatchInferer):
             job_name=job_name,
             role_arn=role_arn,
             time_out_duration_hours=time_out_duration_hours,
+            cache=cache,
+            deduplicate=deduplicate,
+            state_store=state_store,
+            realtime=realtime,
+            realtime_fallback=realtime_fallback,
+            session=session,
+            client_pool=client_pool,
+            skip_preflight=skip_preflight,
+            preflight_cache=preflight_cache,
+            compression=compression,
         )
 
+    def _reset_state(self) -> None:
+        super()._reset_state()
+        self.instances = None
+
+    def _is_cacheable(self, result: dict) -> bool:
+        """Only cache outputs which used the tool and match the output_model."""
+        if not super()._is_cacheable(result):
+            return False
+        try:
+            return self.validate_result(result["modelOutput"]) is not None
+        except (KeyError, IndexError):
+            return False
+
     def _build_tool(self) -> dict:
         """Convert a Pydantic model into a tool definition for the model.
 
@@ -814,7 +2139,12 @@ class StructuredBatchInferer(BatchInferer):
             "input_schema": self.output_model.model_json_schema(),
         }
 
-    def prepare_requests(self, inputs: Dict[str, ModelInput]):
+    def prepare_requests(
+        self,
+        inputs: ModelInputs,
+        progress_callback: Optional[Callable[[PrepareProgress], None]] = None,
+        progress_interval: int = DEFAULT_PROGRESS_INTERVAL,
+    ):
         """Prepare structured batch inference requests with tool configurations.
 
         Extends the base preparation by adding tool definitions and tool choice
@@ -822,11 +2152,18 @@ class StructuredBatchInferer(BatchInferer):
         Pydantic output_model specified during initialization.
 
         Args:
-            inputs (Dict[str, ModelInput]): Dictionary mapping record IDs to their corresponding
-                ModelInput configurations. The record IDs will be used to track results.
+            inputs (ModelInputs): Dictionary mapping record IDs to their corresponding
+                ModelInput configurations, or any iterable of (record_id, ModelInput)
+                pairs. The record IDs will be used to track results.
+            progress_callback (Callable[[PrepareProgress], None], optional): Called
+                every progress_interval requests, and once more when every request
+                is prepared. Defaults to logging the progress at INFO.
+            progress_interval (int, optional): The number of requests between
+                progress reports. Defaults to 100,000.
 
         Raises:
-            ValueError: If len(inputs) < 100, as AWS Bedrock requires minimum batch size of 100
+            ValueError: If there are fewer than 100 inputs, as AWS Bedrock requires
+                minimum batch size of 100
 
         Example:
             >>> class PersonInfo(BaseModel):
@@ -843,35 +2180,54 @@ class StructuredBatchInferer(BatchInferer):
         Note:
             - Automatically adds the output_model schema as a tool definition
             - Sets tool_choice to force use of the defined schema
-            - Original ModelInputs are modified to include tool configurations
+            - Original ModelInputs are not modified, every request shares one
+              tool definition
         """
-        with_tools = {
-            id: self._add_tool_to_model_input(model_input)
-            for id, model_input in inputs.items()
-        }
-        super().prepare_requests(with_tools)
+        super().prepare_requests(inputs, progress_callback, progress_interval)
 
-    def _add_tool_to_model_input(self, model_input: ModelInput) -> ModelInput:
-        """Add tool definition and configuration to a ModelInput instance.
+    def _build_record(self, record_id: str, model_input: ModelInput) -> dict:
+        """Build the record for an input, with the output_model's tool attached.
 
-        Updates the ModelInput by:
-            1. Adding the Pydantic model schema as a tool definition
-            2. Setting tool_choice to force use of this specific tool
+        The tool definition and tool choice are shared between every record rather
+        than copied, and the caller's ModelInput is left untouched.
+        """
+        record = super()._build_record(record_id, model_input)
+        record["modelInput"]["tools"] = self._tools
+        record["modelInput"]["tool_choice"] = self._tool_choice
+        return record
 
-        Args:
-            model_input (ModelInput): The original model input configuration
+    def _dump_record(self, record: dict) -> bytes:
+        """Encode a request, splicing in the pre-encoded tool definition.
 
-        Returns:
-            ModelInput: The modified model input with tool configurations added
+        Records that don't share this inferer's tool, such as recovered requests,
+        are encoded in full.
         """
-        self.logger.info(f"Adding tool {self.tool['name']} to model input")
-        model_input.tools = [self.tool]
-        model_input.tool_choice = ToolChoice(
-            type="tool", name=self.output_model.__name__
+        model_input = record["modelInput"]
+        if (
+            len(record) != 2
+            or model_input.get("tools") is not self._tools
+            or model_input.get("tool_choice") is not self._tool_choice
+        ):
+            return super()._dump_record(record)
+
+        without_tools = dict(model_input)
+        del without_tools["tools"], without_tools["tool_choice"]
+        return b"".join(
+            (
+                b'{"recordId":',
+                serialization.dumps(record["recordId"]),
+                b',"modelInput":',
+                serialization.dumps(without_tools)[:-1],
+                self._encoded_tools,
+                b"}}\n",
+            )
         )
-        return model_input
 
-    def load_results(self):
+    def load_results(
+        self,
+        validation_workers: Optional[int] = None,
+        validation_chunk_size: int = 10_000,
+    ):
         """Load and validate batch inference results against the output schema.
 
         Reads the output files downloaded from S3 and validates each result against
@@ -880,6 +2236,12 @@ class StructuredBatchInferer(BatchInferer):
             - self.manifest: Statistics about the job execution
             - self.instances: List of validated Pydantic model instances
 
+        Args:
+            validation_workers (int, optional): If greater than 1, validate in a pool
+                of this many processes rather than serially. Defaults to None.
+            validation_chunk_size (int, optional): The number of results sent to a
+                worker at a time. Defaults to 10,000.
+
         Raises:
             FileExistsError: If either the results or manifest files are not found locally
             ValueError: If any result fails schema validation or tool use validation
@@ -888,18 +2250,115 @@ class StructuredBatchInferer(BatchInferer):
             - Must call download_results() before calling this method
             - All results must conform to the specified output_model schema
             - Results must show successful tool use
+            - To validate in a process pool, output_model must be importable by the
+              workers, i.e. defined at the top level of a module. It is sent to each
+              worker once, when the worker starts.
+            - Instances are in the same order as self.results either way
         """
         super().load_results()
+        self._validate_results(validation_workers, validation_chunk_size)
+
+    def invoke_realtime(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_requests_per_second: Optional[float] = None,
+        validation_workers: Optional[int] = None,
+        validation_chunk_size: int = 10_000,
+    ) -> None:
+        """Run the prepared requests through invoke_model, and validate the results.
+
+        See BatchInferer.invoke_realtime and load_results, self.instances is
+        populated as load_results() would.
+        """
+        super().invoke_realtime(
+            max_workers=max_workers, max_requests_per_second=max_requests_per_second
+        )
+        self._validate_results(validation_workers, validation_chunk_size)
+
+    def _validate_results(
+        self, validation_workers: Optional[int], validation_chunk_size: int
+    ) -> None:
+        outputs = [
+            result["modelOutput"]
+            for result in self.results
+            if result.get("modelOutput")
+        ]
+        if validation_workers and validation_workers > 1:
+            validated = self._validate_in_pool(
+                outputs, validation_workers, validation_chunk_size
+            )
+        else:
+            validated = (self.validate_result(output) for output in outputs)
+
         self.instances = [
             {
                 "recordId": result["recordId"],
-                "outputModel": self.validate_result(result["modelOutput"]),
+                "outputModel": next(validated),
             }
             if result.get("modelOutput")
             else None
             for result in self.results
         ]
 
+    def _export_schema(self):
+        return export.OutputModelColumns(self.output_model).schema()
+
+    def _export_rows(self, chunk_size: int, from_s3: bool) -> Iterator[List[dict]]:
+        """Rows of the base columns and the validated output_model fields."""
+        columns = export.OutputModelColumns(self.output_model)
+        for chunk in self._export_chunks(chunk_size, from_s3):
+            yield [
+                {
+                    **export.flatten_result(result),
+                    **columns.row(
+                        self.validate_result(result["modelOutput"])
+                        if result.get("modelOutput")
+                        else None
+                    ),
+                }
+                for result in chunk
+            ]
+
+    def _validate_in_pool(
+        self, outputs: List[dict], workers: int, chunk_size: int
+    ) -> Iterator[Optional[BaseModel]]:
+        self.logger.info(f"Validating {len(outputs)} results with {workers} processes")
+        chunks = [
+            outputs[start : start + chunk_size]
+            for start in range(0, len(outputs), chunk_size)
+        ]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_validation_worker,
+            initargs=(self.output_model,),
+        ) as executor:
+            # map preserves the order of the chunks
+            validated = [
+                instance
+                for chunk in executor.map(_validate_outputs, chunks)
+                for instance in chunk
+            ]
+        return iter(validated)
+
+    def _failed_record_ids(self) -> List[str]:
+        """The recordIds of results without a model output, or which failed validation."""
+        return [
+            result["recordId"]
+            for result, instance in zip(self.results, self.instances)
+            if instance is None or instance["outputModel"] is None
+        ]
+
+    def _merge_retry(
+        self, retry: "StructuredBatchInferer", record_ids: Iterable[str]
+    ) -> None:
+        """Replace the results and instances of records which succeeded on retry."""
+        positions = {result["recordId"]: i for i, result in enumerate(self.results)}
+        failed = set(retry._failed_record_ids())
+        for result, instance in zip(retry.results, retry.instances):
+            if result["recordId"] in record_ids and result["recordId"] not in failed:
+                self.results[positions[result["recordId"]]] = result
+                self.instances[positions[result["recordId"]]] = instance
+
     def validate_result(
         self,
         result: dict,
@@ -924,19 +2383,7 @@ class StructuredBatchInferer(BatchInferer):
             >>> print(instance.name)
             'John'
         """
-        if not result["stop_reason"] == "tool_use":
-            self.logger.warning("Model did not use tool")
-            return None
-        if not len(result["content"]) == 1:
-            self.logger.warning("Multiple instances of tool use per execution")
-            return None
-        if result["content"][0]["type"] == "tool_use":
-            try:
-                output = self.output_model(**result["content"][0]["input"])
-                return output
-            except TypeError as e:
-                self.logger.warning(f"Could not validate output {e}")
-                return None
+        return _validate_output(self.output_model, result, self.logger)
 
     @classmethod
     def recover_details_from_job_arn(
@@ -971,48 +2418,48 @@ class StructuredBatchInferer(BatchInferer):
             >>> sbi = StructuredBatchInferer.recover_details_from_job_arn(job_arn, region, some_model)
             >>> sbi.check_complete()
             'Completed'
+
+        Note:
+            - sbi.requests is an S3Requests, which reads the job's input file from
+              S3 only when iterated, so no local copy of the input is needed
         """
 
-        cls.logger.info(f"Attempting to Recover BatchInferer from {job_arn}")
-        response = cls.check_for_existing_job(job_arn, region)
+        return cls._recover(job_arn, region, output_model=output_model)
 
+
+def _validate_output(
+    output_model: Type[BaseModel], result: dict, logger: logging.Logger
+) -> BaseModel | None:
+    """See StructuredBatchInferer.validate_result."""
+    if not result["stop_reason"] == "tool_use":
+        logger.warning("Model did not use tool")
+        return None
+    if not len(result["content"]) == 1:
+        logger.warning("Multiple instances of tool use per execution")
+        return None
+    if result["content"][0]["type"] == "tool_use":
         try:
-            # Extract required parameters from response
-            job_name = response["jobName"]
-            model_id = response["modelId"]
-            bucket_name = response["inputDataConfig"]["s3InputDataConfig"][
-                "s3Uri"
-            ].split("/")[2]
-            role_arn = response["roleArn"]
+            output = output_model(**result["content"][0]["input"])
+            return output
+        except (TypeError, ValidationError) as e:
+            logger.warning(f"Could not validate output {e}")
+            return None
 
-            # Validate required files exist
-            input_file = f"{job_name}.jsonl"
-            if not os.path.exists(input_file):
-                cls.logger.error(f"Required input file not found: {input_file}")
-                raise FileNotFoundError(f"Required input file not found: {input_file}")
 
-            requests = cls._read_jsonl(input_file)
+# Set once in each validation worker process, so the model isn't sent with every chunk
+_worker_output_model: Optional[Type[BaseModel]] = None
 
-            sbi = cls(
-                model_name=model_id,
-                output_model=output_model,
-                job_name=job_name,
-                region=region,
-                bucket_name=bucket_name,
-                role_arn=role_arn,
-            )
-            sbi.job_arn = job_arn
-            sbi.requests = requests
-            sbi.job_status = response["status"]
 
-            return sbi
+def _init_validation_worker(output_model: Type[BaseModel]) -> None:
+    global _worker_output_model
+    _worker_output_model = output_model
 
-        except (KeyError, IndexError) as e:
-            cls.logger.error(f"Invalid job response format: {str(e)}")
-            raise ValueError(f"Invalid job response format: {str(e)}") from e
-        except Exception as e:
-            cls.logger.error(f"Failed to recover job details: {str(e)}")
-            raise RuntimeError(f"Failed to recover job details: {str(e)}") from e
+
+def _validate_outputs(outputs: List[dict]) -> List[Optional[BaseModel]]:
+    return [
+        _validate_output(_worker_output_model, output, StructuredBatchInferer.logger)
+        for output in outputs
+    ]
 
 
 class NameAgeModel(BaseModel):
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 60 * 60
+
+
+class PreflightCache:
+    """Remember which buckets and roles have passed BatchInferer's checks.
+
+    Creating a BatchInferer checks the bucket exists, which region it is in, and that
+    the role exists, which takes three round trips to AWS. Passing checks are
+    remembered for ttl_seconds, so creating more inferers against the same bucket
+    and role, with the same credentials, costs nothing. Failures are never
+    remembered.
+
+    Args:
+        ttl_seconds (float, optional): How long a passing check is trusted for.
+            Defaults to an hour.
+        path (str, optional): A JSON file to also keep the results in, so they are
+            shared between processes. Defaults to memory only.
+    """
+
+    def __init__(
+        self, ttl_seconds: float = DEFAULT_TTL_SECONDS, path: Optional[str] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._lock = threading.Lock()
+        self._passed: Dict[str, float] = {}
+        if path and os.path.isfile(path):
+            self._passed = self._read()
+
+    def _read(self) -> Dict[str, float]:
+        try:
+            with open(self.path) as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.info(f"Ignoring unreadable preflight cache {self.path}: {e}")
+            return {}
+
+    def _write(self) -> None:
+        temporary_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(self._passed, file)
+        os.replace(temporary_path, self.path)
+
+    @staticmethod
+    def _key(*parts: str) -> str:
+        return "|".join(parts)
+
+    def passed(self, *parts: str) -> bool:
+        """Whether a check passed within the last ttl_seconds.
+
+        Args:
+            *parts (str): Identify the check, e.g. "bucket", bucket_name, region
+        """
+        key = self._key(*parts)
+        with self._lock:
+            checked = self._passed.get(key)
+            if checked is None and self.path and os.path.isfile(self.path):
+                # another process may have run the check since we last looked
+                self._passed.update(self._read())
+                checked = self._passed.get(key)
+        return checked is not None and time.time() - checked < self.ttl_seconds
+
+    def record(self, *parts: str) -> None:
+        """Remember that a check passed just now."""
+        with self._lock:
+            self._passed[self._key(*parts)] = time.time()
+            if self.path:
+                self._write()
+
+    def clear(self) -> None:
+        """Forget every check, so they all run again."""
+        with self._lock:
+            self._passed.clear()
+            if self.path and os.path.isfile(self.path):
+                os.remove(self.path)
+
+
+def session_identity(session) -> str:
+    """Identify whose credentials a boto3 session uses, without calling AWS.
+
+    Checks are keyed by this as well, so a check which passed for one account or
+    profile isn't trusted for another. The access key id is hashed so it isn't
+    written to a shared cache file.
+
+    Args:
+        session (boto3.Session): The session the checks are made with
+    """
+    credentials = session.get_credentials()
+    access_key = credentials.access_key if credentials else ""
+    digest = hashlib.sha256(access_key.encode()).hexdigest()[:16]
+    return f"{session.profile_name}|{digest}"
+
+
+_default_cache: Optional[PreflightCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache() -> PreflightCache:
+    """The in-memory cache shared by every inferer not given one of its own."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PreflightCache()
+        return _default_cache
+
+
+def set_default_cache(cache: Optional[PreflightCache]) -> None:
+    """Replace the shared cache. Pass None to start a new one on next use."""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterable, Iterator, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from . import serialization
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class RateLimiter:
+    """Space out calls evenly so at most `rate` start each second, across threads.
+
+    Args:
+        rate (float): The maximum calls per second
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            logger.error("rate must be positive")
+            raise ValueError("rate must be positive")
+        self._interval = 1 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the next call is allowed to start."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def invoke_record(
+    client,
+    model_name: str,
+    record: dict,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> dict:
+    """Run one prepared request through invoke_model.
+
+    Args:
+        client: A boto3 bedrock-runtime client
+        model_name (str): The Bedrock model identifier
+        record (dict): A prepared request, with recordId and modelInput
+        rate_limiter (RateLimiter, optional): Waited on before the call
+
+    Returns:
+        dict: The result, in the same format as a batch job's output: the record with
+            either a modelOutput, or an error with errorCode and errorMessage
+    """
+    if rate_limiter:
+        rate_limiter.wait()
+    try:
+        response = client.invoke_model(
+            modelId=model_name,
+            body=serialization.dumps(record["modelInput"]),
+            contentType="application/json",
+            accept="application/json",
+        )
+        return {**record, "modelOutput": serialization.loads(response["body"].read())}
+    except (ClientError, BotoCoreError) as e:
+        logger.error(f"invoke_model failed for {record['recordId']}: {str(e)}")
+        # connection errors and timeouts have no response
+        response = getattr(e, "response", None) or {}
+        return {
+            **record,
+            "error": {
+                "errorCode": response.get("ResponseMetadata", {}).get("HTTPStatusCode"),
+                "errorMessage": response.get("Error", {}).get("Message", str(e)),
+            },
+        }
+
+
+def invoke_records(
+    client,
+    model_name: str,
+    records: Iterable[dict],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_requests_per_second: Optional[float] = None,
+) -> Iterator[dict]:
+    """Run prepared requests through invoke_model in a thread pool.
+
+    At most `max_workers` requests run at once, and only twice that many are read
+    ahead of the results, so records can be a lazy stream.
+
+    Args:
+        client: A boto3 bedrock-runtime client
+        model_name (str): The Bedrock model identifier
+        records (Iterable[dict]): Prepared requests, with recordId and modelInput
+        max_workers (int, optional): The most requests in flight. Defaults to 8.
+        max_requests_per_second (float, optional): Limit on the rate requests are
+            started at. Defaults to no limit.
+
+    Yields:
+        dict: Each result, in the order of records
+    """
+    rate_limiter = (
+        RateLimiter(max_requests_per_second) if max_requests_per_second else None
+    )
+    in_flight: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for record in records:
+            if len(in_flight) >= 2 * max_workers:
+                yield in_flight.popleft().result()
+            in_flight.append(
+                executor.submit(invoke_record, client, model_name, record, rate_limiter)
+            )
+        while in_flight:
+            yield in_flight.popleft().result()
@@ -0,0 +1,100 @@
+"""JSON encoding and decoding for requests and results.
+
+Batches can hold millions of records, so the JSON library matters. The fastest
+installed backend is used automatically, in order orjson, msgspec, then the
+standard library's json. Install one with `pip install llmbo[fast]`.
+
+Everything works in bytes, so lines can be written to files and uploads without
+an extra str to bytes copy. Call these functions through the module, e.g.
+`serialization.dumps(obj)`, so that set_backend() takes effect everywhere.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _json_backend() -> Tuple[Callable, Callable, Callable]:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def dumps_line(obj: Any) -> bytes:
+        return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+    return dumps, dumps_line, json.loads
+
+
+def _orjson_backend() -> Tuple[Callable, Callable, Callable]:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def dumps_line(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+    return dumps, dumps_line, orjson.loads
+
+
+def _msgspec_backend() -> Tuple[Callable, Callable, Callable]:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps_line(obj: Any) -> bytes:
+        buffer = bytearray()
+        encoder.encode_into(obj, buffer)
+        buffer += b"\n"
+        return bytes(buffer)
+
+    return encoder.encode, dumps_line, decoder.decode
+
+
+_LOADERS: Dict[str, Callable[[], Tuple[Callable, Callable, Callable]]] = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "json": _json_backend,
+}
+
+backend: str
+dumps: Callable[[Any], bytes]
+dumps_line: Callable[[Any], bytes]
+loads: Callable[[Union[bytes, str]], Any]
+
+
+def set_backend(name: str) -> None:
+    """Choose the JSON library used by llmbo.
+
+    Args:
+        name (str): One of "orjson", "msgspec" or "json"
+
+    Raises:
+        ValueError: If the name is not a known backend
+        ImportError: If the backend's library is not installed
+    """
+    global backend, dumps, dumps_line, loads
+
+    if name not in _LOADERS:
+        logger.error(f"Unknown JSON backend {name}, expected one of {BACKENDS}")
+        raise ValueError(f"Unknown JSON backend {name}, expected one of {BACKENDS}")
+
+    dumps, dumps_line, loads = _LOADERS[name]()
+    backend = name
+    logger.debug(f"Using {name} for JSON serialization")
+
+
+def _set_default_backend() -> None:
+    for name in BACKENDS:
+        try:
+            set_backend(name)
+            return
+        except ImportError:
+            continue
+
+
+_set_default_backend()
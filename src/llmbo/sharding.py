@@ -0,0 +1,441 @@
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from .estimate import Estimate
+from .fleet import JobFleet
+from .llmbo import (
+    DEFAULT_PROGRESS_INTERVAL,
+    MIN_BATCH_SIZE,
+    VALID_FINISHED_STATUSES,
+    BatchInferer,
+    FileRequests,
+    Manifest,
+    ModelInputs,
+    PreparedRequests,
+    PrepareProgress,
+)
+
+# Bedrock's default per job quotas, check the Service Quotas console for your account
+DEFAULT_MAX_RECORDS_PER_JOB = 50_000
+DEFAULT_MAX_BYTES_PER_JOB = 1024**3
+DEFAULT_MAX_CONCURRENT_JOBS = 10
+
+
+class ShardedBatchInferer:
+    """Split a large batch across several concurrent Bedrock batch inference jobs.
+
+    Bedrock limits the number of records and the size of the input file for each
+    job, and the number of jobs an account can have in progress. This class splits
+    the inputs into shards which each satisfy those limits, runs each shard as its
+    own BatchInferer job while respecting the concurrent job quota, and merges the
+    outputs back together.
+
+    Args:
+        model_name (str): The name/ID of the AWS Bedrock model to use
+        bucket_name (str): The S3 bucket name for storing input/output data
+        region (str): The region to run the batch inference jobs in.
+        job_name (str): A unique name for the batch, each shard is named {job_name}-{index}
+        role_arn (str): The AWS IAM role ARN with necessary permissions
+        time_out_duration_hours (int, optional): Maximum job runtime in hours. Defaults to 24.
+        max_records_per_job (int, optional): Maximum records per shard. Defaults to 50,000.
+        max_bytes_per_job (int, optional): Maximum input file size per shard. Defaults to 1 GiB.
+        max_concurrent_jobs (int, optional): Maximum shards in progress at once. Defaults to 10.
+        inferer_cls (Type[BatchInferer], optional): The inferer used for each shard.
+            Defaults to BatchInferer.
+        **inferer_kwargs: Extra arguments for inferer_cls, e.g. output_model for a
+            StructuredBatchInferer
+
+    Attributes:
+        shards (List[BatchInferer]): One inferer per shard. Available after prepare_requests.
+        results (List[dict]): The merged results of every shard in recordId order.
+            Available after load_results.
+        instances (List[dict]): The merged instances, when inferer_cls is a
+            StructuredBatchInferer. Available after load_results.
+        manifest (Manifest): The summed statistics of every shard. Available after load_results.
+    """
+
+    logger = logging.getLogger(f"{__name__}.ShardedBatchInferer")
+
+    def __init__(
+        self,
+        model_name: str,
+        bucket_name: str,
+        region: str,
+        job_name: str,
+        role_arn: str,
+        time_out_duration_hours: int = 24,
+        max_records_per_job: int = DEFAULT_MAX_RECORDS_PER_JOB,
+        max_bytes_per_job: int = DEFAULT_MAX_BYTES_PER_JOB,
+        max_concurrent_jobs: int = DEFAULT_MAX_CONCURRENT_JOBS,
+        inferer_cls: Type[BatchInferer] = BatchInferer,
+        **inferer_kwargs,
+    ):
+        # Two shards must always be able to share an undersized remainder
+        if max_records_per_job < 2 * MIN_BATCH_SIZE:
+            self.logger.error(
+                f"max_records_per_job must be at least {2 * MIN_BATCH_SIZE}"
+            )
+            raise ValueError(
+                f"max_records_per_job must be at least {2 * MIN_BATCH_SIZE}"
+            )
+        if max_concurrent_jobs < 1:
+            self.logger.error("max_concurrent_jobs must be at least 1")
+            raise ValueError("max_concurrent_jobs must be at least 1")
+
+        self.job_name = job_name
+        self.max_records_per_job = max_records_per_job
+        self.max_bytes_per_job = max_bytes_per_job
+        self.max_concurrent_jobs = max_concurrent_jobs
+
+        # The template is checked once, every shard is spawned from it
+        self.template = inferer_cls(
+            model_name=model_name,
+            bucket_name=bucket_name,
+            region=region,
+            job_name=job_name,
+            role_arn=role_arn,
+            time_out_duration_hours=time_out_duration_hours,
+            **inferer_kwargs,
+        )
+        self.fleet = JobFleet(region=region, client=self.template.client)
+
+        self.shards: List[BatchInferer] = []
+        self.results = None
+        self.instances = None
+        self.manifest = None
+
+    @property
+    def job_arns(self) -> List[str]:
+        """The ARNs of every shard job created so far."""
+        return [shard.job_arn for shard in self.shards if shard.job_arn]
+
+    def _shard_name(self, index: int) -> str:
+        return f"{self.job_name}-{index:03d}"
+
+    def _fits(self, records: int, size: int) -> bool:
+        return (
+            MIN_BATCH_SIZE <= records <= self.max_records_per_job
+            and size <= self.max_bytes_per_job
+        )
+
+    def _rebalance(
+        self, previous: PreparedRequests, last: PreparedRequests
+    ) -> Tuple[PreparedRequests, PreparedRequests]:
+        """Repartition the last two shards so both meet the minimum batch size.
+
+        Where possible the records stay in order, split at the point nearest the
+        middle which keeps both shards within the record and byte limits. Otherwise
+        records are placed largest first on whichever shard holds fewer bytes, which
+        keeps both shards' sizes close. Results are merged in recordId order, so the
+        order of records within a shard doesn't matter.
+
+        Returns:
+            Tuple[PreparedRequests, PreparedRequests]: The two new shards
+
+        Raises:
+            ValueError: If the records can't make two shards of at least
+                MIN_BATCH_SIZE records, each within max_bytes_per_job
+        """
+        lines = [*previous.lines(), *last.lines()]
+        total = sum(map(len, lines))
+        prefix = [0]
+        for line in lines:
+            prefix.append(prefix[-1] + len(line))
+        splits = [
+            split
+            for split in range(MIN_BATCH_SIZE, len(lines) - MIN_BATCH_SIZE + 1)
+            if self._fits(split, prefix[split])
+            and self._fits(len(lines) - split, total - prefix[split])
+        ]
+        if splits:
+            split = min(splits, key=lambda split: abs(2 * split - len(lines)))
+            return (
+                PreparedRequests._wrap(lines[:split]),
+                PreparedRequests._wrap(lines[split:]),
+            )
+
+        most_records = min(self.max_records_per_job, len(lines) - MIN_BATCH_SIZE)
+        shards: Tuple[List[bytes], List[bytes]] = ([], [])
+        sizes = [0, 0]
+        for line in sorted(lines, key=len, reverse=True):
+            lighter = 0 if sizes[0] <= sizes[1] else 1
+            if len(shards[lighter]) >= most_records:
+                lighter = 1 - lighter
+            shards[lighter].append(line)
+            sizes[lighter] += len(line)
+
+        if not all(self._fits(len(shard), size) for shard, size in zip(shards, sizes)):
+            self.logger.error(
+                f"Records are too large to shard into batches of {MIN_BATCH_SIZE}"
+            )
+            raise ValueError(
+                f"Records are too large to shard into batches of {MIN_BATCH_SIZE}"
+            )
+        return PreparedRequests._wrap(shards[0]), PreparedRequests._wrap(shards[1])
+
+    def prepare_requests(
+        self,
+        inputs: ModelInputs,
+        progress_callback: Optional[Callable[[PrepareProgress], None]] = None,
+        progress_interval: int = DEFAULT_PROGRESS_INTERVAL,
+    ) -> None:
+        """Prepare the inputs and split them into compliant shards.
+
+        Each shard holds at most max_records_per_job records, and at most
+        max_bytes_per_job bytes of serialized JSONL. An undersized final shard is
+        rebalanced with the one before it so every shard meets Bedrock's minimum
+        batch size. If the inferers were given a cache, inputs with a cached response
+        are set aside rather than sharded, and merged back in by load_results(). The
+        same goes for duplicate inputs when deduplicate is set.
+
+        Args:
+            inputs (ModelInputs): Dictionary mapping record IDs to their corresponding
+                ModelInput configurations, or any iterable of (record_id, ModelInput) pairs.
+            progress_callback (Callable[[PrepareProgress], None], optional): Called
+                every progress_interval requests, and once more when every request
+                is prepared. Defaults to logging the progress at INFO.
+            progress_interval (int, optional): The number of requests between
+                progress reports. Defaults to 100,000.
+
+        Raises:
+            ValueError: If there are fewer than 100 inputs in total, or the records
+                are too large to make shards of at least 100 within max_bytes_per_job
+
+        Note:
+            - Each request is encoded once, to measure it, and each shard's requests
+              are a PreparedRequests holding those encoded lines
+            - Only the last two shards can be rebalanced, so once a third is
+              started the earliest in memory is written to {job_name}-{index}.jsonl,
+              the file it is uploaded from, and becomes a FileRequests. At most two
+              shards of requests are held in memory, however many inputs there are.
+        """
+        batches: List[Union[PreparedRequests, FileRequests]] = []
+        current = PreparedRequests()
+        current_bytes = 0
+        self.template._reset_state()
+        records = self.template._iter_records(
+            inputs, progress_callback, progress_interval
+        )
+        if self.template.cache or self.template.deduplicate:
+            records = self.template._skip_known(records)
+        for record in records:
+            line = self.template._dump_record(record)
+            if len(current) and (
+                len(current) >= self.max_records_per_job
+                or current_bytes + len(line) > self.max_bytes_per_job
+            ):
+                batches.append(current)
+                current, current_bytes = PreparedRequests(), 0
+                if len(batches) >= 2:
+                    index = len(batches) - 2
+                    batches[index] = FileRequests.write(
+                        f"{self._shard_name(index)}.jsonl", batches[index].lines()
+                    )
+            current.append_line(line)
+            current_bytes += len(line)
+        batches.append(current)
+
+        if not batches[0] and not self.template.cached_results:
+            self.logger.error(f"Minimum Batch Size is {MIN_BATCH_SIZE}, 0 given.")
+            raise ValueError(f"Minimum Batch Size is {MIN_BATCH_SIZE}, 0 given.")
+        if len(batches) == 1 and len(current) < MIN_BATCH_SIZE:
+            topped_up = self.template._top_up(list(current))
+            current = PreparedRequests(map(self.template._dump_record, topped_up))
+            batches = [current] if current else []
+
+        if batches and len(batches[-1]) < MIN_BATCH_SIZE:
+            if len(batches) == 1:
+                self.logger.error(
+                    f"Minimum Batch Size is {MIN_BATCH_SIZE}, {len(current)} given."
+                )
+                raise ValueError(
+                    f"Minimum Batch Size is {MIN_BATCH_SIZE}, {len(current)} given."
+                )
+            batches[-2:] = self._rebalance(batches[-2], batches[-1])
+
+        self.shards = []
+        for index, batch in enumerate(batches):
+            shard = self.template._spawn(self._shard_name(index))
+            shard.requests = batch
+            self.shards.append(shard)
+
+        self.logger.info(
+            f"Prepared {sum(len(batch) for batch in batches)} requests "
+            f"in {len(self.shards)} shards"
+        )
+
+    def estimate(self, **kwargs) -> List[Estimate]:
+        """Estimate the tokens and cost of each shard before it is submitted.
+
+        Args:
+            **kwargs: Passed to each shard's estimate, so limits apply per shard
+
+        Returns:
+            List[Estimate]: The estimate for each shard. Add them for the total.
+        """
+        return [shard.estimate(**kwargs) for shard in self.shards]
+
+    def push_requests_to_s3(self, **kwargs) -> List[Dict[str, Any]]:
+        """Upload every shard's requests to S3.
+
+        Args:
+            **kwargs: Passed to each shard's push_requests_to_s3
+
+        Returns:
+            List[dict]: The S3 upload response for each shard
+        """
+        return [shard.push_requests_to_s3(**kwargs) for shard in self.shards]
+
+    def _in_progress(self) -> List[BatchInferer]:
+        return [
+            shard
+            for shard in self.shards
+            if shard.job_arn and shard.job_status not in VALID_FINISHED_STATUSES
+        ]
+
+    def create(self) -> List[Dict[str, Any]]:
+        """Create jobs for pending shards, up to the concurrent job quota.
+
+        Shards which don't fit under max_concurrent_jobs are left pending, they are
+        created by poll_progress as earlier jobs finish.
+
+        Returns:
+            List[dict]: The create_model_invocation_job response for each job created
+
+        Raises:
+            AttributeError: If called before prepare_requests()
+        """
+        if not self.shards:
+            self.logger.error("There were no prepared requests")
+            raise AttributeError("There were no prepared requests")
+
+        free_slots = self.max_concurrent_jobs - len(self._in_progress())
+        pending = [shard for shard in self.shards if not shard.job_arn]
+        responses = []
+        for shard in pending[:free_slots]:
+            responses.append(shard.create())
+            self.fleet.add(shard)
+        if responses:
+            self.logger.info(
+                f"Created {len(responses)} jobs, {len(pending) - len(responses)} pending"
+            )
+        return responses
+
+    def check_complete(self) -> bool:
+        """Check every shard job, creating pending shards as slots free up.
+
+        Returns:
+            bool: True once every shard's job has finished
+        """
+        self.fleet.check()
+        self.create()
+        return all(shard.job_status in VALID_FINISHED_STATUSES for shard in self.shards)
+
+    def poll_progress(self, poll_interval_seconds: int = 60) -> bool:
+        """Poll every shard until all of their jobs have finished.
+
+        Args:
+            poll_interval_seconds (int, optional): Number of seconds between checks. Defaults to 60.
+
+        Returns:
+            bool: True when every job is complete.
+        """
+        self.logger.info(f"Polling for progress every {poll_interval_seconds} seconds")
+        while not self.check_complete():
+            time.sleep(poll_interval_seconds)
+        return True
+
+    def cancel_batch(self) -> None:
+        """Cancel every shard job that is still in progress."""
+        for shard in self._in_progress():
+            shard.cancel_batch()
+
+    def download_results(self, **kwargs) -> None:
+        """Download the results and manifest of every shard from S3.
+
+        Args:
+            **kwargs: Passed to each shard's download_results
+        """
+        for shard in self.shards:
+            shard.download_results(**kwargs)
+
+    def load_results(self, **kwargs) -> None:
+        """Load every shard's results and merge them in recordId order.
+
+        Args:
+            **kwargs: Passed to each shard's load_results, e.g. validation_workers
+
+        Populates:
+            - self.results: The results of every shard, along with any cached or
+              duplicate inputs, sorted by recordId
+            - self.instances: The matching validated instances, if the shards are
+              StructuredBatchInferers
+            - self.manifest: The statistics of every shard summed together
+        """
+        merged = []
+        for shard in self.shards:
+            shard.load_results(**kwargs)
+            instances = getattr(shard, "instances", None) or [None] * len(shard.results)
+            merged.extend(zip(shard.results, instances))
+        if self.template.cached_results:
+            # the template holds the cached results, so load them like a shard
+            self.template.requests = []
+            self.template.load_results(**kwargs)
+            instances = getattr(self.template, "instances", None) or [None] * len(
+                self.template.results
+            )
+            merged.extend(zip(self.template.results, instances))
+        if self.template.duplicates:
+            loaded = {
+                result["recordId"]: (result, instance) for result, instance in merged
+            }
+            for record_id, representative in self.template.duplicates.items():
+                if representative not in loaded:
+                    continue
+                result, instance = loaded[representative]
+                if instance is not None:
+                    instance = {**instance, "recordId": record_id}
+                merged.append(({**result, "recordId": record_id}, instance))
+        merged.sort(key=lambda pair: pair[0]["recordId"])
+
+        self.results = [result for result, _ in merged]
+        if hasattr(self.template, "instances"):
+            self.instances = [instance for _, instance in merged]
+        self.manifest = self._merge_manifests([shard.manifest for shard in self.shards])
+
+    @staticmethod
+    def _merge_manifests(manifests: List[Manifest]) -> Manifest:
+        def total(field: str) -> Optional[int]:
+            values = [getattr(manifest, field) for manifest in manifests]
+            if any(value is None for value in values):
+                return None
+            return sum(values)
+
+        return Manifest(
+            totalRecordCount=total("totalRecordCount"),
+            processedRecordCount=total("processedRecordCount"),
+            successRecordCount=total("successRecordCount"),
+            errorRecordCount=total("errorRecordCount"),
+            inputTokenCount=total("inputTokenCount"),
+            outputTokenCount=total("outputTokenCount"),
+        )
+
+    def auto(self, inputs: ModelInputs) -> List[dict]:
+        """Execute the complete sharded workflow automatically.
+
+        Args:
+            inputs (ModelInputs): Dictionary of record IDs mapped to their ModelInput
+                configurations, or an iterable of (record_id, ModelInput) pairs
+
+        Returns:
+            List[dict]: The merged results of every shard
+        """
+        self.prepare_requests(inputs)
+        if self.shards:
+            self.push_requests_to_s3()
+            self.create()
+            self.poll_progress(10 * 60)
+            self.download_results()
+        self.load_results()
+        return self.results
@@ -0,0 +1,93 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from . import serialization
+
+logger = logging.getLogger(__name__)
+
+# the stages of a batch job, in the order they are reached
+STAGES = ("prepared", "uploaded", "created", "downloaded")
+
+
+class StateStore:
+    """Record how far each batch job has got in a SQLite file.
+
+    Pass one to a BatchInferer and every stage it completes is saved under its
+    job_name. A new BatchInferer with the same job_name and store picks up where the
+    last one stopped, so an orchestrator that crashes can be restarted without
+    preparing, uploading or submitting the job again.
+
+    Args:
+        path (str): The database file, created if it doesn't exist
+
+    Example:
+        >>> store = StateStore("jobs.db")
+        >>> bi = BatchInferer(..., job_name="nightly-2024-01-01", state_store=store)
+        >>> bi.auto(inputs)  # after a crash, run the same again to resume
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_name TEXT PRIMARY KEY, stage TEXT NOT NULL, "
+                "details BLOB NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def save(self, job_name: str, stage: str, details: Dict[str, Any]) -> None:
+        """Record that a job has reached a stage.
+
+        Args:
+            job_name (str): The job
+            stage (str): One of STAGES
+            details (Dict[str, Any]): Anything needed to resume from this stage
+
+        Raises:
+            ValueError: If the stage is not one of STAGES
+        """
+        if stage not in STAGES:
+            logger.error(f"Unknown stage {stage}, expected one of {STAGES}")
+            raise ValueError(f"Unknown stage {stage}, expected one of {STAGES}")
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                (job_name, stage, serialization.dumps(details), time.time()),
+            )
+        logger.debug(f"Job {job_name} reached stage {stage}")
+
+    def load(self, job_name: str) -> Optional[Dict[str, Any]]:
+        """The last saved state of a job.
+
+        Args:
+            job_name (str): The job
+
+        Returns:
+            Optional[Dict[str, Any]]: The stage, details and time it was updated, or
+                None if nothing was saved for the job
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT stage, details, updated FROM jobs WHERE job_name = ?",
+                (job_name,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "stage": row[0],
+            "details": serialization.loads(row[1]),
+            "updated": row[2],
+        }
+
+    def delete(self, job_name: str) -> None:
+        """Forget a job, so the next run with its job_name starts from scratch."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM jobs WHERE job_name = ?", (job_name,))
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,109 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List
+
+from boto3.s3.transfer import TransferConfig
+
+logger = logging.getLogger(__name__)
+
+# S3 requires every part of a multipart upload, except the last, to be >= 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Result files can be many GB, so fetch them in large ranged GETs, many at a time
+DEFAULT_DOWNLOAD_CONFIG = TransferConfig(
+    multipart_threshold=64 * 1024 * 1024,
+    multipart_chunksize=64 * 1024 * 1024,
+    max_concurrency=16,
+)
+
+
+def stream_lines_to_s3(
+    s3_client,
+    bucket: str,
+    key: str,
+    lines: Iterable[bytes],
+    part_size: int = DEFAULT_PART_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    content_type: str = "application/json",
+) -> Dict[str, Any]:
+    """Stream an iterable of encoded lines into an S3 object via multipart upload.
+
+    Lines are packed into parts of roughly `part_size` bytes which are uploaded
+    concurrently. At most `max_concurrency` parts are in flight at once, so memory
+    use is bounded by about `(max_concurrency + 1) * part_size` regardless of the
+    total object size.
+
+    Args:
+        s3_client: A boto3 S3 client
+        bucket (str): The destination bucket
+        key (str): The destination key
+        lines (Iterable[bytes]): Encoded lines, each including its trailing newline
+        part_size (int, optional): Target size of each part in bytes. Defaults to 16 MiB.
+        max_concurrency (int, optional): Maximum parts uploading at once. Defaults to 4.
+        content_type (str, optional): Content-Type of the object. Defaults to 'application/json'.
+
+    Returns:
+        dict: The response from complete_multipart_upload
+
+    Raises:
+        ValueError: If part_size is below the S3 minimum of 5 MiB
+        ClientError: If any S3 call fails, the multipart upload is aborted first
+    """
+    if part_size < MIN_PART_SIZE:
+        logger.error(f"part_size must be at least {MIN_PART_SIZE} bytes")
+        raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
+
+    upload_id = s3_client.create_multipart_upload(
+        Bucket=bucket, Key=key, ContentType=content_type
+    )["UploadId"]
+
+    def upload_part(part_number: int, body: bytes) -> Dict[str, Any]:
+        response = s3_client.upload_part(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        logger.debug(f"Uploaded part {part_number} ({len(body)} bytes) of {key}")
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    parts: List[Dict[str, Any]] = []
+    in_flight: List[Future] = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+
+            def submit(part_number: int, body: bytes) -> None:
+                # wait for the oldest part before buffering more than we can send
+                if len(in_flight) >= max_concurrency:
+                    parts.append(in_flight.pop(0).result())
+                in_flight.append(executor.submit(upload_part, part_number, body))
+
+            buffer = bytearray()
+            part_number = 1
+            for line in lines:
+                buffer += line
+                if len(buffer) >= part_size:
+                    submit(part_number, bytes(buffer))
+                    buffer.clear()
+                    part_number += 1
+
+            # the final part may be smaller than the minimum, or even empty
+            if buffer or part_number == 1:
+                submit(part_number, bytes(buffer))
+
+            while in_flight:
+                parts.append(in_flight.pop(0).result())
+
+        return s3_client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        logger.error(f"Multipart upload of {key} failed, aborting")
+        s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
@@ -0,0 +1,123 @@
+import io
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from llmbo import BatchInferer, ModelInput, clients, preflight
+
+
+@pytest.fixture(autouse=True)
+def fresh_client_pool():
+    """Stop clients and checks from one test's mocks leaking into the next."""
+    clients.set_default_pool(None)
+    preflight.set_default_cache(None)
+    yield
+    clients.set_default_pool(None)
+    preflight.set_default_cache(None)
+
+
+@pytest.fixture
+def mock_iam_client():
+    """Create a mock iam client"""
+    mock_client = MagicMock()
+    mock_client.get_role.return_value = {}
+    return mock_client
+
+
+@pytest.fixture
+def mock_bedrock_client():
+    """Create a mock Bedrock client with expected responses."""
+    mock_client = MagicMock()
+
+    # Configure mock responses
+    mock_client.create_model_invocation_job.return_value = {
+        "ResponseMetadata": {"HTTPStatusCode": 200},
+        "jobArn": "arn:aws:bedrock:region:account:job/test-job",
+    }
+
+    mock_client.get_model_invocation_job.return_value = {
+        "status": "Completed",
+        "jobName": "test-job",
+        "modelId": "anthropic.claude-3-haiku-20240307-v1:0",
+        "inputDataConfig": {
+            "s3InputDataConfig": {"s3Uri": "s3://test-bucket/input/test.jsonl"}
+        },
+        "roleArn": "arn:aws:iam::123456789012:role/TestRole",
+        "submitTime": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "ResponseMetadata": {"HTTPStatusCode": 200},
+    }
+
+    mock_client.stop_model_invocation_job.return_value = {
+        "ResponseMetadata": {"HTTPStatusCode": 200}
+    }
+
+    return mock_client
+
+
+@pytest.fixture
+def mock_bedrock_runtime_client():
+    """Create a mock Bedrock runtime client which echoes a fixed response."""
+    mock_client = MagicMock()
+    mock_client.invoke_model.side_effect = lambda **_: {
+        "body": io.BytesIO(
+            b'{"content": [{"type": "text", "text": "Hello"}],'
+            b' "usage": {"input_tokens": 10, "output_tokens": 5}}'
+        )
+    }
+    return mock_client
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Create a mock S3 client."""
+    mock_client = MagicMock()
+    mock_client.upload_file.return_value = None
+    mock_client.download_file.return_value = None
+    mock_client.get_bucket_location.return_value = {"LocationConstraint": "test-region"}
+    return mock_client
+
+
+@pytest.fixture
+def sample_inputs():
+    """Create minimal valid inputs for testing."""
+    return {
+        f"{i:03}": ModelInput(
+            messages=[{"role": "user", "content": "Test message"}],
+        )
+        for i in range(100)
+    }
+
+
+@pytest.fixture
+def mock_boto3_session(
+    mock_bedrock_client, mock_bedrock_runtime_client, mock_s3_client, mock_iam_client
+):
+    """Create a mock boto3 client that returns appropriate service clients."""
+    with patch("boto3.Session") as mock_session:
+        mock_session_instance = mock_session.return_value
+
+        def mock_client(service_name, region_name=None):
+            return {
+                "bedrock": mock_bedrock_client,
+                "bedrock-runtime": mock_bedrock_runtime_client,
+                "s3": mock_s3_client,
+                "iam": mock_iam_client,
+            }.get(service_name, MagicMock())
+
+        mock_session_instance.client.side_effect = mock_client
+        mock_session_instance.profile_name = "test-profile"
+        mock_session_instance.get_credentials.return_value.access_key = "AKIATEST"
+        yield mock_session
+
+
+@pytest.fixture
+def batch_inferer(mock_boto3_session):
+    """Create a configured BatchInferer instance for testing."""
+    return BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+    )
@@ -0,0 +1,108 @@
+import asyncio
+from unittest.mock import Mock
+
+from pydantic import BaseModel
+
+from llmbo import AsyncBatchInferer, AsyncStructuredBatchInferer, BatchInferer
+
+INFERER_ARGS = {
+    "model_name": "test-model",
+    "bucket_name": "test-bucket",
+    "region": "test-region",
+    "job_name": "test-job",
+    "role_arn": "arn:aws:iam::123456789012:role/TestRole",
+}
+
+
+class ExampleOutput(BaseModel):
+    name: str
+    age: int
+
+
+def test_build(mock_boto3_session):
+    """Test the wrapped inferer is built and its attributes are exposed."""
+    abi = asyncio.run(AsyncBatchInferer.build(**INFERER_ARGS))
+
+    assert isinstance(abi.inferer, BatchInferer)
+    assert abi.job_name == "test-job"
+    assert abi.job_arn is None
+
+
+def test_structured_build(mock_boto3_session):
+    asbi = asyncio.run(
+        AsyncStructuredBatchInferer.build(output_model=ExampleOutput, **INFERER_ARGS)
+    )
+
+    assert asbi.output_model == ExampleOutput
+    assert asbi.instances is None
+
+
+def test_create_and_poll(mock_boto3_session, mock_bedrock_client, sample_inputs):
+    """Test creating and polling a job through the event loop."""
+    statuses = iter(["Submitted", "InProgress", "Completed"])
+    mock_bedrock_client.get_model_invocation_job.side_effect = lambda **_: {
+        "status": next(statuses)
+    }
+
+    async def run():
+        abi = await AsyncBatchInferer.build(**INFERER_ARGS)
+        await abi.prepare_requests(sample_inputs)
+        await abi.create()
+        assert await abi.poll_progress(poll_interval_seconds=0)
+        return abi
+
+    abi = asyncio.run(run())
+
+    assert abi.job_arn == "arn:aws:bedrock:region:account:job/test-job"
+    assert abi.job_status == "Completed"
+    assert mock_bedrock_client.get_model_invocation_job.call_count == 3
+
+
+def test_many_jobs_share_one_loop(mock_boto3_session, sample_inputs):
+    """Test several inferers can be driven concurrently with gather."""
+
+    async def run_one(index):
+        abi = await AsyncBatchInferer.build(
+            **{**INFERER_ARGS, "job_name": f"test-job-{index}"}
+        )
+        await abi.prepare_requests(sample_inputs)
+        await abi.create()
+        await abi.poll_progress(poll_interval_seconds=0)
+        return abi.job_status
+
+    async def run():
+        return await asyncio.gather(*(run_one(index) for index in range(5)))
+
+    assert asyncio.run(run()) == ["Completed"] * 5
+
+
+def test_results_arguments_are_forwarded(mock_boto3_session):
+    """Test download_results and load_results pass their arguments through."""
+
+    async def run():
+        abi = await AsyncBatchInferer.build(**INFERER_ARGS)
+        abi.inferer.download_results = Mock()
+        abi.inferer.load_results = Mock()
+        await abi.download_results(build_index=True)
+        await abi.load_results(validation_workers=2)
+        return abi
+
+    abi = asyncio.run(run())
+
+    abi.inferer.download_results.assert_called_once_with(build_index=True)
+    abi.inferer.load_results.assert_called_once_with(validation_workers=2)
+
+
+def test_auto_runs_the_same_steps_as_the_sync_inferer(
+    mock_boto3_session, sample_inputs
+):
+    """Test auto follows BatchInferer's plan, here running the requests in realtime."""
+
+    async def run():
+        abi = await AsyncBatchInferer.build(realtime=True, **INFERER_ARGS)
+        return await abi.auto(sample_inputs)
+
+    results = asyncio.run(run())
+
+    assert len(results) == 100
+    assert results[0]["modelOutput"]["content"][0]["text"] == "Hello"
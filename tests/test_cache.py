@@ -0,0 +1,346 @@
+import json
+import sqlite3
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from llmbo import (
+    BatchInferer,
+    DirectoryCache,
+    ModelInput,
+    ShardedBatchInferer,
+    SQLiteCache,
+    StructuredBatchInferer,
+    request_key,
+)
+
+
+@pytest.fixture(params=["sqlite", "directory"])
+def make_cache(request, tmp_path):
+    """Build either cache backend in a temporary location."""
+
+    def make(**kwargs):
+        if request.param == "sqlite":
+            return SQLiteCache(str(tmp_path / "cache.db"), **kwargs)
+        return DirectoryCache(str(tmp_path / "cache"), **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def distinct_inputs():
+    return {
+        f"{i:03}": ModelInput(messages=[{"role": "user", "content": f"Message {i}"}])
+        for i in range(150)
+    }
+
+
+def test_request_key_ignores_key_order():
+    assert request_key("model", {"a": 1, "b": 2}) == request_key(
+        "model", {"b": 2, "a": 1}
+    )
+    assert request_key("model", {"a": 1}) != request_key("other-model", {"a": 1})
+
+
+def test_get_and_set(make_cache):
+    cache = make_cache()
+    assert cache.get("abc") is None
+
+    cache.set("abc", {"content": [{"text": "hello"}]})
+
+    assert cache.get("abc") == {"content": [{"text": "hello"}]}
+
+
+def test_expired_entries_are_ignored_and_evicted(make_cache):
+    cache = make_cache(max_age_seconds=60)
+    cache.set("abc", {"text": "hello"})
+
+    cache.max_age_seconds = -1
+    assert cache.get("abc") is None
+    assert cache.evict() == 1
+
+
+def test_least_recently_used_entries_are_evicted(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.set("aaa", {"text": "a"})
+    time.sleep(0.01)
+    cache.set("bbb", {"text": "b"})
+    time.sleep(0.01)
+    cache.get("aaa")
+    time.sleep(0.01)
+    cache.set("ccc", {"text": "c"})
+
+    assert cache.get("bbb") is None
+    assert cache.get("aaa") == {"text": "a"}
+    assert cache.get("ccc") == {"text": "c"}
+
+
+def test_sqlite_hits_are_written_in_one_flush(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path)
+    cache.set_many([("aaa", {"text": "a"}), ("bbb", {"text": "b"})])
+
+    def accessed():
+        with sqlite3.connect(path) as connection:
+            return dict(connection.execute("SELECT key, accessed FROM responses"))
+
+    before = accessed()
+    time.sleep(0.01)
+    cache.get("aaa")
+    cache.get("bbb")
+    assert accessed() == before
+
+    cache.flush()
+    after = accessed()
+    assert after["aaa"] > before["aaa"]
+    assert after["bbb"] > before["bbb"]
+    cache.close()
+
+
+def test_prepare_requests_skips_cached_inputs(
+    mock_boto3_session, distinct_inputs, tmp_path
+):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set_many(
+        (request_key("test-model", model_input.to_dict()), {"cached": record_id})
+        for record_id, model_input in list(distinct_inputs.items())[:40]
+    )
+    bi = BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        cache=cache,
+    )
+
+    bi.prepare_requests(distinct_inputs)
+
+    # 110 would be left, which is enough for a batch so nothing is topped up
+    assert len(bi.requests) == 110
+    assert len(bi.cached_results) == 40
+    assert bi.cached_results["000"]["modelOutput"] == {"cached": "000"}
+
+
+def test_prepare_requests_tops_up_small_batches(
+    mock_boto3_session, distinct_inputs, tmp_path
+):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set_many(
+        (request_key("test-model", model_input.to_dict()), {"cached": record_id})
+        for record_id, model_input in list(distinct_inputs.items())[:100]
+    )
+    bi = BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        cache=cache,
+    )
+
+    bi.prepare_requests(iter(distinct_inputs.items()))
+
+    # only 50 are uncached, so 50 cached inputs are sent again
+    assert len(list(bi.requests)) == 100
+    assert len(bi.cached_results) == 50
+
+
+def test_auto_skips_job_when_everything_is_cached(
+    mock_boto3_session, mock_bedrock_client, sample_inputs, tmp_path
+):
+    cache = DirectoryCache(str(tmp_path / "cache"))
+    model_input = next(iter(sample_inputs.values()))
+    cache.set(request_key("test-model", model_input.to_dict()), {"text": "hi"})
+    bi = BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        cache=cache,
+    )
+
+    results = bi.auto(sample_inputs)
+
+    mock_bedrock_client.create_model_invocation_job.assert_not_called()
+    assert len(results) == 100
+    assert all(result["modelOutput"] == {"text": "hi"} for result in results)
+
+
+def test_load_results_fills_cache(
+    mock_boto3_session, distinct_inputs, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set(
+        request_key("test-model", distinct_inputs["000"].to_dict()), {"cached": True}
+    )
+    bi = BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        cache=cache,
+    )
+    bi.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    bi.prepare_requests(distinct_inputs)
+    bi.download_results()
+    with open(bi.output_file_name, "w") as file:
+        for record in bi.requests:
+            output = {"text": record["recordId"]}
+            file.write(json.dumps({**record, "modelOutput": output}) + "\n")
+    with open(bi.manifest_file_name, "w") as file:
+        manifest = {
+            "totalRecordCount": 149,
+            "processedRecordCount": 149,
+            "successRecordCount": 149,
+            "errorRecordCount": 0,
+            "inputTokenCount": 1000,
+            "outputTokenCount": 2000,
+        }
+        file.write(json.dumps(manifest) + "\n")
+
+    bi.load_results()
+
+    assert len(bi.results) == 150
+    assert cache.get(request_key("test-model", distinct_inputs["149"].to_dict())) == {
+        "text": "149"
+    }
+
+
+def test_sharded_prepare_requests_skips_cached_inputs(
+    mock_boto3_session, distinct_inputs, tmp_path
+):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set_many(
+        (request_key("test-model", model_input.to_dict()), {"cached": record_id})
+        for record_id, model_input in list(distinct_inputs.items())[:100]
+    )
+    sharded = ShardedBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        cache=cache,
+    )
+
+    sharded.prepare_requests(distinct_inputs)
+
+    assert [len(shard.requests) for shard in sharded.shards] == [100]
+    assert len(sharded.template.cached_results) == 50
+
+
+def test_prepare_requests_clears_earlier_cache_hits(
+    mock_boto3_session, distinct_inputs
+):
+    bi = BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        deduplicate=True,
+    )
+    bi.cached_results = {"stale": {"recordId": "stale", "modelOutput": {}}}
+    bi.duplicates = {"stale": "000"}
+
+    bi.prepare_requests(distinct_inputs)
+
+    assert bi.cached_results == {}
+    assert bi.duplicates == {}
+
+
+class Greeting(BaseModel):
+    text: str
+
+
+def test_structured_invalid_cached_outputs_are_resent(
+    mock_boto3_session, distinct_inputs, tmp_path
+):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    sbi = StructuredBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        output_model=Greeting,
+        cache=cache,
+    )
+    sbi.prepare_requests(distinct_inputs)
+    valid = {
+        "stop_reason": "tool_use",
+        "content": [{"type": "tool_use", "input": {"text": "hi"}}],
+    }
+    no_tool = {"stop_reason": "end_turn", "content": [{"type": "text", "text": "hi"}]}
+    wrong_schema = {
+        "stop_reason": "tool_use",
+        "content": [{"type": "tool_use", "input": {"other": "hi"}}],
+    }
+    outputs = [valid] * 50 + [no_tool] * 25 + [wrong_schema] * 25
+    cache.set_many(
+        (request_key("test-model", record["modelInput"]), output)
+        for record, output in zip(sbi.requests, outputs)
+    )
+
+    sbi.prepare_requests(distinct_inputs)
+
+    assert sorted(sbi.cached_results) == [f"{i:03}" for i in range(50)]
+    assert len(sbi.requests) == 100
+    assert {record["recordId"] for record in sbi.requests} == {
+        f"{i:03}" for i in range(50, 150)
+    }
+
+
+def test_structured_load_results_only_caches_valid_outputs(
+    mock_boto3_session, distinct_inputs, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    sbi = StructuredBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        output_model=Greeting,
+        cache=cache,
+    )
+    sbi.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    sbi.prepare_requests(distinct_inputs)
+    sbi.download_results()
+    with open(sbi.output_file_name, "w") as file:
+        for i, record in enumerate(sbi.requests):
+            output = {
+                "stop_reason": "tool_use",
+                "content": [{"type": "tool_use", "input": {"text": "hi"}}],
+            }
+            if i % 2:
+                output = {
+                    "stop_reason": "end_turn",
+                    "content": [{"type": "text", "text": "hi"}],
+                }
+            file.write(json.dumps({**record, "modelOutput": output}) + "\n")
+    with open(sbi.manifest_file_name, "w") as file:
+        manifest = {
+            "totalRecordCount": 150,
+            "processedRecordCount": 150,
+            "successRecordCount": 150,
+            "errorRecordCount": 0,
+            "inputTokenCount": 1000,
+            "outputTokenCount": 2000,
+        }
+        file.write(json.dumps(manifest) + "\n")
+
+    sbi.load_results()
+
+    cached = [
+        cache.get(request_key("test-model", record["modelInput"]))
+        for record in sbi.requests
+    ]
+    assert sum(output is not None for output in cached) == 75
+    assert all(output["stop_reason"] == "tool_use" for output in cached if output)
@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from llmbo import BatchInferer, ClientPool, clients
+
+
+def test_client_is_created_once_per_service_and_region():
+    session = MagicMock()
+    session.client.side_effect = lambda *args, **kwargs: MagicMock()
+    pool = ClientPool(session)
+
+    assert pool.client("s3") is pool.client("s3")
+    assert pool.client("bedrock", region_name="a") is not pool.client(
+        "bedrock", region_name="b"
+    )
+    assert session.client.call_count == 3
+
+
+def test_client_is_created_once_across_threads():
+    session = MagicMock()
+    pool = ClientPool(session)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        created = list(executor.map(lambda _: pool.client("s3"), range(100)))
+
+    assert all(client is created[0] for client in created)
+    session.client.assert_called_once_with("s3")
+
+
+def test_inferers_share_the_default_pool(mock_boto3_session):
+    kwargs = dict(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+    )
+    first = BatchInferer(job_name="first", **kwargs)
+    second = BatchInferer(job_name="second", **kwargs)
+
+    assert first.client_pool is second.client_pool
+    assert first.client is second.client
+    # one session, and one client each for s3, iam and bedrock
+    mock_boto3_session.assert_called_once()
+    assert mock_boto3_session.return_value.client.call_count == 3
+
+
+def test_inferer_uses_injected_session(mock_boto3_session):
+    session = mock_boto3_session.return_value
+    bi = BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        session=session,
+    )
+
+    assert bi.session is session
+    assert bi.client_pool is not clients.default_pool()
+
+
+def test_inferers_given_a_session_share_its_pool(mock_boto3_session):
+    session = mock_boto3_session.return_value
+    first, second = (
+        BatchInferer(
+            model_name="test-model",
+            bucket_name="test-bucket",
+            region="test-region",
+            job_name=job_name,
+            role_arn="arn:aws:iam::123456789012:role/TestRole",
+            session=session,
+        )
+        for job_name in ("first", "second")
+    )
+
+    assert first.client_pool is second.client_pool
+    assert first.client is second.client
+    assert clients.pool_for(MagicMock()) is not first.client_pool
+
+
+def test_session_must_match_client_pool(mock_boto3_session):
+    with pytest.raises(ValueError, match="client_pool's session"):
+        BatchInferer(
+            model_name="test-model",
+            bucket_name="test-bucket",
+            region="test-region",
+            job_name="test-job",
+            role_arn="arn:aws:iam::123456789012:role/TestRole",
+            session=MagicMock(),
+            client_pool=ClientPool(mock_boto3_session.return_value),
+        )
@@ -0,0 +1,113 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from llmbo import BatchInferer
+from llmbo.compression import (
+    check_compression,
+    compressed_name,
+    download_compressed,
+    open_read,
+    open_write,
+)
+
+
+@pytest.fixture
+def gzip_inferer(mock_boto3_session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        compression="gzip",
+    )
+
+
+def test_check_compression_rejects_unknown():
+    with pytest.raises(ValueError, match="Unknown compression"):
+        check_compression("bz2")
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_round_trip(compression, tmp_path):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    path = compressed_name(str(tmp_path / "records.jsonl"), compression)
+    lines = [json.dumps({"recordId": f"{i:03}"}).encode() + b"\n" for i in range(50)]
+
+    with open_write(path, compression) as file:
+        file.writelines(lines)
+    with open_read(path) as file:
+        assert list(file) == lines
+
+
+def test_download_compressed(tmp_path):
+    s3_client = type("S3", (), {})()
+    output = b'{"recordId": "000"}\n' * 100
+    body = io.BytesIO(output)
+    s3_client.get_object = lambda Bucket, Key: {"Body": body}
+
+    download_compressed(s3_client, "bucket", "key", str(tmp_path / "out.gz"), "gzip")
+
+    assert gzip.decompress((tmp_path / "out.gz").read_bytes()) == output
+    assert body.closed
+
+
+def test_push_requests_keeps_compressed_local_copy(
+    gzip_inferer, sample_inputs, tmp_path
+):
+    """Test S3 gets plain JSONL while the local copy is gzipped."""
+    s3_client = gzip_inferer.session.client("s3")
+    s3_client.upload_part.return_value = {"ETag": "etag"}
+
+    gzip_inferer.prepare_requests(sample_inputs)
+    gzip_inferer.push_requests_to_s3()
+
+    s3_client.upload_file.assert_not_called()
+    uploaded = s3_client.upload_part.call_args.kwargs["Body"]
+    assert gzip.decompress((tmp_path / "test-job.jsonl.gz").read_bytes()) == uploaded
+
+
+def test_download_and_iter_compressed_results(gzip_inferer, sample_inputs):
+    """Test the output is compressed on download and decompressed on read."""
+    gzip_inferer.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    s3_client = gzip_inferer.session.client("s3")
+    output = b"".join(
+        json.dumps({"recordId": record_id, "modelOutput": {}}).encode() + b"\n"
+        for record_id in sample_inputs
+    )
+    s3_client.get_object.return_value = {"Body": io.BytesIO(output)}
+
+    gzip_inferer.download_results()
+
+    assert gzip_inferer.output_file_name == "test-job_out.jsonl.gz"
+    s3_client.get_object.assert_called_once_with(
+        Bucket="test-bucket", Key="output/test-job/test-job.jsonl.out"
+    )
+    results = list(gzip_inferer.iter_results())
+    assert [result["recordId"] for result in results] == list(sample_inputs)
+
+
+def test_compressed_inferer_creates_job_from_plain_jsonl(gzip_inferer, sample_inputs):
+    """Test Bedrock is pointed at the uncompressed JSONL object in S3."""
+    s3_client = gzip_inferer.session.client("s3")
+    s3_client.upload_part.return_value = {"ETag": "etag"}
+    bedrock_client = gzip_inferer.session.client("bedrock")
+
+    gzip_inferer.prepare_requests(sample_inputs)
+    gzip_inferer.push_requests_to_s3()
+    gzip_inferer.create()
+
+    key = s3_client.create_multipart_upload.call_args.kwargs["Key"]
+    assert key == "input/test-job.jsonl"
+    config = bedrock_client.create_model_invocation_job.call_args.kwargs[
+        "inputDataConfig"
+    ]["s3InputDataConfig"]
+    assert config == {
+        "s3InputFormat": "JSONL",
+        "s3Uri": "s3://test-bucket/input/test-job.jsonl",
+    }
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from llmbo import BatchInferer, Estimate, ModelInput, RequestStream, ShardedBatchInferer
+from llmbo.estimate import CHARS_PER_TOKEN, batch_prices, estimate_lines
+
+HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
+
+
+@pytest.fixture
+def haiku_inferer(mock_boto3_session):
+    return BatchInferer(
+        model_name=HAIKU,
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+    )
+
+
+@pytest.fixture
+def long_inputs():
+    return {
+        f"{i:03}": ModelInput(
+            messages=[{"role": "user", "content": "word " * 1000}], max_tokens=500
+        )
+        for i in range(100)
+    }
+
+
+def test_batch_prices_match_the_longest_key():
+    assert batch_prices("us.anthropic.claude-3-5-haiku-20241022-v1:0") == (0.4, 2.0)
+    assert batch_prices(HAIKU) == (0.125, 0.625)
+    assert batch_prices("amazon.titan-text") == (None, None)
+
+
+def test_estimate_lines():
+    lines = [b'{"recordId":"0","modelInput":{"max_tokens":100}}\n'] * 10
+
+    estimate = estimate_lines(HAIKU, lines)
+
+    assert estimate.records == 10
+    assert estimate.input_tokens == int(len(lines[0]) * 10 / CHARS_PER_TOKEN)
+    assert estimate.max_output_tokens == 1000
+    assert estimate.max_output_cost == pytest.approx(1000 * 0.625 / 1_000_000)
+
+
+def test_estimate_lines_reads_default_max_tokens():
+    estimate = estimate_lines("unknown-model", [b'{"modelInput":{}}'])
+
+    assert estimate.max_output_tokens == 2000
+    assert estimate.max_cost is None
+
+
+def test_estimate_lines_ignores_max_tokens_in_messages():
+    tool_use = {"type": "tool_use", "name": "configure", "input": {"max_tokens": 9999}}
+    model_input = ModelInput(
+        messages=[{"role": "assistant", "content": [tool_use]}], max_tokens=100
+    )
+    line = json.dumps({"recordId": "0", "modelInput": model_input.to_dict()})
+
+    estimate = estimate_lines(HAIKU, [line.encode()])
+
+    assert estimate.max_output_tokens == 100
+
+
+def test_estimate(haiku_inferer, long_inputs):
+    haiku_inferer.prepare_requests(long_inputs)
+
+    estimate = haiku_inferer.estimate()
+
+    assert estimate.records == 100
+    # 5000 characters of content per request, plus the JSON around it
+    assert 100 * 5000 / CHARS_PER_TOKEN < estimate.input_tokens
+    assert estimate.input_tokens < 100 * 5200 / CHARS_PER_TOKEN
+    assert estimate.max_output_tokens == 100 * 500
+    assert estimate.max_cost == pytest.approx(
+        estimate.input_tokens * 0.125 / 1e6 + 50_000 * 0.625 / 1e6
+    )
+
+
+def test_estimate_with_tokenizer(haiku_inferer, long_inputs):
+    haiku_inferer.prepare_requests(long_inputs)
+
+    estimate = haiku_inferer.estimate(count_tokens=lambda line: line.count(b"word"))
+
+    assert estimate.input_tokens == 100 * 1000
+
+
+def test_estimate_rejects_oversized_jobs(haiku_inferer, long_inputs):
+    haiku_inferer.prepare_requests(long_inputs)
+
+    with pytest.raises(ValueError, match="input tokens, over the limit"):
+        haiku_inferer.estimate(max_input_tokens=1000)
+    with pytest.raises(ValueError, match="over the limit of \\$0.01"):
+        haiku_inferer.estimate(max_cost=0.01)
+
+
+def test_estimate_needs_a_price_for_max_cost(batch_inferer, long_inputs):
+    batch_inferer.prepare_requests(long_inputs)
+
+    with pytest.raises(ValueError, match="No price known"):
+        batch_inferer.estimate(max_cost=100)
+
+
+def test_estimate_refuses_streams(haiku_inferer, long_inputs):
+    haiku_inferer.prepare_requests(iter(long_inputs.items()))
+    assert isinstance(haiku_inferer.requests, RequestStream)
+
+    with pytest.raises(ValueError, match="RequestStream"):
+        haiku_inferer.estimate()
+
+
+def test_sharded_estimates_add_up(mock_boto3_session, long_inputs):
+    sharded = ShardedBatchInferer(
+        model_name=HAIKU,
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        max_records_per_job=200,
+    )
+    inputs = {
+        f"{i:03}": model_input
+        for i, model_input in enumerate(list(long_inputs.values()) * 4)
+    }
+    sharded.prepare_requests(inputs)
+
+    estimates = sharded.estimate()
+    total = sum(estimates[1:], estimates[0])
+
+    assert [estimate.records for estimate in estimates] == [200, 200]
+    assert isinstance(total, Estimate)
+    assert total.max_output_tokens == 400 * 500
@@ -0,0 +1,180 @@
+import json
+from typing import List, Literal, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from llmbo import BatchInferer, StructuredBatchInferer
+from llmbo.export import OutputModelColumns, flatten_result
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+class Review(BaseModel):
+    sentiment: Literal["positive", "negative"]
+    score: float
+    tags: List[str]
+    summary: Optional[str] = None
+
+
+def write_results(path, results):
+    with open(path, "w") as file:
+        for result in results:
+            file.write(json.dumps(result) + "\n")
+
+
+@pytest.fixture
+def text_results(batch_inferer, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    batch_inferer.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    batch_inferer.download_results()
+    results = [
+        {
+            "recordId": f"{i:03}",
+            "modelOutput": {
+                "stop_reason": "end_turn",
+                "content": [{"type": "text", "text": f"Answer {i}"}],
+                "usage": {"input_tokens": 10 + i, "output_tokens": 5},
+            },
+        }
+        for i in range(9)
+    ]
+    results.append(
+        {"recordId": "009", "error": {"errorCode": 400, "errorMessage": "bad input"}}
+    )
+    write_results(batch_inferer.output_file_name, results)
+    return batch_inferer
+
+
+@pytest.fixture
+def structured_results(mock_boto3_session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sbi = StructuredBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        output_model=Review,
+    )
+    sbi.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    sbi.download_results()
+    tool_input = {"sentiment": "positive", "score": 0.9, "tags": ["fast", "cheap"]}
+    write_results(
+        sbi.output_file_name,
+        [
+            {
+                "recordId": "000",
+                "modelOutput": {
+                    "stop_reason": "tool_use",
+                    "content": [{"type": "tool_use", "input": tool_input}],
+                    "usage": {"input_tokens": 100, "output_tokens": 20},
+                },
+            },
+            {
+                "recordId": "001",
+                "modelOutput": {
+                    "stop_reason": "end_turn",
+                    "content": [{"type": "text", "text": "Not a tool call"}],
+                },
+            },
+            {"recordId": "002", "error": {"errorMessage": "failed"}},
+        ],
+    )
+    return sbi
+
+
+def test_flatten_result_without_output():
+    assert flatten_result({"recordId": "000"}) == {
+        "recordId": "000",
+        "stop_reason": None,
+        "input_tokens": None,
+        "output_tokens": None,
+        "text": None,
+        "error_code": None,
+        "error_message": None,
+    }
+
+
+def test_to_arrow(text_results):
+    table = text_results.to_arrow(chunk_size=4)
+
+    assert table.num_rows == 10
+    assert table.schema.field("input_tokens").type == pa.int64()
+    assert table.column("recordId").to_pylist()[:2] == ["000", "001"]
+    assert table.column("text").to_pylist()[0] == "Answer 0"
+    assert table.column("input_tokens").to_pylist()[8] == 18
+    assert table.column("error_code").to_pylist()[9] == "400"
+    assert table.column("text").to_pylist()[9] is None
+
+
+def test_to_parquet_writes_a_row_group_per_chunk(text_results, tmp_path):
+    path = tmp_path / "results.parquet"
+
+    written = text_results.to_parquet(str(path), chunk_size=4)
+
+    assert written == 10
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    assert pq.read_table(path).equals(text_results.to_arrow())
+
+
+def test_to_arrow_includes_cached_and_duplicate_records(text_results):
+    text_results.cached_results = {
+        "010": {
+            "recordId": "010",
+            "modelInput": {},
+            "modelOutput": {"content": [{"type": "text", "text": "Cached"}]},
+        }
+    }
+    text_results.duplicates = {"011": "000", "012": "010"}
+
+    table = text_results.to_arrow(chunk_size=4)
+
+    texts = dict(
+        zip(table.column("recordId").to_pylist(), table.column("text").to_pylist())
+    )
+    assert table.num_rows == 13
+    assert texts["010"] == "Cached"
+    assert texts["011"] == "Answer 0"
+    assert texts["012"] == "Cached"
+
+
+def test_to_arrow_after_invoke_realtime(mock_boto3_session, sample_inputs):
+    bi = BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        realtime=True,
+    )
+    bi.prepare_requests(sample_inputs)
+    bi.invoke_realtime()
+
+    table = bi.to_arrow()
+
+    assert table.num_rows == 100
+    assert set(table.column("text").to_pylist()) == {"Hello"}
+    assert set(table.column("input_tokens").to_pylist()) == {10}
+
+
+def test_structured_to_arrow_adds_output_model_columns(structured_results):
+    table = structured_results.to_arrow()
+
+    assert table.schema.field("sentiment").type == pa.string()
+    assert table.schema.field("score").type == pa.float64()
+    assert table.schema.field("tags").type == pa.string()
+    assert table.column("sentiment").to_pylist() == ["positive", None, None]
+    assert table.column("score").to_pylist() == [0.9, None, None]
+    assert json.loads(table.column("tags")[0].as_py()) == ["fast", "cheap"]
+    assert table.column("text").to_pylist()[1] == "Not a tool call"
+    assert table.column("error_message").to_pylist()[2] == "failed"
+
+
+def test_output_model_columns_reject_clashing_fields():
+    class Clashing(BaseModel):
+        text: str
+
+    with pytest.raises(ValueError, match="clash"):
+        OutputModelColumns(Clashing)
@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from llmbo import JobFleet
+
+SUBMIT_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def fleet_client():
+    """Create a mock Bedrock client tracking three jobs."""
+    client = MagicMock()
+    client.get_model_invocation_job.side_effect = lambda jobIdentifier: {
+        "jobArn": jobIdentifier,
+        "jobName": f"nightly-{jobIdentifier[-1]}",
+        "status": "InProgress",
+        "submitTime": SUBMIT_TIME,
+    }
+    return client
+
+
+def set_listed_statuses(client, statuses):
+    client.get_paginator.return_value.paginate.return_value = [
+        {
+            "invocationJobSummaries": [
+                {"jobArn": job_arn, "status": status}
+                for job_arn, status in statuses.items()
+            ]
+        }
+    ]
+
+
+def test_check_uses_one_listing_for_all_jobs(fleet_client):
+    """Test jobs are described once, then checked from a single filtered listing."""
+    job_arns = [f"arn:aws:bedrock:region:account:job/{i}" for i in range(3)]
+    fleet = JobFleet(region="test-region", client=fleet_client)
+    for job_arn in job_arns:
+        fleet.add(job_arn)
+
+    fleet.check()
+    assert fleet_client.get_model_invocation_job.call_count == 3
+
+    set_listed_statuses(fleet_client, dict.fromkeys(job_arns, "InProgress"))
+    fleet.check()
+    fleet.check()
+
+    assert fleet_client.get_model_invocation_job.call_count == 3
+    fleet_client.get_paginator.assert_called_with("list_model_invocation_jobs")
+    filters = fleet_client.get_paginator.return_value.paginate.call_args.kwargs
+    assert filters["nameContains"] == "nightly-"
+    assert filters["submitTimeAfter"] < SUBMIT_TIME
+
+
+def test_on_complete_fires_as_each_job_finishes(fleet_client, batch_inferer):
+    """Test callbacks fire once per job, and inferers have their status updated."""
+    other_arn = "arn:aws:bedrock:region:account:job/2"
+    batch_inferer.job_arn = "arn:aws:bedrock:region:account:job/1"
+    finished = []
+    fleet = JobFleet(
+        region="test-region",
+        client=fleet_client,
+        on_complete=lambda job, status: finished.append((job, status)),
+    )
+    fleet.add(batch_inferer)
+    fleet.add(other_arn)
+    fleet.check()
+
+    set_listed_statuses(
+        fleet_client, {batch_inferer.job_arn: "Completed", other_arn: "InProgress"}
+    )
+    assert fleet.check() == [batch_inferer.job_arn]
+    assert finished == [(batch_inferer, "Completed")]
+    assert batch_inferer.job_status == "Completed"
+    assert fleet.pending == [other_arn]
+
+    set_listed_statuses(fleet_client, {other_arn: "Failed"})
+    fleet.check()
+    assert finished == [(batch_inferer, "Completed"), (other_arn, "Failed")]
+    assert fleet.pending == []
+
+
+def test_poll_progress_backs_off_while_nothing_changes(fleet_client, monkeypatch):
+    """Test the poll interval grows while idle and resets when a job changes."""
+    job_arn = "arn:aws:bedrock:region:account:job/1"
+    sleeps = []
+    listings = iter(["InProgress", "InProgress", "InProgress", "Completed"])
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        set_listed_statuses(fleet_client, {job_arn: next(listings)})
+
+    monkeypatch.setattr("llmbo.fleet.time.sleep", sleep)
+    fleet = JobFleet(
+        region="test-region",
+        client=fleet_client,
+        min_poll_interval_seconds=10,
+        max_poll_interval_seconds=30,
+    )
+    fleet.add(job_arn)
+
+    assert fleet.poll_progress()
+    assert sleeps == [10, 20, 30, 30]
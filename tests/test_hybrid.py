@@ -0,0 +1,165 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from llmbo import HybridInferer, ModelInput
+
+
+@pytest.fixture
+def distinct_inputs():
+    return {
+        f"{i:03}": ModelInput(messages=[{"role": "user", "content": f"Message {i}"}])
+        for i in range(150)
+    }
+
+
+def test_no_time_for_a_batch_job_runs_everything_in_realtime(
+    batch_inferer,
+    distinct_inputs,
+    mock_bedrock_client,
+    mock_bedrock_runtime_client,
+):
+    hybrid = HybridInferer(
+        batch_inferer,
+        deadline=datetime.now() + timedelta(minutes=30),
+        realtime_margin_seconds=60 * 60,
+    )
+
+    results = hybrid.run(distinct_inputs)
+
+    mock_bedrock_client.create_model_invocation_job.assert_not_called()
+    assert mock_bedrock_runtime_client.invoke_model.call_count == 150
+    assert [result["recordId"] for result in results] == list(distinct_inputs)
+
+
+def test_unfinished_batch_job_is_stopped_and_run_in_realtime(
+    batch_inferer,
+    distinct_inputs,
+    mock_bedrock_client,
+    mock_bedrock_runtime_client,
+    tmp_path,
+    monkeypatch,
+):
+    monkeypatch.chdir(tmp_path)
+    mock_bedrock_client.get_model_invocation_job.return_value["status"] = "Scheduled"
+    hybrid = HybridInferer(
+        batch_inferer,
+        deadline=datetime.now() + timedelta(seconds=0.3),
+        realtime_fraction=0.2,
+        realtime_margin_seconds=0,
+        poll_interval_seconds=0.05,
+        stop_grace_seconds=0.1,
+    )
+
+    results = hybrid.run(distinct_inputs)
+
+    mock_bedrock_client.create_model_invocation_job.assert_called_once()
+    mock_bedrock_client.stop_model_invocation_job.assert_called_once()
+    assert mock_bedrock_runtime_client.invoke_model.call_count == 150
+    assert [result["recordId"] for result in results] == list(distinct_inputs)
+    assert sorted(hybrid.realtime_record_ids) == list(distinct_inputs)
+
+
+def write_results(inferer, s3_client, count):
+    """Make download_results() write results for the first count requests."""
+
+    def download_file(Bucket, Key, Filename, **_):
+        records = list(inferer.requests)[:count]
+        with open(Filename, "w") as file:
+            if Key.endswith(".jsonl.out"):
+                for record in records:
+                    output = {"content": [{"type": "text", "text": "batch"}]}
+                    file.write(json.dumps({**record, "modelOutput": output}) + "\n")
+            else:
+                manifest = {
+                    "totalRecordCount": count,
+                    "processedRecordCount": count,
+                    "successRecordCount": count,
+                    "errorRecordCount": 0,
+                    "inputTokenCount": 1000,
+                    "outputTokenCount": 2000,
+                }
+                file.write(json.dumps(manifest) + "\n")
+
+    s3_client.download_file.side_effect = download_file
+
+
+def test_batch_job_finishing_in_time_runs_alongside_realtime_slice(
+    batch_inferer,
+    distinct_inputs,
+    mock_bedrock_client,
+    mock_bedrock_runtime_client,
+    mock_s3_client,
+    tmp_path,
+    monkeypatch,
+):
+    monkeypatch.chdir(tmp_path)
+    write_results(batch_inferer, mock_s3_client, 120)
+    hybrid = HybridInferer(
+        batch_inferer,
+        deadline=datetime.now() + timedelta(hours=6),
+        realtime_fraction=0.2,
+        realtime_margin_seconds=60,
+        poll_interval_seconds=0,
+    )
+
+    results = hybrid.run(distinct_inputs)
+
+    mock_bedrock_client.stop_model_invocation_job.assert_not_called()
+    assert mock_bedrock_runtime_client.invoke_model.call_count == 30
+    assert hybrid.realtime_record_ids == list(distinct_inputs)[120:]
+    assert [result["recordId"] for result in results] == list(distinct_inputs)
+    texts = [result["modelOutput"]["content"][0]["text"] for result in results]
+    assert texts == ["batch"] * 120 + ["Hello"] * 30
+
+
+def test_stopped_job_results_are_kept_once_it_has_stopped(
+    batch_inferer,
+    distinct_inputs,
+    mock_bedrock_client,
+    mock_bedrock_runtime_client,
+    mock_s3_client,
+    tmp_path,
+    monkeypatch,
+):
+    monkeypatch.chdir(tmp_path)
+    job = mock_bedrock_client.get_model_invocation_job.return_value
+    statuses_after_stop = iter(["Stopping", "Stopping", "Stopped"])
+
+    def get_model_invocation_job(**_):
+        if not mock_bedrock_client.stop_model_invocation_job.called:
+            return {**job, "status": "InProgress"}
+        return {**job, "status": next(statuses_after_stop)}
+
+    mock_bedrock_client.get_model_invocation_job.side_effect = get_model_invocation_job
+    write_results(batch_inferer, mock_s3_client, 70)
+    downloaded_when = []
+    download_file = mock_s3_client.download_file.side_effect
+    mock_s3_client.download_file.side_effect = lambda **kwargs: (
+        downloaded_when.append(batch_inferer.job_status),
+        download_file(**kwargs),
+    )
+    hybrid = HybridInferer(
+        batch_inferer,
+        deadline=datetime.now() + timedelta(seconds=0.3),
+        realtime_fraction=0.2,
+        realtime_margin_seconds=0,
+        poll_interval_seconds=0.01,
+        stop_grace_seconds=5,
+    )
+
+    results = hybrid.run(distinct_inputs)
+
+    mock_bedrock_client.stop_model_invocation_job.assert_called_once()
+    assert set(downloaded_when) == {"Stopped"}
+    # 30 in the realtime slice, and the 50 the stopped job didn't finish
+    assert mock_bedrock_runtime_client.invoke_model.call_count == 80
+    assert sorted(hybrid.realtime_record_ids) == list(distinct_inputs)[70:]
+    texts = [result["modelOutput"]["content"][0]["text"] for result in results]
+    assert texts == ["batch"] * 70 + ["Hello"] * 80
+
+
+def test_realtime_fraction_must_be_a_fraction(batch_inferer):
+    with pytest.raises(ValueError, match="realtime_fraction"):
+        HybridInferer(batch_inferer, deadline=datetime.now(), realtime_fraction=2)
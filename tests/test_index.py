@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from llmbo import BatchInferer, ResultIndex
+
+
+def write_results(path, record_ids):
+    with open(path, "w") as file:
+        for record_id in record_ids:
+            result = {"recordId": record_id, "modelOutput": {"id": record_id}}
+            file.write(json.dumps(result) + "\n")
+
+
+@pytest.fixture
+def downloaded_inferer(batch_inferer, tmp_path, monkeypatch):
+    """Make download_results() write a results file, as S3 would."""
+    monkeypatch.chdir(tmp_path)
+    batch_inferer.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    s3_client = batch_inferer.session.client("s3")
+
+    def download_file(Bucket, Key, Filename, **_):
+        if Key.endswith(".jsonl.out"):
+            write_results(Filename, [f"{i:03}" for i in range(100)])
+
+    s3_client.download_file.side_effect = download_file
+    return batch_inferer
+
+
+def test_build_and_get(tmp_path):
+    results = tmp_path / "out.jsonl"
+    record_ids = ["a", 'quoted "b"', "c"]
+    write_results(results, record_ids)
+
+    index = ResultIndex.build(str(results), str(tmp_path / "out.index.db"))
+
+    assert len(index) == 3
+    assert 'quoted "b"' in index
+    assert index.get('quoted "b"')["modelOutput"] == {"id": 'quoted "b"'}
+    assert index.get("missing") is None
+    assert index.get_many(["c", "a"]) == [
+        {"recordId": "c", "modelOutput": {"id": "c"}},
+        {"recordId": "a", "modelOutput": {"id": "a"}},
+    ]
+    index.close()
+
+
+def test_nested_record_ids_are_parsed(tmp_path):
+    """Test a line with a recordId inside the output still indexes the top level."""
+    results = tmp_path / "out.jsonl"
+    results.write_text(
+        json.dumps({"modelOutput": {"recordId": "inner"}, "recordId": "outer"}) + "\n"
+    )
+
+    index = ResultIndex.build(str(results), str(tmp_path / "out.index.db"))
+
+    assert "outer" in index
+    assert "inner" not in index
+    index.close()
+
+
+def test_open_or_build_rebuilds_changed_files(tmp_path):
+    results = tmp_path / "out.jsonl"
+    index_path = str(tmp_path / "out.index.db")
+    write_results(results, ["a"])
+    ResultIndex.build(str(results), index_path).close()
+
+    write_results(results, ["a", "b"])
+    index = ResultIndex.open_or_build(str(results), index_path)
+
+    assert len(index) == 2
+    index.close()
+
+
+def test_download_results_builds_index(downloaded_inferer, tmp_path):
+    downloaded_inferer.download_results(build_index=True)
+
+    assert (tmp_path / "test-job_out.index.db").exists()
+    assert len(downloaded_inferer.result_index) == 100
+    assert downloaded_inferer.get_result("042")["modelOutput"] == {"id": "042"}
+    downloaded_inferer.result_index.close()
+
+
+def test_get_result_builds_index_on_first_use(downloaded_inferer):
+    downloaded_inferer.download_results()
+    assert downloaded_inferer.result_index is None
+
+    assert downloaded_inferer.get_result("007")["recordId"] == "007"
+    assert downloaded_inferer.get_result("missing") is None
+    downloaded_inferer.result_index.close()
+
+
+def test_get_result_finds_cached_and_duplicate_records(downloaded_inferer):
+    downloaded_inferer.download_results()
+    cached = {"recordId": "100", "modelInput": {}, "modelOutput": {"id": "cached"}}
+    downloaded_inferer.cached_results = {"100": cached}
+    downloaded_inferer.duplicates = {"101": "007", "102": "100"}
+
+    assert downloaded_inferer.get_result("100") == cached
+    assert downloaded_inferer.get_result("101") == {
+        "recordId": "101",
+        "modelOutput": {"id": "007"},
+    }
+    assert downloaded_inferer.get_result("102")["modelOutput"] == {"id": "cached"}
+    downloaded_inferer.result_index.close()
+
+
+def test_get_result_of_cached_record_needs_no_download(batch_inferer):
+    cached = {"recordId": "000", "modelInput": {}, "modelOutput": {"id": "cached"}}
+    batch_inferer.cached_results = {"000": cached}
+
+    assert batch_inferer.get_result("000") == cached
+
+
+def test_get_result_before_download(batch_inferer):
+    with pytest.raises(FileExistsError, match="download_results"):
+        batch_inferer.get_result("000")
+
+
+def test_compressed_results_cannot_be_indexed(mock_boto3_session):
+    bi = BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        compression="gzip",
+    )
+
+    with pytest.raises(ValueError, match="can't be indexed"):
+        bi.download_results(build_index=True)
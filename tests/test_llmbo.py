@@ -1,9 +1,22 @@
-from unittest.mock import MagicMock, call, patch
+import json
+import re
+from dataclasses import dataclass
+from typing import Optional
+from unittest.mock import call, patch
 
 import pytest
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
 from pydantic import BaseModel
 
-from llmbo import BatchInferer, ModelInput, StructuredBatchInferer
+from llmbo import (
+    BatchInferer,
+    ModelInput,
+    PreparedRequests,
+    RequestStream,
+    StructuredBatchInferer,
+    ToolChoice,
+)
 
 
 class ExampleOutput(BaseModel):
@@ -11,92 +24,6 @@ class ExampleOutput(BaseModel):
     age: int
 
 
-@pytest.fixture
-def mock_iam_client():
-    """Create a mock iam client"""
-    mock_client = MagicMock()
-    mock_client.get_role.return_value = {}
-    return mock_client
-
-
-@pytest.fixture
-def mock_bedrock_client():
-    """Create a mock Bedrock client with expected responses."""
-    mock_client = MagicMock()
-
-    # Configure mock responses
-    mock_client.create_model_invocation_job.return_value = {
-        "ResponseMetadata": {"HTTPStatusCode": 200},
-        "jobArn": "arn:aws:bedrock:region:account:job/test-job",
-    }
-
-    mock_client.get_model_invocation_job.return_value = {
-        "status": "Completed",
-        "jobName": "test-job",
-        "modelId": "anthropic.claude-3-haiku-20240307-v1:0",
-        "inputDataConfig": {
-            "s3InputDataConfig": {"s3Uri": "s3://test-bucket/input/test.jsonl"}
-        },
-        "roleArn": "arn:aws:iam::123456789012:role/TestRole",
-    }
-
-    mock_client.stop_model_invocation_job.return_value = {
-        "ResponseMetadata": {"HTTPStatusCode": 200}
-    }
-
-    return mock_client
-
-
-@pytest.fixture
-def mock_s3_client():
-    """Create a mock S3 client."""
-    mock_client = MagicMock()
-    mock_client.upload_file.return_value = None
-    mock_client.download_file.return_value = None
-    mock_client.get_bucket_location.return_value = {"LocationConstraint": "test-region"}
-    return mock_client
-
-
-@pytest.fixture
-def sample_inputs():
-    """Create minimal valid inputs for testing."""
-    return {
-        f"{i:03}": ModelInput(
-            messages=[{"role": "user", "content": "Test message"}],
-        )
-        for i in range(100)
-    }
-
-
-@pytest.fixture
-def mock_boto3_session(mock_bedrock_client, mock_s3_client, mock_iam_client):
-    """Create a mock boto3 client that returns appropriate service clients."""
-    with patch("boto3.Session") as mock_session:
-        mock_session_instance = mock_session.return_value
-
-        def mock_client(service_name, region_name=None):
-            return {
-                "bedrock": mock_bedrock_client,
-                "s3": mock_s3_client,
-                "iam": mock_iam_client,
-            }.get(service_name, MagicMock())
-
-        mock_session_instance.client.side_effect = mock_client
-        yield mock_session
-
-
-@pytest.fixture
-def batch_inferer(mock_boto3_session):
-    """Create a configured BatchInferer instance for testing."""
-    return BatchInferer(
-        model_name="test-model",
-        bucket_name="test-bucket",
-        region="test-region",
-        job_name="test-job",
-        role_arn="arn:aws:iam::123456789012:role/TestRole",
-    )
-
-
 def test_init(mock_boto3_session):
     """Test BatchInferer initialisation."""
 
@@ -157,6 +84,57 @@ def test_prepare_requests(batch_inferer, sample_inputs):
     ), "requests are not of expected type "
 
 
+def test_prepare_requests_holds_encoded_lines(batch_inferer, sample_inputs):
+    """Test requests are kept as JSONL lines and uploaded without re-encoding."""
+    batch_inferer.prepare_requests(sample_inputs)
+    requests = batch_inferer.requests
+
+    assert isinstance(requests, PreparedRequests)
+    assert list(requests.lines()) == list(batch_inferer._iter_request_lines())
+    assert requests.nbytes == sum(len(line) for line in requests.lines())
+    assert requests[-1]["recordId"] == "099"
+    assert [record["recordId"] for record in requests[10:12]] == ["010", "011"]
+    assert requests == [
+        {"recordId": record_id, "modelInput": model_input.to_dict()}
+        for record_id, model_input in sample_inputs.items()
+    ]
+
+
+def test_model_input_has_slots():
+    model_input = ModelInput(
+        messages=[{"role": "user", "content": "Hi"}],
+        temperature=0.5,
+        tool_choice=ToolChoice(type="auto"),
+    )
+
+    assert not hasattr(model_input, "__dict__")
+    assert model_input.to_dict() == {
+        "messages": [{"role": "user", "content": "Hi"}],
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 2000,
+        "temperature": 0.5,
+        "tool_choice": {"type": "auto", "name": None},
+    }
+
+
+def test_model_input_subclass_fields_are_included():
+    @dataclass(slots=True)
+    class ThinkingModelInput(ModelInput):
+        thinking: Optional[dict] = None
+
+    model_input = ThinkingModelInput(
+        messages=[{"role": "user", "content": "Hi"}],
+        thinking={"type": "enabled", "budget_tokens": 1024},
+    )
+
+    assert model_input.to_dict() == {
+        "messages": [{"role": "user", "content": "Hi"}],
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 2000,
+        "thinking": {"type": "enabled", "budget_tokens": 1024},
+    }
+
+
 def test_prepare_requests_bad_batch_size(batch_inferer, sample_inputs):
     """Test that an error is raised for batch size < 100"""
     small_inputs = dict(list(sample_inputs.items())[:50])
@@ -262,3 +240,531 @@ def test_structured_init(mock_boto3_session):
         [call("s3"), call("iam"), call("bedrock", region_name=inputs["region"])],
         any_order=True,
     )
+
+
+def test_push_requests_to_s3_stream(
+    batch_inferer, sample_inputs, tmp_path, monkeypatch
+):
+    """Test streaming upload sends every request without writing a local file."""
+    monkeypatch.chdir(tmp_path)
+    s3_client = batch_inferer.session.client("s3")
+    s3_client.create_multipart_upload.return_value = {"UploadId": "upload-id"}
+    s3_client.upload_part.return_value = {"ETag": "etag"}
+
+    batch_inferer.prepare_requests(sample_inputs)
+    batch_inferer.push_requests_to_s3(stream=True)
+
+    assert not (tmp_path / batch_inferer.file_name).exists()
+    s3_client.upload_file.assert_not_called()
+    s3_client.upload_part.assert_called_once()
+    body = s3_client.upload_part.call_args.kwargs["Body"]
+    assert len(body.splitlines()) == len(sample_inputs)
+    s3_client.complete_multipart_upload.assert_called_once_with(
+        Bucket="test-bucket",
+        Key="input/test-job.jsonl",
+        UploadId="upload-id",
+        MultipartUpload={"Parts": [{"PartNumber": 1, "ETag": "etag"}]},
+    )
+
+
+def test_push_requests_to_s3_stream_keep_local_copy(
+    batch_inferer, sample_inputs, tmp_path, monkeypatch
+):
+    """Test streaming upload can still write the local file as a side artifact."""
+    monkeypatch.chdir(tmp_path)
+    s3_client = batch_inferer.session.client("s3")
+    s3_client.upload_part.return_value = {"ETag": "etag"}
+
+    batch_inferer.prepare_requests(sample_inputs)
+    batch_inferer.push_requests_to_s3(stream=True, keep_local_copy=True)
+
+    local_lines = (tmp_path / batch_inferer.file_name).read_bytes()
+    assert local_lines == s3_client.upload_part.call_args.kwargs["Body"]
+
+
+def test_push_requests_to_s3_stream_aborts_on_failure(
+    batch_inferer, sample_inputs, tmp_path, monkeypatch
+):
+    """Test a failed part aborts the multipart upload."""
+    monkeypatch.chdir(tmp_path)
+    s3_client = batch_inferer.session.client("s3")
+    s3_client.create_multipart_upload.return_value = {"UploadId": "upload-id"}
+    s3_client.upload_part.side_effect = RuntimeError("boom")
+
+    batch_inferer.prepare_requests(sample_inputs)
+    with pytest.raises(RuntimeError, match="boom"):
+        batch_inferer.push_requests_to_s3(stream=True)
+
+    s3_client.abort_multipart_upload.assert_called_once_with(
+        Bucket="test-bucket", Key="input/test-job.jsonl", UploadId="upload-id"
+    )
+    s3_client.complete_multipart_upload.assert_not_called()
+
+
+def test_prepare_requests_from_generator(batch_inferer, sample_inputs):
+    """Test a generator of inputs is prepared lazily and consumed on upload."""
+    consumed = []
+
+    def generate():
+        for record_id, model_input in sample_inputs.items():
+            consumed.append(record_id)
+            yield record_id, model_input
+
+    batch_inferer.prepare_requests(generate())
+
+    assert isinstance(batch_inferer.requests, RequestStream)
+    # only enough inputs to validate the batch size are read up front
+    assert len(consumed) == 100
+
+    records = list(batch_inferer.requests)
+    assert [record["recordId"] for record in records] == list(sample_inputs)
+    assert batch_inferer.requests.record_count == len(sample_inputs)
+
+    with pytest.raises(RuntimeError, match="already been consumed"):
+        list(batch_inferer.requests)
+
+
+def test_prepare_requests_from_generator_bad_batch_size(batch_inferer, sample_inputs):
+    """Test the minimum batch size is enforced for lazy inputs."""
+    small_inputs = list(sample_inputs.items())[:50]
+    with pytest.raises(ValueError, match="Minimum Batch Size is 100, 50 given"):
+        batch_inferer.prepare_requests(iter(small_inputs))
+
+
+def test_push_requests_to_s3_streams_generator_inputs(
+    batch_inferer, sample_inputs, tmp_path, monkeypatch
+):
+    """Test lazily prepared requests are streamed to S3 by default."""
+    monkeypatch.chdir(tmp_path)
+    s3_client = batch_inferer.session.client("s3")
+    s3_client.upload_part.return_value = {"ETag": "etag"}
+
+    batch_inferer.prepare_requests(iter(sample_inputs.items()))
+    batch_inferer.push_requests_to_s3()
+
+    s3_client.upload_file.assert_not_called()
+    body = s3_client.upload_part.call_args.kwargs["Body"]
+    assert len(body.splitlines()) == len(sample_inputs)
+
+
+@pytest.fixture
+def downloaded_results(batch_inferer, sample_inputs, tmp_path, monkeypatch):
+    """Write result and manifest files as download_results() would."""
+    monkeypatch.chdir(tmp_path)
+    batch_inferer.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    batch_inferer.prepare_requests(sample_inputs)
+    batch_inferer.download_results()
+
+    with open(batch_inferer.output_file_name, "w") as file:
+        for record in batch_inferer.requests:
+            file.write(json.dumps({**record, "modelOutput": {}}) + "\n")
+    with open(batch_inferer.manifest_file_name, "w") as file:
+        manifest = {
+            "totalRecordCount": 100,
+            "processedRecordCount": 100,
+            "successRecordCount": 100,
+            "errorRecordCount": 0,
+            "inputTokenCount": 1000,
+            "outputTokenCount": 2000,
+        }
+        file.write(json.dumps(manifest) + "\n")
+    return batch_inferer
+
+
+def test_load_results(downloaded_results, sample_inputs):
+    downloaded_results.load_results()
+
+    assert [result["recordId"] for result in downloaded_results.results] == list(
+        sample_inputs
+    )
+    assert downloaded_results.manifest.successRecordCount == 100
+
+
+def test_iter_results(downloaded_results, sample_inputs):
+    """Test results stream lazily, singly or in chunks."""
+    results = downloaded_results.iter_results()
+    assert not isinstance(results, list)
+    assert [result["recordId"] for result in results] == list(sample_inputs)
+
+    chunks = list(downloaded_results.iter_results(chunk_size=30))
+    assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+
+
+def test_iter_results_from_s3(batch_inferer, sample_inputs):
+    """Test results can be streamed straight from the S3 output object."""
+    batch_inferer.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    s3_client = batch_inferer.session.client("s3")
+    lines = [json.dumps({"recordId": id}).encode() for id in sample_inputs]
+    s3_client.get_object.return_value["Body"].iter_lines.return_value = iter(lines)
+
+    results = list(batch_inferer.iter_results(from_s3=True))
+
+    assert [result["recordId"] for result in results] == list(sample_inputs)
+    s3_client.get_object.assert_called_once_with(
+        Bucket="test-bucket", Key="output/test-job/test-job.jsonl.out"
+    )
+    s3_client.get_object.return_value["Body"].close.assert_called_once()
+
+
+def test_iter_results_before_download(batch_inferer):
+    with pytest.raises(FileExistsError, match="download_results"):
+        next(batch_inferer.iter_results())
+
+
+def test_download_results(batch_inferer, tmp_path, monkeypatch):
+    """Test both result files are downloaded, the output with a tunable config."""
+    monkeypatch.chdir(tmp_path)
+    batch_inferer.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    s3_client = batch_inferer.session.client("s3")
+    config = TransferConfig(max_concurrency=2)
+
+    batch_inferer.download_results(transfer_config=config)
+
+    s3_client.download_file.assert_has_calls(
+        [
+            call(
+                Bucket="test-bucket",
+                Key="output/test-job/test-job.jsonl.out",
+                Filename="test-job_out.jsonl",
+                Config=config,
+            ),
+            call(
+                Bucket="test-bucket",
+                Key="output/test-job/manifest.json.out",
+                Filename="test-job_manifest.jsonl",
+            ),
+        ],
+        any_order=True,
+    )
+
+
+@pytest.fixture
+def structured_results(mock_boto3_session, sample_inputs, tmp_path, monkeypatch):
+    """Create a StructuredBatchInferer with downloaded tool use results."""
+    monkeypatch.chdir(tmp_path)
+    sbi = StructuredBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        output_model=ExampleOutput,
+    )
+    sbi.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    sbi.download_results()
+
+    with open(sbi.output_file_name, "w") as file:
+        for index, record_id in enumerate(sample_inputs):
+            if index % 10 == 0:
+                result = {"recordId": record_id, "error": {"errorMessage": "failed"}}
+            else:
+                tool_input = {"name": f"name {index}", "age": index}
+                stop_reason = "end_turn" if index % 10 == 1 else "tool_use"
+                result = {
+                    "recordId": record_id,
+                    "modelOutput": {
+                        "stop_reason": stop_reason,
+                        "content": [{"type": "tool_use", "input": tool_input}],
+                    },
+                }
+            file.write(json.dumps(result) + "\n")
+    with open(sbi.manifest_file_name, "w") as file:
+        manifest = {
+            "totalRecordCount": 100,
+            "processedRecordCount": 100,
+            "successRecordCount": 90,
+            "errorRecordCount": 10,
+            "inputTokenCount": 1000,
+            "outputTokenCount": 2000,
+        }
+        file.write(json.dumps(manifest) + "\n")
+    return sbi
+
+
+def test_structured_load_results(structured_results):
+    structured_results.load_results()
+    instances = structured_results.instances
+
+    assert len(instances) == 100
+    assert instances[0] is None
+    assert instances[1] == {"recordId": "001", "outputModel": None}
+    assert instances[2] == {
+        "recordId": "002",
+        "outputModel": ExampleOutput(name="name 2", age=2),
+    }
+
+
+def test_structured_load_results_in_process_pool(structured_results):
+    """Test validating in a process pool gives the same instances in order."""
+    structured_results.load_results()
+    serial = structured_results.instances
+
+    structured_results.load_results(validation_workers=2, validation_chunk_size=7)
+
+    assert structured_results.instances == serial
+
+
+def test_prepare_requests_reports_progress(batch_inferer, sample_inputs):
+    """Test progress is reported at intervals and once on completion."""
+    reports = []
+    batch_inferer.prepare_requests(
+        sample_inputs, progress_callback=reports.append, progress_interval=40
+    )
+
+    assert [(report.records, report.done) for report in reports] == [
+        (40, False),
+        (80, False),
+        (100, True),
+    ]
+    assert all(report.elapsed_seconds >= 0 for report in reports)
+
+
+def test_structured_prepare_requests_does_not_log_per_record(
+    mock_boto3_session, sample_inputs, caplog
+):
+    """Test preparing structured requests logs a summary, not a line per record."""
+    sbi = StructuredBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        output_model=ExampleOutput,
+    )
+    with caplog.at_level("INFO"):
+        sbi.prepare_requests(sample_inputs)
+
+    assert len(caplog.records) < 5
+    assert "Prepared 100 requests" in caplog.text
+    assert all(request["modelInput"]["tools"] == [sbi.tool] for request in sbi.requests)
+
+
+def test_structured_prepare_requests_shares_tool(mock_boto3_session, sample_inputs):
+    """Test inputs aren't mutated and the spliced tool encodes correctly."""
+    sbi = StructuredBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        output_model=ExampleOutput,
+    )
+    sbi.prepare_requests(sample_inputs)
+
+    assert all(model_input.tools is None for model_input in sample_inputs.values())
+    assert all(
+        model_input.tool_choice is None for model_input in sample_inputs.values()
+    )
+
+    lines = list(sbi._iter_request_lines())
+    assert [json.loads(line) for line in lines] == sbi.requests
+    assert json.loads(lines[0])["modelInput"]["tool_choice"] == {
+        "type": "tool",
+        "name": "ExampleOutput",
+    }
+
+
+@pytest.fixture
+def repeated_inputs():
+    """150 inputs, the last 30 repeating the first 30."""
+    return {
+        f"{i:03}": ModelInput(
+            messages=[{"role": "user", "content": f"Message {i % 120}"}]
+        )
+        for i in range(150)
+    }
+
+
+def test_prepare_requests_deduplicates(batch_inferer, repeated_inputs):
+    batch_inferer.deduplicate = True
+    batch_inferer.prepare_requests(repeated_inputs)
+
+    assert len(batch_inferer.requests) == 120
+    assert batch_inferer.duplicates["120"] == "000"
+    assert len(batch_inferer.duplicates) == 30
+
+
+def test_prepare_requests_deduplicate_tops_up(batch_inferer, sample_inputs):
+    """Test duplicates are sent anyway to make up the minimum batch size."""
+    batch_inferer.deduplicate = True
+    batch_inferer.prepare_requests(sample_inputs)
+
+    assert len(batch_inferer.requests) == 100
+    assert batch_inferer.duplicates == {}
+
+
+def test_load_results_fans_out_duplicates(
+    batch_inferer, repeated_inputs, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    batch_inferer.deduplicate = True
+    batch_inferer.job_arn = "arn:aws:bedrock:region:account:job/test-job"
+    batch_inferer.prepare_requests(repeated_inputs)
+    batch_inferer.download_results()
+    with open(batch_inferer.output_file_name, "w") as file:
+        for record in batch_inferer.requests:
+            output = {"text": record["recordId"]}
+            file.write(json.dumps({**record, "modelOutput": output}) + "\n")
+    with open(batch_inferer.manifest_file_name, "w") as file:
+        manifest = {
+            "totalRecordCount": 120,
+            "processedRecordCount": 120,
+            "successRecordCount": 120,
+            "errorRecordCount": 0,
+            "inputTokenCount": 1000,
+            "outputTokenCount": 2000,
+        }
+        file.write(json.dumps(manifest) + "\n")
+
+    batch_inferer.load_results()
+
+    results = {result["recordId"]: result for result in batch_inferer.results}
+    assert sorted(results) == list(repeated_inputs)
+    assert results["149"]["modelOutput"] == {"text": "029"}
+
+
+def test_recover_details_from_job_arn_reads_input_lazily(
+    mock_boto3_session, mock_s3_client, sample_inputs, tmp_path, monkeypatch
+):
+    """Test recovery works without the local input file, reading S3 on demand."""
+    monkeypatch.chdir(tmp_path)
+    job_arn = "arn:aws:bedrock:region:account:job/test-job"
+
+    bi = BatchInferer.recover_details_from_job_arn(job_arn, "test-region")
+
+    assert bi.job_arn == job_arn
+    assert bi.job_status == "Completed"
+    mock_s3_client.get_object.assert_not_called()
+
+    lines = [
+        json.dumps({"recordId": id, "modelInput": {}}).encode() for id in sample_inputs
+    ]
+    mock_s3_client.get_object.return_value["Body"].iter_lines.return_value = iter(lines)
+    assert [record["recordId"] for record in bi.requests] == list(sample_inputs)
+    mock_s3_client.get_object.assert_called_once_with(
+        Bucket="test-bucket", Key="input/test.jsonl"
+    )
+
+
+def test_recover_structured_job(mock_boto3_session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job_arn = "arn:aws:bedrock:region:account:job/test-job"
+
+    sbi = StructuredBatchInferer.recover_structured_job(
+        job_arn, "test-region", ExampleOutput
+    )
+
+    assert sbi.output_model is ExampleOutput
+    assert sbi.requests.key == "input/test.jsonl"
+
+
+def download_retried_results(self):
+    """Stands in for download_results, as if every retried record succeeded."""
+    file_name = self.file_name.removesuffix(".jsonl")
+    self.output_file_name = f"{file_name}_out.jsonl"
+    self.manifest_file_name = f"{file_name}_manifest.jsonl"
+    with open(self.output_file_name, "w") as file:
+        for record in self.requests:
+            tool_input = {"name": "retried", "age": 1}
+            output = {
+                "stop_reason": "tool_use",
+                "content": [{"type": "tool_use", "input": tool_input}],
+            }
+            file.write(json.dumps({**record, "modelOutput": output}) + "\n")
+    with open(self.manifest_file_name, "w") as file:
+        manifest = {
+            "totalRecordCount": 100,
+            "processedRecordCount": 100,
+            "successRecordCount": 100,
+            "errorRecordCount": 0,
+            "inputTokenCount": 1000,
+            "outputTokenCount": 2000,
+        }
+        file.write(json.dumps(manifest) + "\n")
+
+
+def test_retry_failed(structured_results, mock_bedrock_client, monkeypatch):
+    """Test failed and invalid records are resubmitted, padded to 100, and merged."""
+    structured_results.load_results()
+
+    monkeypatch.setattr(
+        StructuredBatchInferer, "download_results", download_retried_results
+    )
+    structured_results.requests = [
+        {"recordId": result["recordId"], "modelInput": {}}
+        for result in structured_results.results
+    ]
+
+    still_failed = structured_results.retry_failed(poll_interval_seconds=0)
+
+    assert still_failed == []
+    _, kwargs = mock_bedrock_client.create_model_invocation_job.call_args
+    assert re.fullmatch(r"test-job-retry-1-\d{8}-\d{6}", kwargs["jobName"])
+    instances = structured_results.instances
+    assert instances[0]["outputModel"] == ExampleOutput(name="retried", age=1)
+    assert instances[1]["outputModel"] == ExampleOutput(name="retried", age=1)
+    # successful records used as padding keep their original results
+    assert instances[2]["outputModel"] == ExampleOutput(name="name 2", age=2)
+
+
+@pytest.mark.parametrize("validation_workers", [None, 2])
+def test_schema_invalid_records_are_retried(
+    structured_results, mock_bedrock_client, monkeypatch, validation_workers
+):
+    """Test a tool_use output missing a field counts as failed rather than raising."""
+    with open(structured_results.output_file_name) as file:
+        lines = file.readlines()
+    missing_age = {
+        "stop_reason": "tool_use",
+        "content": [{"type": "tool_use", "input": {"name": "x"}}],
+    }
+    lines[5] = json.dumps({"recordId": "005", "modelOutput": missing_age}) + "\n"
+    with open(structured_results.output_file_name, "w") as file:
+        file.writelines(lines)
+
+    structured_results.load_results(validation_workers=validation_workers)
+
+    assert structured_results.instances[5] == {"recordId": "005", "outputModel": None}
+    assert "005" in structured_results._failed_record_ids()
+
+    monkeypatch.setattr(
+        StructuredBatchInferer, "download_results", download_retried_results
+    )
+    structured_results.requests = [
+        {"recordId": result["recordId"], "modelInput": {}}
+        for result in structured_results.results
+    ]
+
+    assert structured_results.retry_failed(poll_interval_seconds=0) == []
+    assert structured_results.instances[5]["outputModel"] == ExampleOutput(
+        name="retried", age=1
+    )
+
+
+def test_retry_job_names_are_unique_across_calls(
+    batch_inferer, mock_bedrock_runtime_client
+):
+    mock_bedrock_runtime_client.invoke_model.side_effect = ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "slow down"}},
+        "InvokeModel",
+    )
+    batch_inferer.realtime = True
+    batch_inferer.results = [
+        {"recordId": "000", "modelInput": {}, "error": {"errorMessage": "failed"}}
+    ]
+
+    with patch.object(
+        BatchInferer, "_spawn", autospec=True, side_effect=BatchInferer._spawn
+    ) as spawn:
+        batch_inferer.retry_failed(max_attempts=2)
+        batch_inferer.retry_failed(max_attempts=2)
+
+    names = [args[1] for args, _ in spawn.call_args_list]
+    assert len(names) == 4
+    assert len(set(names)) == 4
+    assert [name.split("-")[3] for name in names] == ["1", "2", "3", "4"]
+
+
+def test_retry_failed_before_load(batch_inferer):
+    with pytest.raises(AttributeError, match="load_results"):
+        batch_inferer.retry_failed()
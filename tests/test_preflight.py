@@ -0,0 +1,60 @@
+import time
+
+from llmbo import BatchInferer, PreflightCache
+
+INFERER_KWARGS = dict(
+    model_name="test-model",
+    bucket_name="test-bucket",
+    region="test-region",
+    role_arn="arn:aws:iam::123456789012:role/TestRole",
+)
+
+
+def test_passed_checks_expire():
+    cache = PreflightCache(ttl_seconds=0.05)
+    assert not cache.passed("role", "arn")
+
+    cache.record("role", "arn")
+    assert cache.passed("role", "arn")
+
+    time.sleep(0.06)
+    assert not cache.passed("role", "arn")
+
+
+def test_passed_checks_are_shared_through_a_file(tmp_path):
+    path = str(tmp_path / "preflight.json")
+    PreflightCache(path=path).record("bucket", "test-bucket", "test-region")
+
+    assert PreflightCache(path=path).passed("bucket", "test-bucket", "test-region")
+
+
+def test_checks_run_once_across_inferers(
+    mock_boto3_session, mock_s3_client, mock_iam_client
+):
+    BatchInferer(job_name="first", **INFERER_KWARGS)
+    BatchInferer(job_name="second", **INFERER_KWARGS)
+
+    mock_s3_client.head_bucket.assert_called_once()
+    mock_s3_client.get_bucket_location.assert_called_once()
+    mock_iam_client.get_role.assert_called_once()
+
+
+def test_checks_are_not_shared_across_accounts(
+    mock_boto3_session, mock_s3_client, mock_iam_client
+):
+    session = mock_boto3_session.return_value
+    BatchInferer(job_name="first", **INFERER_KWARGS)
+    session.get_credentials.return_value.access_key = "AKIAOTHER"
+    BatchInferer(job_name="second", **INFERER_KWARGS)
+    session.profile_name = "other-profile"
+    BatchInferer(job_name="third", **INFERER_KWARGS)
+
+    assert mock_s3_client.head_bucket.call_count == 3
+    assert mock_iam_client.get_role.call_count == 3
+
+
+def test_skip_preflight(mock_boto3_session, mock_s3_client, mock_iam_client):
+    BatchInferer(job_name="test-job", skip_preflight=True, **INFERER_KWARGS)
+
+    mock_s3_client.head_bucket.assert_not_called()
+    mock_iam_client.get_role.assert_not_called()
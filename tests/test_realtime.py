@@ -0,0 +1,104 @@
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+from llmbo import BatchInferer, ModelInput
+from llmbo.realtime import RateLimiter, invoke_record, invoke_records
+
+
+@pytest.fixture
+def small_inputs():
+    return {
+        f"{i:03}": ModelInput(messages=[{"role": "user", "content": f"Message {i}"}])
+        for i in range(20)
+    }
+
+
+@pytest.fixture
+def realtime_inferer(mock_boto3_session):
+    return BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        realtime_fallback=True,
+    )
+
+
+def test_invoke_records_keeps_order_and_reports_errors():
+    client = MagicMock()
+
+    def invoke_model(modelId, body, **_):
+        record_id = json.loads(body)["id"]
+        if record_id == 3:
+            raise ClientError(
+                {
+                    "Error": {"Code": "ValidationException", "Message": "bad input"},
+                    "ResponseMetadata": {"HTTPStatusCode": 400},
+                },
+                "InvokeModel",
+            )
+        body = MagicMock()
+        body.read.return_value = json.dumps({"echo": record_id}).encode()
+        return {"body": body}
+
+    client.invoke_model.side_effect = invoke_model
+    records = ({"recordId": f"{i:03}", "modelInput": {"id": i}} for i in range(10))
+
+    results = list(invoke_records(client, "test-model", records, max_workers=3))
+
+    assert [result["recordId"] for result in results] == [f"{i:03}" for i in range(10)]
+    assert results[0]["modelOutput"] == {"echo": 0}
+    assert results[3]["error"] == {"errorCode": 400, "errorMessage": "bad input"}
+
+
+def test_invoke_record_reports_connection_errors():
+    client = MagicMock()
+    client.invoke_model.side_effect = ReadTimeoutError(endpoint_url="https://bedrock")
+    record = {"recordId": "000", "modelInput": {"id": 0}}
+
+    result = invoke_record(client, "test-model", record)
+
+    assert result["recordId"] == "000"
+    assert result["error"]["errorCode"] is None
+    assert "https://bedrock" in result["error"]["errorMessage"]
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(100)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+
+    assert time.monotonic() - start >= 0.04
+
+
+def test_prepare_requests_allows_small_batches(realtime_inferer, small_inputs):
+    realtime_inferer.prepare_requests(small_inputs)
+
+    assert len(realtime_inferer.requests) == 20
+    assert realtime_inferer.use_realtime
+
+
+def test_auto_invokes_small_batches_in_realtime(
+    realtime_inferer, small_inputs, mock_bedrock_client, mock_bedrock_runtime_client
+):
+    results = realtime_inferer.auto(small_inputs)
+
+    mock_bedrock_client.create_model_invocation_job.assert_not_called()
+    assert mock_bedrock_runtime_client.invoke_model.call_count == 20
+    assert [result["recordId"] for result in results] == list(small_inputs)
+    assert results[0]["modelOutput"]["content"][0]["text"] == "Hello"
+    assert results[0]["modelInput"] == small_inputs["000"].to_dict()
+    assert realtime_inferer.manifest.successRecordCount == 20
+    assert realtime_inferer.manifest.inputTokenCount == 200
+
+
+def test_large_batches_still_use_batch_jobs(realtime_inferer, sample_inputs):
+    realtime_inferer.prepare_requests(sample_inputs)
+
+    assert not realtime_inferer.use_realtime
@@ -0,0 +1,51 @@
+import importlib.util
+
+import pytest
+
+from llmbo import serialization
+
+RECORD = {
+    "recordId": "001",
+    "modelInput": {
+        "messages": [{"role": "user", "content": "Héllo ✓"}],
+        "max_tokens": 2000,
+        "temperature": 0.5,
+        "system": None,
+    },
+}
+
+INSTALLED_BACKENDS = [
+    name
+    for name in serialization.BACKENDS
+    if name == "json" or importlib.util.find_spec(name)
+]
+
+
+@pytest.fixture
+def restore_backend():
+    original = serialization.backend
+    yield
+    serialization.set_backend(original)
+
+
+@pytest.mark.parametrize("name", INSTALLED_BACKENDS)
+def test_round_trip(name, restore_backend):
+    serialization.set_backend(name)
+
+    encoded = serialization.dumps(RECORD)
+    line = serialization.dumps_line(RECORD)
+
+    assert isinstance(encoded, bytes)
+    assert line == encoded + b"\n"
+    assert serialization.loads(encoded) == RECORD
+    assert serialization.loads(line) == RECORD
+    assert serialization.loads(encoded.decode("utf-8")) == RECORD
+
+
+def test_unknown_backend(restore_backend):
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        serialization.set_backend("yaml")
+
+
+def test_default_backend_is_fastest_installed():
+    assert serialization.backend == INSTALLED_BACKENDS[0]
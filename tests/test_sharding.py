@@ -0,0 +1,210 @@
+import json
+
+import pytest
+
+from llmbo import (
+    FileRequests,
+    ModelInput,
+    PreparedRequests,
+    ShardedBatchInferer,
+    serialization,
+)
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    """Full shards are written to the working directory."""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def sharded_inferer(mock_boto3_session):
+    """Create a ShardedBatchInferer with a small shard size for testing."""
+    return ShardedBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        max_records_per_job=200,
+        max_concurrent_jobs=1,
+    )
+
+
+@pytest.fixture
+def many_inputs():
+    return {
+        f"{i:03}": ModelInput(messages=[{"role": "user", "content": "Test message"}])
+        for i in range(450)
+    }
+
+
+def test_prepare_requests_rebalances_final_shard(sharded_inferer, many_inputs):
+    """Test an undersized final shard is rebalanced with the previous shard."""
+    sharded_inferer.prepare_requests(many_inputs)
+
+    # 200, 200, 50 -> 200, 125, 125
+    assert [len(shard.requests) for shard in sharded_inferer.shards] == [200, 125, 125]
+    assert [shard.job_name for shard in sharded_inferer.shards] == [
+        "test-job-000",
+        "test-job-001",
+        "test-job-002",
+    ]
+    record_ids = [
+        record["recordId"]
+        for shard in sharded_inferer.shards
+        for record in shard.requests
+    ]
+    assert record_ids == list(many_inputs)
+
+
+def test_prepare_requests_splits_on_bytes(mock_boto3_session, many_inputs):
+    """Test shards are cut before they exceed the input file size limit."""
+    record_size = len(
+        serialization.dumps_line(
+            {"recordId": "000", "modelInput": many_inputs["000"].to_dict()}
+        )
+    )
+    sharded = ShardedBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        max_bytes_per_job=150 * record_size,
+    )
+    sharded.prepare_requests(many_inputs)
+
+    assert [len(shard.requests) for shard in sharded.shards] == [150, 150, 150]
+
+
+def test_rebalance_keeps_shards_under_the_byte_limit(mock_boto3_session):
+    """Test rebalancing mixed size records never makes a shard too large."""
+    sharded = ShardedBatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        max_records_per_job=200,
+        max_bytes_per_job=40_000,
+    )
+    sizes = [1] * 150 + [2000] * 10 + [600] * 50
+    inputs = {
+        f"{i:03}": ModelInput(messages=[{"role": "user", "content": "x" * size}])
+        for i, size in enumerate(sizes)
+    }
+
+    sharded.prepare_requests(inputs)
+
+    assert all(len(shard.requests) >= 100 for shard in sharded.shards)
+    assert all(shard.requests.nbytes <= 40_000 for shard in sharded.shards)
+    record_ids = [
+        record["recordId"] for shard in sharded.shards for record in shard.requests
+    ]
+    assert sorted(record_ids) == list(inputs)
+
+
+def test_only_the_last_two_shards_are_held_in_memory(
+    sharded_inferer, many_inputs, tmp_path
+):
+    sharded_inferer.prepare_requests({**many_inputs, **many_inputs_from(450, 850)})
+
+    shards = sharded_inferer.shards
+    assert [len(shard.requests) for shard in shards] == [200, 200, 200, 125, 125]
+    assert all(isinstance(shard.requests, FileRequests) for shard in shards[:3])
+    assert all(isinstance(shard.requests, PreparedRequests) for shard in shards[3:])
+    assert (tmp_path / "test-job-000.jsonl").exists()
+    assert list(shards[0].requests)[0]["recordId"] == "000"
+    assert shards[2].requests.nbytes == (tmp_path / "test-job-002.jsonl").stat().st_size
+
+
+def test_written_shards_are_uploaded_from_their_file(
+    sharded_inferer, many_inputs, mock_s3_client, tmp_path
+):
+    sharded_inferer.prepare_requests(many_inputs)
+    written = (tmp_path / "test-job-000.jsonl").read_bytes()
+
+    sharded_inferer.shards[0].push_requests_to_s3()
+
+    assert (tmp_path / "test-job-000.jsonl").read_bytes() == written
+    _, kwargs = mock_s3_client.upload_file.call_args
+    assert kwargs["Filename"] == "test-job-000.jsonl"
+    assert kwargs["Key"] == "input/test-job-000.jsonl"
+
+
+def many_inputs_from(start, stop):
+    return {
+        f"{i:03}": ModelInput(messages=[{"role": "user", "content": "Test message"}])
+        for i in range(start, stop)
+    }
+
+
+def test_prepare_requests_empty(sharded_inferer):
+    with pytest.raises(ValueError, match="Minimum Batch Size is 100, 0 given"):
+        sharded_inferer.prepare_requests({})
+
+
+def test_prepare_requests_bad_batch_size(sharded_inferer, many_inputs):
+    small_inputs = dict(list(many_inputs.items())[:50])
+    with pytest.raises(ValueError, match="Minimum Batch Size is 100, 50 given"):
+        sharded_inferer.prepare_requests(small_inputs)
+
+
+def test_create_respects_concurrent_job_quota(
+    sharded_inferer, many_inputs, mock_bedrock_client
+):
+    """Test only max_concurrent_jobs are created until earlier jobs finish."""
+    arns = iter(f"arn:aws:bedrock:region:account:job/shard-{i}" for i in range(3))
+    mock_bedrock_client.create_model_invocation_job.side_effect = lambda **_: {
+        "ResponseMetadata": {"HTTPStatusCode": 200},
+        "jobArn": next(arns),
+    }
+    mock_bedrock_client.get_model_invocation_job.return_value["status"] = "InProgress"
+
+    sharded_inferer.prepare_requests(many_inputs)
+    sharded_inferer.create()
+    assert sharded_inferer.job_arns == ["arn:aws:bedrock:region:account:job/shard-0"]
+
+    assert not sharded_inferer.check_complete()
+    assert len(sharded_inferer.job_arns) == 1
+
+    mock_bedrock_client.get_model_invocation_job.return_value["status"] = "Completed"
+    assert sharded_inferer.poll_progress(poll_interval_seconds=0)
+    assert len(sharded_inferer.job_arns) == 3
+    assert mock_bedrock_client.create_model_invocation_job.call_count == 3
+
+
+def test_load_results_merges_in_record_id_order(
+    sharded_inferer, many_inputs, tmp_path, monkeypatch
+):
+    """Test shard outputs are merged in recordId order with summed manifests."""
+    monkeypatch.chdir(tmp_path)
+    sharded_inferer.prepare_requests(many_inputs)
+    sharded_inferer.create()
+    sharded_inferer.poll_progress(poll_interval_seconds=0)
+    sharded_inferer.download_results()
+
+    for shard in sharded_inferer.shards:
+        with open(shard.output_file_name, "w") as file:
+            for record in reversed(list(shard.requests)):
+                file.write(json.dumps({**record, "modelOutput": {}}) + "\n")
+        with open(shard.manifest_file_name, "w") as file:
+            count = len(shard.requests)
+            manifest = {
+                "totalRecordCount": count,
+                "processedRecordCount": count,
+                "successRecordCount": count,
+                "errorRecordCount": 0,
+                "inputTokenCount": 10 * count,
+                "outputTokenCount": 20 * count,
+            }
+            file.write(json.dumps(manifest) + "\n")
+
+    sharded_inferer.load_results()
+
+    assert [result["recordId"] for result in sharded_inferer.results] == sorted(
+        many_inputs
+    )
+    assert sharded_inferer.manifest.totalRecordCount == len(many_inputs)
+    assert sharded_inferer.manifest.inputTokenCount == 10 * len(many_inputs)
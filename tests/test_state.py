@@ -0,0 +1,104 @@
+import pytest
+
+from llmbo import BatchInferer, StateStore
+
+
+@pytest.fixture
+def state_store(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+
+def make_inferer(state_store):
+    return BatchInferer(
+        model_name="test-model",
+        bucket_name="test-bucket",
+        region="test-region",
+        job_name="test-job",
+        role_arn="arn:aws:iam::123456789012:role/TestRole",
+        state_store=state_store,
+    )
+
+
+def test_save_and_load(state_store):
+    assert state_store.load("test-job") is None
+
+    state_store.save("test-job", "created", {"job_arn": "arn"})
+    saved = state_store.load("test-job")
+
+    assert saved["stage"] == "created"
+    assert saved["details"] == {"job_arn": "arn"}
+
+    state_store.delete("test-job")
+    assert state_store.load("test-job") is None
+
+
+def test_save_unknown_stage(state_store):
+    with pytest.raises(ValueError, match="Unknown stage"):
+        state_store.save("test-job", "finished", {})
+
+
+def test_stages_are_recorded(
+    mock_boto3_session, state_store, sample_inputs, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    bi = make_inferer(state_store)
+
+    bi.prepare_requests(sample_inputs)
+    assert state_store.load("test-job")["stage"] == "prepared"
+
+    bi.push_requests_to_s3()
+    assert state_store.load("test-job")["stage"] == "uploaded"
+
+    bi.create()
+    saved = state_store.load("test-job")
+    assert saved["stage"] == "created"
+    assert saved["details"]["job_arn"] == bi.job_arn
+
+
+def test_auto_resumes_after_upload(
+    mock_boto3_session,
+    mock_bedrock_client,
+    mock_s3_client,
+    state_store,
+    sample_inputs,
+    tmp_path,
+    monkeypatch,
+):
+    """Test a new inferer creates the job without preparing or uploading again."""
+    monkeypatch.chdir(tmp_path)
+    first = make_inferer(state_store)
+    first.prepare_requests(sample_inputs)
+    first.push_requests_to_s3()
+    mock_s3_client.upload_file.reset_mock()
+
+    resumed = make_inferer(state_store)
+    assert resumed.stage == "uploaded"
+    resumed.load_results = lambda: None
+    resumed.auto(None)
+
+    mock_s3_client.upload_file.assert_not_called()
+    mock_bedrock_client.create_model_invocation_job.assert_called_once()
+    assert resumed.stage == "downloaded"
+    assert state_store.load("test-job")["details"]["job_arn"] == resumed.job_arn
+
+
+def test_resume_after_download(mock_boto3_session, state_store, sample_inputs):
+    state_store.save(
+        "test-job",
+        "downloaded",
+        {
+            "job_arn": "arn:aws:bedrock:region:account:job/test-job",
+            "output_file_name": "test-job_out.jsonl",
+            "manifest_file_name": "test-job_manifest.jsonl",
+            "cached_results": {},
+            "duplicates": {"001": "000"},
+        },
+    )
+
+    bi = make_inferer(state_store)
+
+    assert bi.job_arn == "arn:aws:bedrock:region:account:job/test-job"
+    assert bi.manifest_file_name == "test-job_manifest.jsonl"
+    assert bi.duplicates == {"001": "000"}